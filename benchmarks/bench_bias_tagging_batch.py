@@ -0,0 +1,53 @@
+"""
+Benchmark: MultilevelBiasTaggerNLP.analyze_text loop vs. analyze_batch on CPU.
+
+Checks that both paths return the same tags and reports throughput in texts/sec.
+Requires spaCy (en_core_web_trf) and transformers with the tagger's models.
+
+Usage:
+    python benchmarks/bench_bias_tagging_batch.py [n_texts] [batch_size]
+"""
+
+import os
+import sys
+import time
+
+# Permite rodar o benchmark da raiz do repositório sem instalar o pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bias_detection_toolkit.bias_tagging_multilevel import MultilevelBiasTaggerNLP
+
+SAMPLE_TEXTS = [
+    "I feel like the government is rigged, but maybe it's just my bias.",
+    "My brain struggles to keep up with politics.",
+    "Some say astrology and energy healing explain my emotions.",
+    "The research was an empirical experiment with exact, concrete results.",
+    "I'm unsure, my memory of the training is vague and foggy.",
+    "They punish and reward us like conditioning, and it makes me angry.",
+]
+
+
+def throughput(func, n_texts):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    return result, n_texts / elapsed
+
+
+if __name__ == "__main__":
+    n_texts = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" (response {i})" for i in range(n_texts)]
+
+    tagger = MultilevelBiasTaggerNLP()
+    tagger.analyze_batch(texts[:batch_size], batch_size=batch_size)  # aquecimento dos modelos
+
+    loop, loop_rate = throughput(lambda: [tagger.analyze_text(t) for t in texts], n_texts)
+    batch, batch_rate = throughput(lambda: tagger.analyze_batch(texts, batch_size=batch_size), n_texts)
+
+    print(f"texts={n_texts} batch_size={batch_size}")
+    print(f"analyze_text loop: {loop_rate:.1f} texts/sec")
+    print(f"analyze_batch:     {batch_rate:.1f} texts/sec ({batch_rate / loop_rate:.1f}x)")
+    print(f"identical tags: {loop == batch}")
+    if loop != batch:
+        sys.exit(1)
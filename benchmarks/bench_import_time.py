@@ -0,0 +1,67 @@
+"""
+Benchmark: cold import time of the package and of each detector.
+
+Every import runs in a fresh interpreter. Fails if importing the package or any
+detector module loads a heavy dependency (sklearn, scipy, joblib or the NLP stack),
+or if an import exceeds the optional time budget.
+
+Usage:
+    python benchmarks/bench_import_time.py [max_seconds]
+"""
+
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ('joblib', 'scipy', 'sklearn', 'spacy', 'torch', 'transformers')
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import bias_detection_toolkit
+if {name!r}:
+    bias_detection_toolkit.get_detector({name!r})
+elapsed = time.perf_counter() - start
+loaded = sorted({{module.split('.')[0] for module in sys.modules}} & set({heavy!r}))
+print(elapsed, ','.join(loaded))
+"""
+
+
+def cold_import(name, env):
+    """Seconds to import the package (and the detector, if given) and the heavy modules loaded."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(name=name, heavy=HEAVY_MODULES)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+
+if __name__ == "__main__":
+    max_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+
+    # Baseline: pandas/numpy sozinhos, para separar o custo do próprio pacote
+    baseline = subprocess.run(
+        [sys.executable, '-c', 'import time; s = time.perf_counter(); import pandas; print(time.perf_counter() - s)'],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    print(f"pandas baseline: {float(baseline):.3f}s")
+
+    sys.path.insert(0, root)
+    import bias_detection_toolkit
+    failures = []
+    for name in [''] + bias_detection_toolkit.available_detectors():
+        elapsed, loaded = cold_import(name, env)
+        label = name or 'bias_detection_toolkit'
+        print(f"{label:45s} {elapsed:.3f}s {'heavy: ' + ', '.join(loaded) if loaded else ''}")
+        if loaded:
+            failures.append(f"{label} imports {', '.join(loaded)}")
+        if max_seconds is not None and elapsed > max_seconds:
+            failures.append(f"{label} took {elapsed:.3f}s (budget {max_seconds:.3f}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,106 @@
+"""
+Benchmark: exact chunked group statistics vs. the sampled approximation.
+
+ChunkedAggregates groups every row of every chunk; SampledAggregates only counts
+each row in its group and aggregates a stratified sample of about sample_size rows
+per group. Two layouts are measured: groups of equal size, and skewed sizes (Zipf)
+with a tail of groups of 1 to 5 rows. The benchmark fails if the approximation is
+not clearly faster, if a group is missing from the estimates, if a group small
+enough to be sampled whole is not exact, or if the 95% intervals do not cover the
+exact group means and standard deviations about as often as they should.
+
+Usage:
+    python benchmarks/bench_sampled_statistics.py [n_rows] [n_groups] [sample_size] [chunk_size]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Permite rodar o benchmark da raiz do repositório sem instalar o pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates
+from bias_detection_toolkit.sampled_statistics import SampledAggregates
+
+
+def make_chunks(n_rows, n_groups, chunk_size, skewed=False, seed=42):
+    rng = np.random.default_rng(seed)
+    if skewed:
+        weights = 1.0 / np.arange(1, n_groups + 1) ** 1.2
+        groups = rng.choice(n_groups, n_rows, p=weights / weights.sum())
+        # Cauda de grupos minúsculos (1 a 5 linhas) espalhados pela tabela
+        tiny = np.repeat(np.arange(n_groups, n_groups + 50), rng.integers(1, 6, 50))
+        groups[rng.choice(n_rows, len(tiny), replace=False)] = tiny
+        n_groups += 50
+    else:
+        groups = rng.integers(0, n_groups, n_rows)
+    frame = pd.DataFrame({'group': groups, 'value': rng.normal(rng.uniform(5, 15, n_groups)[groups])})
+    return [frame.iloc[start:start + chunk_size] for start in range(0, n_rows, chunk_size)]
+
+
+def best_of(function, repeat=5):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(chunks, sample_size):
+    exact_time, exact = best_of(lambda: ChunkedAggregates(chunks, group_stats=[('group', 'value')]))
+    sampled_time, sampled = best_of(lambda: SampledAggregates(chunks, 'group', 'value', sample_size, seed=0))
+
+    exact = exact.group_stats('group', 'value')
+    estimates = sampled.group_estimates()
+    missing = len(exact.index.difference(estimates.index))
+    estimates = estimates.reindex(exact.index)
+    whole = (exact['count'] <= sample_size).to_numpy()
+    exact_whole = (estimates['exact'].to_numpy(dtype=bool)[whole].all()
+                   and np.allclose(estimates['mean'][whole], exact['mean'][whole], equal_nan=True))
+    approximate = estimates[~whole]
+    reference = exact[~whole]
+    mean_coverage = ((approximate['mean_low'] <= reference['mean'])
+                     & (reference['mean'] <= approximate['mean_high'])).mean()
+    std_coverage = ((approximate['std_low'] <= reference['std']) & (reference['std'] <= approximate['std_high'])).mean()
+    return exact_time, sampled_time, estimates, missing, exact_whole, mean_coverage, std_coverage
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    n_groups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    sample_size = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    chunk_size = int(sys.argv[4]) if len(sys.argv) > 4 else 1_000_000
+
+    print(f"rows={n_rows} groups={n_groups} sample_size={sample_size} chunk_size={chunk_size}")
+    failures = []
+    for layout in ('equal', 'skewed'):
+        chunks = make_chunks(n_rows, n_groups, chunk_size, skewed=layout == 'skewed')
+        # Aquecimento: importações (scipy) fora da medição
+        SampledAggregates(chunks[:1], 'group', 'value', sample_size, seed=0)
+        exact_time, sampled_time, estimates, missing, exact_whole, mean_coverage, std_coverage = run(
+            chunks, sample_size)
+        speedup = exact_time / sampled_time
+
+        print(f"[{layout} group sizes]")
+        print(f"  ChunkedAggregates (exact): {exact_time:.3f}s")
+        print(f"  SampledAggregates:         {sampled_time:.3f}s ({speedup:.1f}x faster, "
+              f"{estimates['sample_count'].mean():.0f} sampled rows per group, "
+              f"{int(estimates['exact'].sum())} groups sampled whole)")
+        print(f"  95% interval coverage: mean {mean_coverage:.3f}, std {std_coverage:.3f}")
+        if speedup < 1.5:
+            failures.append(f"{layout}: sampled aggregates are not clearly faster than the exact pass")
+        if missing:
+            failures.append(f"{layout}: {missing} groups are missing from the estimates")
+        if not exact_whole:
+            failures.append(f"{layout}: groups sampled whole do not have exact statistics")
+        if min(mean_coverage, std_coverage) < 0.9:
+            failures.append(f"{layout}: intervals cover the exact statistics less often than expected")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,124 @@
+"""
+Benchmark: per-resample pandas loop vs. vectorized group permutation p-values.
+
+The loop shuffles the group labels and recomputes the group means with groupby once
+per resample; the vectorized version draws the null of every group size at once
+from the pooled values, in batches of resamples. Both estimate the same p-values,
+so they must agree up to Monte Carlo error. The loop is timed on a few resamples
+and extrapolated. The benchmark fails if the p-values disagree or if the vectorized
+version is not at least 10x faster.
+
+A second case has a few large groups (a group and its complement both above an
+eighth of the rows, e.g. two groups over a million rows), which cannot use draws of
+distinct rows. It is compared with shuffling the whole column once per resample and
+fails if the vectorized version is not at least 3x faster or if the p-values disagree.
+
+Usage:
+    python benchmarks/bench_significance.py [n_rows] [n_groups] [n_resamples] [n_jobs] [large_rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Permite rodar o benchmark da raiz do repositório sem instalar o pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bias_detection_toolkit.significance import group_pvalues
+
+
+def make_data(n_rows, n_groups, seed=42):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, n_groups, n_rows)
+    values = rng.normal(size=n_rows)
+    # Alguns grupos com deslocamento real
+    values[codes < max(1, n_groups // 100)] += 0.3
+    return values, codes
+
+
+def loop_pvalues(values, codes, n_resamples, seed=0):
+    rng = np.random.default_rng(seed)
+    series = pd.Series(values)
+    observed = (series.groupby(codes).mean() - values.mean()).abs().to_numpy()
+    exceedances = np.zeros(len(observed))
+    for _ in range(n_resamples):
+        resampled = (series.groupby(rng.permutation(codes)).mean() - values.mean()).abs().to_numpy()
+        exceedances += resampled >= observed * (1 - 1e-9)
+    return (1 + exceedances) / (1 + n_resamples)
+
+
+def shuffle_pvalues(values, codes, n_resamples, seed=0):
+    """Shuffles the whole column once per resample; the rows are sorted by group so each group is a slice."""
+    rng = np.random.default_rng(seed)
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    sizes = np.diff(np.r_[starts, len(values)])
+    observed = np.abs(np.add.reduceat(values[order], starts) / sizes - values.mean())
+    exceedances = np.zeros(len(starts))
+    for _ in range(n_resamples):
+        resampled = np.abs(np.add.reduceat(rng.permutation(values), starts) / sizes - values.mean())
+        exceedances += resampled >= observed * (1 - 1e-9)
+    return (1 + exceedances) / (1 + n_resamples)
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_groups = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    n_resamples = int(sys.argv[3]) if len(sys.argv) > 3 else 5_000
+    n_jobs = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    large_rows = int(sys.argv[5]) if len(sys.argv) > 5 else 1_000_000
+
+    values, codes = make_data(n_rows, n_groups)
+
+    probe = 20
+    start = time.perf_counter()
+    loop_pvalues(values, codes, probe)
+    loop_time = (time.perf_counter() - start) / probe * n_resamples
+
+    start = time.perf_counter()
+    vectorized = group_pvalues(values, codes, n_groups, n_resamples=n_resamples, n_jobs=n_jobs, seed=0)
+    vectorized_time = time.perf_counter() - start
+
+    # Referência com menos reamostragens em um recorte pequeno, para conferir os p-valores
+    small = codes < 50
+    small_codes, small_values = codes[small], values[small]
+    reference = loop_pvalues(small_values, small_codes, 4_000)
+    check = group_pvalues(small_values, small_codes, 50, n_resamples=4_000, seed=0)
+    max_error = np.abs(reference - check).max()
+
+    print(f"rows={n_rows} groups={n_groups} resamples={n_resamples} n_jobs={n_jobs}")
+    print(f"pandas loop (extrapolated): {loop_time:.1f}s")
+    print(f"vectorized:                 {vectorized_time:.1f}s ({loop_time / vectorized_time:.0f}x faster)")
+    print(f"max |p loop - p vectorized| on {small.sum()} rows / 50 groups: {max_error:.3f}")
+    failures = []
+    if max_error > 0.06:
+        failures.append("vectorized p-values disagree with the loop")
+    if loop_time / vectorized_time < 10:
+        failures.append("vectorized p-values are not clearly faster than the loop")
+
+    # Grupos grandes: duas metades desiguais de large_rows linhas, 200 reamostragens
+    rng = np.random.default_rng(7)
+    large_codes = (rng.random(large_rows) < 0.4).astype(np.int64)
+    large_values = rng.normal(size=large_rows) + 0.002 * large_codes
+    start = time.perf_counter()
+    shuffled = shuffle_pvalues(large_values, large_codes, 200)
+    shuffle_time = time.perf_counter() - start
+    start = time.perf_counter()
+    large = group_pvalues(large_values, large_codes, 2, n_resamples=200, n_jobs=n_jobs, seed=0)
+    large_time = time.perf_counter() - start
+    large_error = np.abs(shuffled - large).max()
+    print(f"large groups: rows={large_rows} groups=2 resamples=200")
+    print(f"full shuffle per resample:  {shuffle_time:.1f}s")
+    print(f"vectorized:                 {large_time:.1f}s ({shuffle_time / large_time:.1f}x faster)")
+    print(f"max |p shuffle - p vectorized|: {large_error:.3f}")
+    if large_error > 0.15:
+        failures.append("large-group p-values disagree with the full shuffle")
+    if shuffle_time / large_time < 3:
+        failures.append("large groups are not clearly faster than shuffling the whole column")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
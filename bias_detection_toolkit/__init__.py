@@ -0,0 +1,90 @@
+"""
+Module: bias_detection_toolkit
+
+Every detector and shared utility is exposed at package level, but its module is
+only imported on first access (PEP 562), so `import bias_detection_toolkit` stays
+cheap and a pure-pandas detector never loads sklearn, scipy or the NLP stack.
+
+Functions:
+    available_detectors - names of the registered detectors.
+    get_detector - detector class by name.
+"""
+
+import importlib
+
+__version__ = '0.1.0'
+
+# Nome público -> módulo que o define
+_DETECTORS = {
+    'ArtificialResultImprovementDetector': 'artificial_result_improvement_detector',
+    'AuditDocumentationFraudDetector': 'audit_documentation_fraud_detector',
+    'CausalMatrixDecompositionDetector': 'causal_matrix_decomposition_detector',
+    'ChronicDriftDetector': 'chronic_drift_detector',
+    'ConstraintQueueShiftDetector': 'constraint_queue_shift_detector',
+    'ContextualInputVariationDetector': 'contextual_input_variation_detector',
+    'DownstreamVariableShadowingDetector': 'downstream_variable_shadowing_detector',
+    'EmbeddedSocialLearningEffectDetector': 'embedded_social_learning_effect_detector',
+    'ExplainableOutlierWithHiddenCauseDetector': 'explainable_outlier_with_hidden_cause_detector',
+    'ManualDataForgeryDetector': 'manual_data_forgery_detector',
+    'MaskedFeedbackBiasDetector': 'masked_feedback_bias_detector',
+    'MultilevelBiasTaggerNLP': 'bias_tagging_multilevel',
+    'RangeDriftWithoutBreachDetector': 'range_drift_without_breach_detector',
+    'ResultDependentNoiseDetector': 'result_dependent_noise_detector',
+    'SelectionBiasOrMalintentDetector': 'selection_bias_or_malintent_detector',
+    'SocialEngineeringBehaviorChangeDetector': 'social_engineering_behavior_change_detector',
+    'SocialEngineeringIgnoredDataDetector': 'social_engineering_ignored_data_detector',
+    'SpuriousCorrelationDetector': 'spurious_correlation_detector',
+    'StreamingAuditDocumentationFraudDetector': 'audit_documentation_fraud_detector',
+    'StreamingChronicDriftDetector': 'chronic_drift_detector',
+    'SyntheticDataFormulaDetector': 'synthetic_data_formula_detector',
+    'TheoryOfConstraintsVariableDetector': 'theory_of_constraints_variable_detector',
+    'TraumaAdaptiveSourceDetector': 'trauma_adaptive_source_detector',
+    'TriggerPatternDisruptionDetector': 'trigger_pattern_disruption_detector',
+}
+
+_UTILITIES = {
+    'ChunkedAggregates': 'chunked_statistics',
+    'ColumnarReport': 'columnar_report',
+    'CorrelationEngine': 'correlation_engine',
+    'CountSketch': 'sketches',
+    'DetectionSuite': 'detection_suite',
+    'DetectorSpec': 'detection_suite',
+    'FileTailSource': 'audit_documentation_fraud_detector',
+    'KLLSketch': 'sketches',
+    'MisraGriesSketch': 'sketches',
+    'QueueSource': 'audit_documentation_fraud_detector',
+    'ReservoirSample': 'sketches',
+    'SampledAggregates': 'sampled_statistics',
+    'StatisticsProvider': 'statistics_provider',
+    'StratifiedSample': 'sampled_statistics',
+}
+
+_LAZY_ATTRIBUTES = dict(_DETECTORS, **_UTILITIES)
+
+__all__ = sorted(_LAZY_ATTRIBUTES) + ['available_detectors', 'get_detector']
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    module = importlib.import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__)
+    value = getattr(module, name)
+    # Guarda no namespace do pacote: os próximos acessos não passam por __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def available_detectors() -> list:
+    """Names of every registered detector, without importing any of them."""
+    return sorted(_DETECTORS)
+
+
+def get_detector(name: str):
+    """Detector class registered under name; its module is imported on demand."""
+    if name not in _DETECTORS:
+        raise ValueError(f"Unknown detector '{name}'. Choose from {available_detectors()}")
+    return __getattr__(name)
@@ -4,31 +4,165 @@ ArtificialResultImprovementDetector
 Detecta melhorias artificiais nos resultados dos dados que não possuem causa raiz válida (e.g., devido a mudanças externas como políticas temporárias ou crédito emergencial).
 """
 
+import numpy as np
 import pandas as pd
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
 class ArtificialResultImprovementDetector:
-    def __init__(self, data, result_col, date_col):
+    # Custo relativo para o DetectionSuite: conversão de datas e médias móveis por série
+    COST_HINT = 5.0
+
+    def __init__(self, data, result_col, date_col, group_col=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados (pode ser vazio quando se usa apenas partial_fit)
         result_col: coluna de resultados (e.g., pagamentos, aprovações)
         date_col: coluna de datas para analisar mudanças ao longo do tempo
+        group_col: opcional, coluna que identifica cada série (e.g., filial, produto);
+                   cada série tem suas próprias médias mensais, médias móveis e limiar
         """
         self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
         self.result_col = result_col
         self.date_col = date_col
+        self.group_col = group_col
+        self._state = None
 
     def analyze(self):
-        improvement_report = []
-        self.data[self.date_col] = pd.to_datetime(self.data[self.date_col])
-        monthly_means = self.data.groupby(self.data[self.date_col].dt.to_period('M'))[self.result_col].mean()
-        rolling_mean = monthly_means.rolling(window=3).mean()
-
-        for period, value in monthly_means.iteritems():
-            if rolling_mean.loc[period] and abs(value - rolling_mean.loc[period]) > (rolling_mean.std() * 1.5):
-                improvement_report.append({
-                    "period": str(period),
-                    "value": value,
-                    "artificial_improvement_suspected": True
-                })
-
-        return improvement_report
+        # Converte as datas sem alterar o DataFrame recebido
+        periods = pd.to_datetime(self.data[self.date_col]).dt.to_period('M')
+        if self.group_col is None:
+            monthly_means = self.data.groupby(periods)[self.result_col].mean()
+            rolling_mean = monthly_means.rolling(window=3).mean()
+            threshold = rolling_mean.std() * 1.5
+        else:
+            # Todas as séries de uma vez: médias móveis e limiares calculados dentro de cada grupo
+            monthly_means = self.data.groupby([self.data[self.group_col], periods])[self.result_col].mean()
+            rolling_mean = monthly_means.groupby(level=0).rolling(window=3).mean().droplevel(0)
+            threshold = (rolling_mean.groupby(level=0).transform('std') * 1.5).to_numpy()
+
+        # Meses sem média móvel (NaN) entram no teste; média móvel igual a zero é ignorada
+        rolling = rolling_mean.to_numpy()
+        values = monthly_means.to_numpy()
+        flagged = (rolling != 0) & (np.abs(values - rolling) > threshold)
+
+        if self.group_col is None:
+            return ColumnarReport({
+                "period": monthly_means.index[flagged].astype(str),
+                "value": values[flagged],
+                "artificial_improvement_suspected": True
+            })
+        return ColumnarReport({
+            "group": monthly_means.index.get_level_values(0)[flagged],
+            "period": monthly_means.index.get_level_values(1)[flagged].astype(str),
+            "value": values[flagged],
+            "artificial_improvement_suspected": True
+        })
+
+    def partial_fit(self, batch):
+        """
+        Modo incremental: acumula um novo lote de linhas (meses em ordem crescente por série;
+        o mês mais recente pode chegar em partes) e avalia apenas os meses tocados pelo lote,
+        com o mesmo critério de analyze() sobre todos os dados vistos até agora. O estado
+        guarda, por série, as somas do mês corrente, as duas médias mensais anteriores e
+        contagem/média/M2 (Welford) das médias móveis: cada mês novo custa O(séries).
+
+        Retorna um ColumnarReport com os meses suspeitos do lote.
+        """
+        batch = batch if isinstance(batch, pd.DataFrame) else pd.DataFrame(batch)
+        periods = pd.to_datetime(batch[self.date_col]).dt.to_period('M').array.asi8
+        dated = periods != np.iinfo(np.int64).min
+        keys = batch[self.group_col].to_numpy()[dated] if self.group_col is not None else np.zeros(dated.sum(), dtype=np.int8)
+        monthly = batch[self.result_col][dated].groupby([keys, periods[dated]]).agg(['sum', 'count'])
+        rows = self._state_rows(monthly.index.get_level_values(0))
+        month_ordinals = monthly.index.get_level_values(1).to_numpy()
+
+        evaluated = []
+        for period in np.unique(month_ordinals):
+            in_period = month_ordinals == period
+            idx = rows[in_period]
+            evaluated.append(self._advance(idx, period, monthly['sum'].to_numpy()[in_period],
+                                           monthly['count'].to_numpy()[in_period]))
+
+        if evaluated:
+            idx, period, value, flagged = (np.concatenate(parts) for parts in zip(*evaluated))
+        else:
+            idx, period, value, flagged = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+                                           np.empty(0), np.empty(0, dtype=bool))
+        report = {
+            "period": pd.arrays.PeriodArray(period[flagged], dtype=pd.PeriodDtype('M')).astype(str),
+            "value": value[flagged],
+            "artificial_improvement_suspected": True
+        }
+        if self.group_col is not None:
+            report = {"group": self._state['groups'][idx[flagged]], **report}
+        return ColumnarReport(report)
+
+    def _state_rows(self, keys) -> np.ndarray:
+        """Linha do estado de cada chave de série, criando as séries novas."""
+        if self._state is None:
+            self._state = {'groups': pd.Index([])}
+            for name in ('period', 'months'):
+                self._state[name] = np.empty(0, dtype=np.int64)
+            for name in ('sum', 'count', 'prev_1', 'prev_2', 'roll_count', 'roll_mean', 'roll_m2'):
+                self._state[name] = np.empty(0)
+
+        state = self._state
+        new_groups = pd.Index(keys).unique().difference(state['groups'], sort=False)
+        if len(new_groups):
+            n_new = len(new_groups)
+            state['groups'] = state['groups'].append(new_groups)
+            state['period'] = np.concatenate([state['period'], np.full(n_new, np.iinfo(np.int64).min)])
+            state['months'] = np.concatenate([state['months'], np.zeros(n_new, dtype=np.int64)])
+            for name in ('sum', 'count', 'roll_count', 'roll_mean', 'roll_m2'):
+                state[name] = np.concatenate([state[name], np.zeros(n_new)])
+            for name in ('prev_1', 'prev_2'):
+                state[name] = np.concatenate([state[name], np.full(n_new, np.nan)])
+        return state['groups'].get_indexer(keys)
+
+    def _advance(self, idx, period, sums, counts):
+        """Soma um mês às séries idx e avalia o mês mais recente de cada uma."""
+        state = self._state
+        if (period < state['period'][idx]).any():
+            raise ValueError("partial_fit expects the months of each series in increasing order")
+
+        moving = idx[period > state['period'][idx]]
+        if len(moving):
+            # Fecha o mês anterior: sua média móvel entra nas estatísticas e as médias deslizam
+            with np.errstate(invalid='ignore', divide='ignore'):
+                closed_mean = state['sum'][moving] / state['count'][moving]
+            closed_rolling = self._rolling(moving, closed_mean)
+            count, mean, m2 = self._with_rolling(moving, closed_rolling)
+            state['roll_count'][moving], state['roll_mean'][moving], state['roll_m2'][moving] = count, mean, m2
+            state['prev_2'][moving] = state['prev_1'][moving]
+            state['prev_1'][moving] = closed_mean
+            state['sum'][moving] = 0.0
+            state['count'][moving] = 0.0
+            state['period'][moving] = period
+            state['months'][moving] += 1
+
+        state['sum'][idx] += sums
+        state['count'][idx] += counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value = state['sum'][idx] / state['count'][idx]
+            rolling = self._rolling(idx, value)
+            count, _, m2 = self._with_rolling(idx, rolling)
+            threshold = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan) * 1.5
+        flagged = (rolling != 0) & (np.abs(value - rolling) > threshold)
+        return idx, np.full(len(idx), period, dtype=np.int64), value, flagged
+
+    def _rolling(self, idx, value):
+        """Média móvel de 3 meses terminando no mês corrente (NaN com menos de 3 meses)."""
+        state = self._state
+        return np.where(state['months'][idx] >= 3, (state['prev_2'][idx] + state['prev_1'][idx] + value) / 3, np.nan)
+
+    def _with_rolling(self, idx, rolling):
+        """Contagem, média e M2 (Welford) das médias móveis das séries idx, incluindo rolling quando não é NaN."""
+        state = self._state
+        count, mean, m2 = state['roll_count'][idx], state['roll_mean'][idx], state['roll_m2'][idx]
+        valid = ~np.isnan(rolling)
+        new_count = count + valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(valid, rolling - mean, 0.0)
+            new_mean = np.where(valid, mean + delta / new_count, mean)
+            new_m2 = np.where(valid, m2 + delta * (rolling - new_mean), m2)
+        return new_count, new_mean, new_m2
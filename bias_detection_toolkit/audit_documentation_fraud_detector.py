@@ -4,8 +4,17 @@ AuditDocumentationFraudDetector
 Detecta possíveis fraudes em documentos criados para validação de processos (e.g., documentação perfeita demais ou forjada para auditorias).
 """
 
+import asyncio
+import inspect
+import json
+import math
+import time
+from collections import OrderedDict
+
 import pandas as pd
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
 class AuditDocumentationFraudDetector:
     def __init__(self, data, doc_quality_col, timestamp_col):
         """
@@ -18,14 +27,198 @@ class AuditDocumentationFraudDetector:
         self.timestamp_col = timestamp_col
 
     def analyze(self):
-        fraud_suspects = []
-        sudden_spikes = self.data[self.doc_quality_col].diff().abs() > (self.data[self.doc_quality_col].std() * 2)
-        for idx, spike in sudden_spikes.items():
-            if spike:
-                fraud_suspects.append({
-                    "index": idx,
-                    "timestamp": self.data.loc[idx, self.timestamp_col],
-                    "doc_quality": self.data.loc[idx, self.doc_quality_col],
+        quality = self.data[self.doc_quality_col]
+        sudden_spikes = (quality.diff().abs() > (quality.std() * 2)).to_numpy()
+        return ColumnarReport({
+            "index": self.data.index[sudden_spikes],
+            "timestamp": self.data[self.timestamp_col][sudden_spikes],
+            "doc_quality": quality[sudden_spikes],
+            "fraud_pattern_suspected": True
+        })
+
+
+class StreamingAuditDocumentationFraudDetector:
+    """
+    Versão online do AuditDocumentationFraudDetector: mantém, por chave (autor, documento),
+    o último valor de qualidade e média/variância acumuladas (Welford), e marca um evento
+    quando o salto em relação ao evento anterior da mesma chave passa de std_factor vezes
+    o desvio padrão dos valores anteriores dessa chave. Custo O(1) por evento; a memória é
+    limitada às chaves ativas (TTL e max_keys).
+    """
+
+    def __init__(self, doc_quality_col, timestamp_col, key_col=None, std_factor=2.0,
+                 ttl=None, max_keys=None, clock=time.monotonic):
+        """
+        doc_quality_col: campo do evento com a qualidade/documentação
+        timestamp_col: campo do evento com data/hora de criação ou modificação
+        key_col: opcional, campo que define a linha de base (e.g., autor, documento);
+                 sem ele todos os eventos compartilham uma única linha de base
+        std_factor: múltiplo do desvio padrão que caracteriza um salto (2, como em analyze)
+        ttl: opcional, segundos sem eventos após os quais o estado de uma chave é descartado
+        max_keys: opcional, número máximo de chaves; a menos recente é descartada ao exceder
+        clock: função que retorna o tempo atual em segundos (usada pelo TTL)
+        """
+        self.doc_quality_col = doc_quality_col
+        self.timestamp_col = timestamp_col
+        self.key_col = key_col
+        self.std_factor = std_factor
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.clock = clock
+        # chave -> [contagem, média, M2, último valor, último acesso], da menos para a mais recente
+        self._states = OrderedDict()
+        self.events_seen = 0
+        self.evicted_keys = 0
+
+    def update(self, event):
+        """Processa um evento (dict ou Series); retorna o registro do salto ou None."""
+        now = self.clock()
+        self._evict(now)
+        key = event[self.key_col] if self.key_col is not None else None
+        value = float(event[self.doc_quality_col])
+        self.events_seen += 1
+
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = [0, 0.0, 0.0, math.nan, now]
+            if self.max_keys is not None and len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+                self.evicted_keys += 1
+        else:
+            self._states.move_to_end(key)
+
+        count, mean, m2, last_value = state[0], state[1], state[2], state[3]
+        record = None
+        if count >= 2 and not math.isnan(value):
+            std = math.sqrt(m2 / (count - 1))
+            if abs(value - last_value) > std * self.std_factor:
+                record = {
+                    "timestamp": event[self.timestamp_col],
+                    "doc_quality": value,
                     "fraud_pattern_suspected": True
-                })
-        return fraud_suspects
+                }
+                if self.key_col is not None:
+                    record = {"key": key, **record}
+
+        if not math.isnan(value):
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        state[0], state[1], state[2], state[3], state[4] = count, mean, m2, value, now
+        return record
+
+    def process_batch(self, events) -> ColumnarReport:
+        """Processa um micro-lote (lista de eventos ou DataFrame) e retorna os saltos encontrados."""
+        if isinstance(events, pd.DataFrame):
+            columns = list(events.columns)
+            events = (dict(zip(columns, row)) for row in zip(*(events[col].tolist() for col in columns)))
+        records = [record for record in map(self.update, events) if record is not None]
+        fields = (["key"] if self.key_col is not None else []) + ["timestamp", "doc_quality", "fraud_pattern_suspected"]
+        return ColumnarReport.from_records(records, fields)
+
+    async def consume(self, source, on_report=None) -> int:
+        """
+        Consome uma fonte assíncrona de micro-lotes (qualquer iterável assíncrono de listas
+        de eventos, e.g. QueueSource ou FileTailSource) até ela terminar. on_report (função
+        comum ou corrotina) recebe o ColumnarReport de cada lote com saltos.
+        Retorna o número de eventos processados.
+        """
+        processed = 0
+        async for batch in source:
+            report = self.process_batch(batch)
+            processed += len(batch)
+            if len(report) and on_report is not None:
+                result = on_report(report)
+                if inspect.isawaitable(result):
+                    await result
+        return processed
+
+    @property
+    def active_keys(self) -> int:
+        return len(self._states)
+
+    def _evict(self, now):
+        if self.ttl is None:
+            return
+        # As chaves estão em ordem de último acesso: basta olhar o início
+        while self._states:
+            key, state = next(iter(self._states.items()))
+            if now - state[4] <= self.ttl:
+                break
+            del self._states[key]
+            self.evicted_keys += 1
+
+
+class QueueSource:
+    """Fonte assíncrona sobre uma asyncio.Queue de eventos; termina ao receber o sentinela."""
+
+    def __init__(self, queue: asyncio.Queue, max_batch: int = 256, sentinel=None):
+        self.queue = queue
+        self.max_batch = max_batch
+        self.sentinel = sentinel
+
+    async def __aiter__(self):
+        finished = False
+        while not finished:
+            # Espera o primeiro evento e junta ao lote o que já estiver na fila
+            batch = []
+            event = await self.queue.get()
+            while True:
+                if event is self.sentinel:
+                    finished = True
+                    break
+                batch.append(event)
+                if len(batch) >= self.max_batch or self.queue.empty():
+                    break
+                event = self.queue.get_nowait()
+            if batch:
+                yield batch
+
+
+class FileTailSource:
+    """
+    Fonte assíncrona que acompanha um arquivo de eventos, uma linha por evento (JSON por
+    padrão), como `tail -f`. Termina após idle_timeout segundos sem linhas novas
+    (None = nunca) ou quando stop() é chamado.
+    """
+
+    def __init__(self, path, parse=json.loads, max_batch: int = 256, poll_interval: float = 0.5,
+                 idle_timeout: float = None, from_start: bool = True):
+        self.path = path
+        self.parse = parse
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.from_start = from_start
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    async def __aiter__(self):
+        with open(self.path, 'r', encoding='utf-8') as handle:
+            if not self.from_start:
+                handle.seek(0, 2)
+            pending, idle = '', 0.0
+            while not self._stopped:
+                batch = []
+                while len(batch) < self.max_batch:
+                    chunk = handle.readline()
+                    if not chunk:
+                        break
+                    pending += chunk
+                    # Linha ainda sendo escrita: espera o restante
+                    if not pending.endswith('\n'):
+                        continue
+                    if pending.strip():
+                        batch.append(self.parse(pending))
+                    pending = ''
+                if batch:
+                    idle = 0.0
+                    yield batch
+                    continue
+                if self.idle_timeout is not None and idle >= self.idle_timeout:
+                    break
+                await asyncio.sleep(self.poll_interval)
+                idle += self.poll_interval
@@ -7,84 +7,519 @@ Performs 3-level tagging of input responses or data points using advanced NLP mo
 Author: Edenilson Brandl
 """
 
-import spacy
-import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from typing import Dict, List
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
 import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Model configuration per startup profile. "lexicon" loads no models: level 1 keeps only
+# the regex tags and level 2 matches lowercase surface words instead of spaCy lemmas.
+TAGGER_PROFILES = {
+    "full": {
+        "spacy_model": "en_core_web_trf",
+        "emotion_model": "j-hartmann/emotion-english-distilroberta-base",
+        "bias_model": "unitary/toxic-bert",
+    },
+    "small": {
+        "spacy_model": "en_core_web_sm",
+        "emotion_model": "j-hartmann/emotion-english-distilroberta-base",
+        "bias_model": "unitary/toxic-bert",
+    },
+    "lexicon": {
+        "spacy_model": None,
+        "emotion_model": None,
+        "bias_model": None,
+    },
+}
+
+
+def _load_spacy(name: str):
+    import spacy
+    return spacy.load(name)
+
+
+def _load_emotion_pipe(name: str):
+    from transformers import pipeline
+    return pipeline("text-classification", model=name, top_k=3)
+
+
+def _load_bias_pipe(name: str):
+    from transformers import pipeline
+    return pipeline("text-classification", model=name)
+
+
+_MODEL_LOADERS = {
+    "spacy_model": _load_spacy,
+    "emotion_model": _load_emotion_pipe,
+    "bias_model": _load_bias_pipe,
+}
+
+# Process-wide registry: every tagger instance (and workers forked after loading) share one copy
+_MODEL_REGISTRY = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+
+
+def get_shared_model(kind: str, name: str):
+    """Returns the process-wide instance of a model, loading it on first use."""
+    key = (kind, name)
+    with _MODEL_REGISTRY_LOCK:
+        if key not in _MODEL_REGISTRY:
+            _MODEL_REGISTRY[key] = _MODEL_LOADERS[kind](name)
+        return _MODEL_REGISTRY[key]
+
+
+def clear_model_registry():
+    """Drops every shared model so its memory can be released."""
+    with _MODEL_REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
+
+def _score_list(result) -> List[dict]:
+    """Normalizes a text-classification output for one text to a list of {label, score}."""
+    if isinstance(result, dict):
+        return [result]
+    if result and isinstance(result[0], list):
+        return result[0]
+    return list(result)
+
+
+# Keyword lexicons per level. Levels 1 and 3 match anywhere in the text, ignoring case;
+# level 2 matches whole (non-stop-word) lemmas.
+LEVEL_1_KEYWORDS = {
+    "information_noise_or_telephone_effect": ["confused", "misremember", "foggy", "vague", "unsure"],
+    "neurological_insufficiency": ["brain", "amygdala", "neuro", "frontal", "dopamine", "impulse", "neurological"],
+}
+
+LEVEL_2_LEMMAS = {
+    "scientific_basis": ["science", "experiment", "empirical", "research"],
+    "personal_experience": ["experience", "memory", "feel", "believe"],
+    "behaviorist_conditioning": ["punish", "reward", "training", "conditioning"],
+    "neurological_denotation": ["brain", "dopamine", "cortex"],
+    "connotative_thought": ["symbol", "imply", "metaphor"],
+    "denotative_thought": ["literal", "concrete", "exact"],
+}
+
+LEVEL_3_KEYWORDS = {
+    "pseudoscience_influence": ["astrology", "chakras", "energy_field", "detox", "homeopathy", "quantum_healing"],
+}
+
+
+class LexiconMatcher:
+    """
+    Matches the keywords of many tag rules in one pass and returns the triggered tags
+    in rule order.
+
+    In the default mode keywords match anywhere in the text, ignoring case, through a
+    single compiled regex; whole_tokens=True matches a sequence of tokens (e.g. lemmas)
+    exactly through one dict lookup per distinct token. Adding keywords only marks the
+    matcher for recompilation, so matching cost does not grow with the number of rules.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Iterable[str]]] = None, whole_tokens: bool = False):
+        self.whole_tokens = whole_tokens
+        self._rules = OrderedDict()
+        self._compiled = None
+        for tag, keywords in (rules or {}).items():
+            self.add_keywords(tag, keywords)
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self._rules)
+
+    def add_keywords(self, tag: str, keywords: Iterable[str]):
+        self._rules.setdefault(tag, []).extend(k.lower() for k in keywords)
+        self._compiled = None
+
+    def fingerprint(self) -> str:
+        return hashlib.sha256(json.dumps(list(self._rules.items())).encode("utf-8")).hexdigest()[:16]
+
+    def match(self, text_or_tokens) -> List[str]:
+        keyword_tags, pattern = self._compile()
+        if self.whole_tokens:
+            found = set()
+            for token in set(text_or_tokens):
+                found.update(keyword_tags.get(token, ()))
+        else:
+            found = self._tags_for(pattern.findall(text_or_tokens.lower()) if pattern else [])
+        return [tag for tag in self._rules if tag in found]
+
+    def match_series(self, texts):
+        """Vectorized match over a pandas Series of texts; returns a Series of tag lists."""
+        if self.whole_tokens:
+            return texts.map(self.match)
+        _, pattern = self._compile()
+        if pattern is None:
+            return texts.map(lambda _: [])
+        found = texts.fillna("").astype(str).str.lower().str.findall(pattern).map(self._tags_for)
+        return found.map(lambda tags: [tag for tag in self._rules if tag in tags])
+
+    def _tags_for(self, keywords: List[str]) -> set:
+        keyword_tags = self._compiled[0]
+        found = set()
+        for keyword in set(keywords):
+            found.update(keyword_tags[keyword])
+        return found
+
+    def _compile(self):
+        if self._compiled is not None:
+            return self._compiled
+
+        keyword_tags = {}
+        for tag, keywords in self._rules.items():
+            for keyword in keywords:
+                keyword_tags.setdefault(keyword, set()).add(tag)
+
+        pattern = None
+        if not self.whole_tokens and keyword_tags:
+            # A zero-width lookahead tries every position; longest keywords come first, so
+            # the match at a position also implies every keyword that is a prefix of it.
+            keywords = sorted(keyword_tags, key=len, reverse=True)
+            keyword_tags = {
+                keyword: set().union(*(keyword_tags[k] for k in keywords if keyword.startswith(k)))
+                for keyword in keywords
+            }
+            pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))")
+
+        self._compiled = (keyword_tags, pattern)
+        return self._compiled
+
+
+# Bump whenever the tagging rules change so cached results from older versions are not reused
+TAGGER_CACHE_VERSION = 1
+
+
+class TaggerResultCache:
+    """
+    Result cache for MultilevelBiasTaggerNLP: an in-memory LRU in front of an optional
+    SQLite store, so repeated runs over the same corpus only tag new texts.
+
+    max_entries: LRU size limit
+    path: optional SQLite file for results persisted across runs
+    max_disk_entries: optional limit for the SQLite store; entries read or written
+                      least recently on disk are evicted first
+    """
+
+    def __init__(self, max_entries: int = 100_000, path: Optional[str] = None,
+                 max_disk_entries: Optional[int] = None, commit_every: int = 1000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.commit_every = commit_every
+        self._memory = OrderedDict()
+        self._pending_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tag_results "
+                "(key TEXT PRIMARY KEY, result TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tag_results_access ON tag_results (last_access)")
+            self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode NFC with runs of whitespace collapsed; case is kept because the models are case-sensitive."""
+        return unicodedata.normalize("NFC", " ".join(text.split()))
+
+    def make_key(self, text: str, namespace: str) -> str:
+        payload = namespace + "\0" + self.normalize(text)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, List[str]]]:
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return _copy_result(result)
+
+        if self._conn is not None:
+            row = self._conn.execute("SELECT result FROM tag_results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE tag_results SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._after_write()
+                result = json.loads(row[0])
+                self._remember(key, result)
+                self.disk_hits += 1
+                return _copy_result(result)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, List[str]]):
+        result = _copy_result(result)
+        self._remember(key, result)
+        if self._conn is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tag_results (key, result, last_access) VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time())
+            )
+            self._after_write()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "memory_entries": len(self._memory),
+        }
+
+    def flush(self):
+        """Commits pending writes and applies the disk eviction limit."""
+        if self._conn is None:
+            return
+        if self.max_disk_entries is not None:
+            excess = self._conn.execute("SELECT COUNT(*) FROM tag_results").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM tag_results WHERE key IN "
+                    "(SELECT key FROM tag_results ORDER BY last_access LIMIT ?)", (excess,)
+                )
+                self.disk_evictions += excess
+        self._conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def _remember(self, key: str, result: Dict[str, List[str]]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _after_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.flush()
+
+
+def _copy_result(result: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    return {level: list(tags) for level, tags in result.items()}
+
 
 class MultilevelBiasTaggerNLP:
-    def __init__(self):
-        # Load NLP pipelines
-        self.nlp = spacy.load("en_core_web_trf")
+    def __init__(self, profile: str = "full", cache: Optional[TaggerResultCache] = None, **model_names):
+        """
+        profile: one of TAGGER_PROFILES ("full", "small" or "lexicon")
+        cache: optional TaggerResultCache consulted before running the models
+        model_names: optional overrides for spacy_model, emotion_model or bias_model
+                     (None disables that model)
 
-        # Load emotion classifier
-        self.emotion_pipe = pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", top_k=3)
+        Models are loaded lazily on first use and shared across instances.
+        """
+        if profile not in TAGGER_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Choose from {sorted(TAGGER_PROFILES)}")
+        unknown = set(model_names) - set(_MODEL_LOADERS)
+        if unknown:
+            raise ValueError(f"Unknown model options: {sorted(unknown)}")
+        self.profile = profile
+        self.model_names = dict(TAGGER_PROFILES[profile], **model_names)
+        self.cache = cache
 
-        # Load bias/political classifier
-        self.bias_pipe = pipeline("text-classification", model="unitary/toxic-bert")
+        # Each instance gets its own copy of the lexicons so runtime extensions stay local
+        self.keyword_matcher = LexiconMatcher({**LEVEL_1_KEYWORDS, **LEVEL_3_KEYWORDS})
+        self.lemma_matcher = LexiconMatcher(LEVEL_2_LEMMAS, whole_tokens=True)
+        self._keyword_levels = {1: list(LEVEL_1_KEYWORDS), 3: list(LEVEL_3_KEYWORDS)}
+
+    def _model(self, kind: str):
+        name = self.model_names[kind]
+        return get_shared_model(kind, name) if name is not None else None
+
+    @property
+    def nlp(self):
+        # NLP pipeline
+        return self._model("spacy_model")
+
+    @property
+    def emotion_pipe(self):
+        # Emotion classifier
+        return self._model("emotion_model")
+
+    @property
+    def bias_pipe(self):
+        # Bias/political classifier
+        return self._model("bias_model")
+
+    def preload(self) -> "MultilevelBiasTaggerNLP":
+        """
+        Loads every configured model now. Call it in the parent process before forking
+        workers so they share the loaded models instead of each loading its own.
+        """
+        for kind in _MODEL_LOADERS:
+            self._model(kind)
+        return self
+
+    @property
+    def _cache_namespace(self) -> str:
+        # Cache keys also cover the model configuration, rule version and lexicons
+        return json.dumps(dict(
+            self.model_names,
+            version=TAGGER_CACHE_VERSION,
+            keywords=self.keyword_matcher.fingerprint(),
+            lemmas=self.lemma_matcher.fingerprint()
+        ), sort_keys=True)
+
+    def add_keywords(self, tag: str, keywords: Iterable[str], level: int = 1):
+        """
+        Extends the lexicons at runtime. Levels 1 and 3 match keywords anywhere in the
+        text (case-insensitive); level 2 matches whole lemmas. New tags are reported
+        after the built-in ones of their level.
+        """
+        if level == 2:
+            self.lemma_matcher.add_keywords(tag, keywords)
+        elif level in self._keyword_levels:
+            self.keyword_matcher.add_keywords(tag, keywords)
+            if tag not in self._keyword_levels[level]:
+                self._keyword_levels[level].append(tag)
+        else:
+            raise ValueError("level must be 1, 2 or 3")
 
     def tag_level_1(self, text: str) -> List[str]:
+        emotion_pipe, bias_pipe = self.emotion_pipe, self.bias_pipe
+        return self._level_1_tags(
+            emotion_pipe(text) if emotion_pipe is not None else None,
+            bias_pipe(text) if bias_pipe is not None else None,
+            self.keyword_matcher.match(text)
+        )
+
+    def _level_1_tags(self, emotion_results, bias_result, keyword_tags: List[str]) -> List[str]:
         tags = []
-        emotion_results = self.emotion_pipe(text)
-        top_emotions = [r['label'] for r in emotion_results[0] if r['score'] > 0.5]
-        if any(e in top_emotions for e in ['anger', 'fear', 'sadness', 'disgust']):
-            tags.append("emotional_influence")
+        if emotion_results is not None:
+            top_emotions = [r['label'] for r in _score_list(emotion_results) if r['score'] > 0.5]
+            if any(e in top_emotions for e in ['anger', 'fear', 'sadness', 'disgust']):
+                tags.append("emotional_influence")
 
-        bias_result = self.bias_pipe(text)
-        if any(r['label'] == 'toxic' and r['score'] > 0.5 for r in bias_result):
+        if bias_result is not None and any(r['label'] == 'toxic' and r['score'] > 0.5
+                                           for r in _score_list(bias_result)):
             tags.append("cognitive_bias")
 
-        if re.search(r"confused|misremember|foggy|vague|unsure", text, re.IGNORECASE):
-            tags.append("information_noise_or_telephone_effect")
-
-        if re.search(r"brain|amygdala|neuro|frontal|dopamine|impulse|neurological", text, re.IGNORECASE):
-            tags.append("neurological_insufficiency")
-
+        tags.extend(tag for tag in keyword_tags if tag in self._keyword_levels[1])
         return tags
 
     def tag_level_2(self, text: str) -> List[str]:
-        tags = []
-        doc = self.nlp(text)
-        lemmas = [token.lemma_ for token in doc if not token.is_stop]
-
-        if any(l in lemmas for l in ["science", "experiment", "empirical", "research"]):
-            tags.append("scientific_basis")
-        if any(l in lemmas for l in ["experience", "memory", "feel", "believe"]):
-            tags.append("personal_experience")
-        if any(l in lemmas for l in ["punish", "reward", "training", "conditioning"]):
-            tags.append("behaviorist_conditioning")
-        if any(l in lemmas for l in ["brain", "dopamine", "cortex"]):
-            tags.append("neurological_denotation")
-        if any(l in lemmas for l in ["symbol", "imply", "metaphor"]):
-            tags.append("connotative_thought")
-        if any(l in lemmas for l in ["literal", "concrete", "exact"]):
-            tags.append("denotative_thought")
+        nlp = self.nlp
+        return self.lemma_matcher.match(self._lemmas(nlp(text) if nlp is not None else text))
 
-        return tags
+    @staticmethod
+    def _lemmas(parsed) -> List[str]:
+        # Without spaCy ("lexicon" profile), lowercase words stand in for lemmas
+        if isinstance(parsed, str):
+            return re.findall(r"[a-z]+", parsed.lower())
+        return [token.lemma_ for token in parsed if not token.is_stop]
 
     def tag_level_3(self, text: str, lvl1: List[str], lvl2: List[str]) -> List[str]:
+        return self._level_3_tags(lvl1, lvl2, self.keyword_matcher.match(text))
+
+    def _level_3_tags(self, lvl1: List[str], lvl2: List[str], keyword_tags: List[str]) -> List[str]:
         tags = []
-        doc = self.nlp(text.lower())
         if "cognitive_bias" in lvl1 and "personal_experience" in lvl2:
             tags.append("subpersonality_pattern")
         if "behaviorist_conditioning" in lvl2 and "emotional_influence" in lvl1:
             tags.append("social_engineering_influence")
         if "connotative_thought" in lvl2 and "information_noise_or_telephone_effect" in lvl1:
             tags.append("conceptual_dispersal")
-        if re.search(r"astrology|chakras|energy_field|detox|homeopathy|quantum_healing", text.lower()):
-            tags.append("pseudoscience_influence")
+        tags.extend(tag for tag in keyword_tags if tag in self._keyword_levels[3])
         return tags
 
     def analyze_text(self, text: str) -> Dict[str, List[str]]:
-        level1 = self.tag_level_1(text)
-        level2 = self.tag_level_2(text)
-        level3 = self.tag_level_3(text, level1, level2)
-        return {
+        if self.cache is not None:
+            key = self.cache.make_key(text, self._cache_namespace)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        emotion_pipe, bias_pipe, nlp = self.emotion_pipe, self.bias_pipe, self.nlp
+        keyword_tags = self.keyword_matcher.match(text)
+        level1 = self._level_1_tags(
+            emotion_pipe(text) if emotion_pipe is not None else None,
+            bias_pipe(text) if bias_pipe is not None else None,
+            keyword_tags
+        )
+        level2 = self.lemma_matcher.match(self._lemmas(nlp(text) if nlp is not None else text))
+        level3 = self._level_3_tags(level1, level2, keyword_tags)
+        result = {
             "Level 1 Tags": level1,
             "Level 2 Tags": level2,
             "Level 3 Tags": level3
         }
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def analyze_batch(self, texts: Iterable[str], batch_size: int = 32) -> List[Dict[str, List[str]]]:
+        """
+        Same result as analyze_text for each text, in input order. Texts are streamed
+        in chunks of batch_size through nlp.pipe and both transformer pipelines, and
+        each text is parsed by spaCy only once. With a cache, only texts not found in
+        it (deduplicated within the chunk) reach the models.
+        """
+        results = []
+        texts = iter(texts)
+        # O namespace (configuração e impressões digitais dos léxicos) é o mesmo para toda a chamada
+        namespace = self._cache_namespace if self.cache is not None else None
+        while True:
+            chunk = list(islice(texts, batch_size))
+            if not chunk:
+                break
+            if self.cache is None:
+                results.extend(self._analyze_chunk(chunk, batch_size))
+                continue
+
+            keys = [self.cache.make_key(text, namespace) for text in chunk]
+            # Uma consulta por chave distinta: textos repetidos no chunk contam um único acerto ou falta
+            texts_by_key = OrderedDict()
+            for key, text in zip(keys, chunk):
+                texts_by_key.setdefault(key, text)
+            found = {key: self.cache.get(key) for key in texts_by_key}
+            missing = [key for key, result in found.items() if result is None]
+            computed = self._analyze_chunk([texts_by_key[key] for key in missing], batch_size)
+            for key, result in zip(missing, computed):
+                self.cache.put(key, result)
+                found[key] = result
+            results.extend(_copy_result(found[key]) for key in keys)
+        return results
+
+    def _analyze_chunk(self, chunk: List[str], batch_size: int) -> List[Dict[str, List[str]]]:
+        if not chunk:
+            return []
+        results = []
+        nlp, emotion_pipe, bias_pipe = self.nlp, self.emotion_pipe, self.bias_pipe
+        docs = nlp.pipe(chunk, batch_size=batch_size) if nlp is not None else chunk
+        emotions = emotion_pipe(chunk, batch_size=batch_size) if emotion_pipe is not None else [None] * len(chunk)
+        biases = bias_pipe(chunk, batch_size=batch_size) if bias_pipe is not None else [None] * len(chunk)
+        for text, doc, emotion_results, bias_result in zip(chunk, docs, emotions, biases):
+            keyword_tags = self.keyword_matcher.match(text)
+            level1 = self._level_1_tags(emotion_results, bias_result, keyword_tags)
+            level2 = self.lemma_matcher.match(self._lemmas(doc))
+            level3 = self._level_3_tags(level1, level2, keyword_tags)
+            results.append({
+                "Level 1 Tags": level1,
+                "Level 2 Tags": level2,
+                "Level 3 Tags": level3
+            })
+        return results
 
 # Example usage:
 if __name__ == "__main__":
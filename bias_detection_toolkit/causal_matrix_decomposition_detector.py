@@ -9,37 +9,72 @@ Author: Edenilson Brandl
 
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+
+
+def _decompose_group(subset: np.ndarray, n_clusters: int, variance_threshold: float,
+                     incremental: bool, batch_size: int):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.decomposition import PCA, IncrementalPCA
+
+    if incremental:
+        # Grupos grandes: PCA e KMeans em mini-lotes para limitar memória e tempo
+        pca = IncrementalPCA(batch_size=max(batch_size, subset.shape[1]))
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=42)
+    else:
+        pca = PCA()
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+
+    transformed = pca.fit_transform(subset)
+    cumulative_variance = np.cumsum(pca.explained_variance_ratio_)
+
+    reduced_dims = np.argmax(cumulative_variance >= variance_threshold) + 1
+    reduced_data = transformed[:, :reduced_dims]
+
+    labels = kmeans.fit_predict(reduced_data)
+    return labels.astype(np.min_scalar_type(n_clusters - 1)), reduced_dims
+
 
 class CausalMatrixDecompositionDetector:
-    def __init__(self, n_clusters=2, variance_threshold=0.9):
+    def __init__(self, n_clusters=2, variance_threshold=0.9, n_jobs=1, incremental_threshold=100_000,
+                 batch_size=4096):
+        """
+        n_jobs: number of parallel workers for the per-group decompositions (-1 uses all cores)
+        incremental_threshold: groups with at least this many rows use IncrementalPCA + MiniBatchKMeans
+        batch_size: mini-batch size for the incremental path
+        """
         self.n_clusters = n_clusters
         self.variance_threshold = variance_threshold
+        self.n_jobs = n_jobs
+        self.incremental_threshold = incremental_threshold
+        self.batch_size = batch_size
 
     def analyze_output_variability(self, df: pd.DataFrame, input_cols: list, output_col: str) -> dict:
-        results = {}
-        grouped = df.groupby(output_col)
+        """
+        cluster_labels is a Series of compact integer labels indexed by the group's rows of df.
+        """
+        from joblib import Parallel, delayed
 
-        for value, group in grouped:
-            subset = group[input_cols]
-            if len(subset) < self.n_clusters * 2:
-                continue  # skip small groups
-
-            pca = PCA()
-            transformed = pca.fit_transform(subset)
-            cumulative_variance = np.cumsum(pca.explained_variance_ratio_)
+        results = {}
+        values = df[input_cols].to_numpy()
+        groups = [
+            (value, positions) for value, positions in df.groupby(output_col).indices.items()
+            if len(positions) >= self.n_clusters * 2  # skip small groups
+        ]
 
-            reduced_dims = np.argmax(cumulative_variance >= self.variance_threshold) + 1
-            reduced_data = transformed[:, :reduced_dims]
+        decompositions = Parallel(n_jobs=self.n_jobs)(
+            delayed(_decompose_group)(
+                values[positions], self.n_clusters, self.variance_threshold,
+                len(positions) >= self.incremental_threshold, self.batch_size
+            )
+            for _, positions in groups
+        )
 
-            kmeans = KMeans(n_clusters=self.n_clusters, random_state=42)
-            labels = kmeans.fit_predict(reduced_data)
+        for (value, positions), (labels, reduced_dims) in zip(groups, decompositions):
             group_result = {
-                'group_size': len(subset),
+                'group_size': len(positions),
                 'original_output': value,
                 'distinct_causal_clusters': len(np.unique(labels)),
-                'cluster_labels': labels.tolist(),
+                'cluster_labels': pd.Series(labels, index=df.index[positions], name='cluster'),
                 'reduced_dimensions_used': reduced_dims
             }
 
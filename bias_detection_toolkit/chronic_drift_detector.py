@@ -9,9 +9,29 @@ Author: Edenilson Brandl
 
 import pandas as pd
 import numpy as np
-from sklearn.decomposition import PCA
-from scipy.spatial.distance import euclidean
-from typing import List
+from typing import Dict, List, Mapping, Optional
+
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
+# Distâncias vetorizadas entre médias passadas e futuras (uma linha por janela)
+DRIFT_METRICS = {
+    'euclidean': lambda past, future: np.sqrt(np.sum((past - future) ** 2, axis=1)),
+    'sqeuclidean': lambda past, future: np.sum((past - future) ** 2, axis=1),
+    'cityblock': lambda past, future: np.sum(np.abs(past - future), axis=1),
+    'chebyshev': lambda past, future: np.max(np.abs(past - future), axis=1),
+    'cosine': lambda past, future: 1.0 - np.sum(past * future, axis=1) / (
+        np.linalg.norm(past, axis=1) * np.linalg.norm(future, axis=1)
+    ),
+}
+
+
+def _window_means(cum_sum: np.ndarray, cum_count: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """Per-window means over [start, stop) from cumulative sums, skipping NaN like pandas."""
+    sums = cum_sum[stop] - cum_sum[start]
+    counts = cum_count[stop] - cum_count[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
 
 class ChronicDriftDetector:
     def __init__(self, window_size=10, drift_threshold=0.3):
@@ -19,6 +39,8 @@ class ChronicDriftDetector:
         self.drift_threshold = drift_threshold
 
     def detect_drift(self, df: pd.DataFrame, features: List[str], time_col: str) -> List[dict]:
+        from scipy.spatial.distance import euclidean
+
         df_sorted = df.sort_values(time_col).reset_index(drop=True)
         drift_results = []
         for i in range(self.window_size, len(df_sorted) - self.window_size):
@@ -39,6 +61,181 @@ class ChronicDriftDetector:
 
         return drift_results
 
+    def detect_drift_fast(self, df: pd.DataFrame, features: List[str], time_col: str,
+                          metric: str = 'euclidean') -> ColumnarReport:
+        """
+        Same records as detect_drift, computed for every row at once from cumulative
+        sums instead of slicing two windows per row.
+        """
+        return self.sweep_window_sizes(df, features, time_col, [self.window_size], metric)[self.window_size]
+
+    def sweep_window_sizes(self, df: pd.DataFrame, features: List[str], time_col: str,
+                           window_sizes: List[int], metric: str = 'euclidean') -> Dict[int, ColumnarReport]:
+        """
+        Runs the vectorized drift scan for several window sizes over a single sort
+        of the data. Returns a dict mapping each window size to its drift report.
+        """
+        if metric not in DRIFT_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from {sorted(DRIFT_METRICS)}")
+        distance = DRIFT_METRICS[metric]
+
+        df_sorted = df.sort_values(time_col).reset_index(drop=True)
+        values = np.ascontiguousarray(df_sorted[features].to_numpy(dtype=np.float64))
+        observed = ~np.isnan(values)
+
+        n = len(values)
+        cum_sum = np.zeros((n + 1, len(features)))
+        cum_count = np.zeros((n + 1, len(features)))
+        np.cumsum(np.where(observed, values, 0.0), axis=0, out=cum_sum[1:])
+        np.cumsum(observed, axis=0, out=cum_count[1:])
+        times = df_sorted[time_col]
+
+        results = {}
+        for w in window_sizes:
+            idx = np.arange(w, max(n - w, w))
+            past_mean = _window_means(cum_sum, cum_count, idx - w, idx)
+            future_mean = _window_means(cum_sum, cum_count, idx, idx + w)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                drift = distance(past_mean, future_mean)
+
+            hits = idx[drift > self.drift_threshold]
+            results[w] = ColumnarReport({
+                'index': hits,
+                'time': times.iloc[hits],
+                'drift_score': np.round(drift[drift > self.drift_threshold], 4),
+            })
+
+        return results
+
+
+class StreamingChronicDriftDetector:
+    """
+    Online counterpart of ChronicDriftDetector.
+
+    Keeps only the last 2 * window_size observations in a ring buffer together with
+    running sums of the past and future windows, so each new observation is scored
+    in O(k) for k features. Observations must arrive in time order. Index i is scored
+    as soon as its future window is full, which includes the last index that the
+    batch loop in ChronicDriftDetector.detect_drift stops short of.
+    """
+
+    def __init__(self, features: List[str], time_col: str, window_size=10, drift_threshold=0.3,
+                 metric: str = 'euclidean'):
+        if metric not in DRIFT_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from {sorted(DRIFT_METRICS)}")
+        self.features = list(features)
+        self.time_col = time_col
+        self.window_size = window_size
+        self.drift_threshold = drift_threshold
+        self.metric = metric
+
+        size = 2 * window_size
+        self._values = np.zeros((size, len(self.features)))
+        self._observed = np.zeros((size, len(self.features)), dtype=bool)
+        self._times = [None] * size
+        self._seen = 0
+        self._resync()
+
+    def update(self, row: Mapping) -> Optional[dict]:
+        """Adds one observation (dict or Series) and returns its drift record, if any."""
+        values = np.array([row[f] for f in self.features], dtype=np.float64)
+        return self._push(values, row[self.time_col])
+
+    def partial_fit(self, batch: pd.DataFrame) -> List[dict]:
+        """Feeds a batch of new observations and returns the drift records it produced."""
+        batch = batch.sort_values(self.time_col)
+        values = batch[self.features].to_numpy(dtype=np.float64)
+        events = []
+        for row_values, time in zip(values, batch[self.time_col].tolist()):
+            event = self._push(row_values, time)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def get_state(self) -> dict:
+        """Returns a picklable snapshot from which from_state resumes the stream."""
+        return {
+            'features': list(self.features),
+            'time_col': self.time_col,
+            'window_size': self.window_size,
+            'drift_threshold': self.drift_threshold,
+            'metric': self.metric,
+            'values': self._values.copy(),
+            'observed': self._observed.copy(),
+            'times': list(self._times),
+            'seen': self._seen,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'StreamingChronicDriftDetector':
+        detector = cls(state['features'], state['time_col'], window_size=state['window_size'],
+                       drift_threshold=state['drift_threshold'], metric=state['metric'])
+        detector._values = np.array(state['values'], dtype=np.float64)
+        detector._observed = np.array(state['observed'], dtype=bool)
+        detector._times = list(state['times'])
+        detector._seen = state['seen']
+        detector._resync()
+        return detector
+
+    def _push(self, values: np.ndarray, time) -> Optional[dict]:
+        w = self.window_size
+        size = 2 * w
+        observed = ~np.isnan(values)
+        values = np.where(observed, values, 0.0)
+        c = self._seen
+
+        # A observação c - w passa da janela futura para a passada e c - 2w sai do buffer
+        if c >= w:
+            moved = (c - w) % size
+            self._past_sum += self._values[moved]
+            self._past_count += self._observed[moved]
+            self._future_sum -= self._values[moved]
+            self._future_count -= self._observed[moved]
+        if c >= size:
+            evicted = c % size
+            self._past_sum -= self._values[evicted]
+            self._past_count -= self._observed[evicted]
+        self._future_sum += values
+        self._future_count += observed
+
+        slot = c % size
+        self._values[slot] = values
+        self._observed[slot] = observed
+        self._times[slot] = time
+        self._seen = c + 1
+
+        # Recalcula as somas a cada volta do buffer para não acumular erro de arredondamento
+        if self._seen % size == 0:
+            self._resync()
+
+        if self._seen < size:
+            return None
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            past_mean = self._past_sum / self._past_count
+            future_mean = self._future_sum / self._future_count
+            drift = DRIFT_METRICS[self.metric](past_mean[None, :], future_mean[None, :])[0]
+
+        if not drift > self.drift_threshold:
+            return None
+        i = self._seen - w
+        return {
+            'index': i,
+            'time': self._times[i % size],
+            'drift_score': round(float(drift), 4)
+        }
+
+    def _resync(self):
+        w = self.window_size
+        size = 2 * w
+        n = self._seen
+        past = np.arange(max(n - size, 0), max(n - w, 0)) % size
+        future = np.arange(max(n - w, 0), n) % size
+        self._past_sum = self._values[past].sum(axis=0)
+        self._past_count = self._observed[past].sum(axis=0)
+        self._future_sum = self._values[future].sum(axis=0)
+        self._future_count = self._observed[future].sum(axis=0)
+
 # Exemplo de uso
 if __name__ == "__main__":
     np.random.seed(42)
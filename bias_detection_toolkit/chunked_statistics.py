@@ -0,0 +1,222 @@
+"""
+Module: chunked_statistics
+
+Mergeable aggregates (counts, means and sums of squared deviations per group, and
+frequency tables) accumulated over an iterator of DataFrame chunks, e.g. from
+pd.read_csv(chunksize=...) or Parquet row groups. Memory is bounded by the number
+of groups and distinct values, not by the number of rows.
+
+Classes:
+    OneShotChunks - iterator of chunks that refuses a second pass instead of yielding nothing.
+    GroupMoments - per-group count, mean and M2 merged chunk by chunk (Chan et al.).
+    StreamingMoments - per-column central moments up to the fourth, for skewness and
+                       kurtosis in one pass (Pébay, 2008).
+    ChunkedAggregates - consumes a chunk source once and serves the aggregates
+                        with the same interface as StatisticsProvider.for_frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def is_chunk_source(data) -> bool:
+    """True for iterators of DataFrames (readers, generators) and lists/tuples of DataFrames."""
+    if isinstance(data, (list, tuple)):
+        return len(data) > 0 and all(isinstance(chunk, pd.DataFrame) for chunk in data)
+    return hasattr(data, '__next__') and not isinstance(data, (pd.DataFrame, pd.Series))
+
+
+def split_data_source(data):
+    """
+    Returns (frame, chunks): exactly one of them is set. Lists and tuples of chunks can
+    be read any number of times; other chunk iterators are wrapped in OneShotChunks.
+    """
+    if is_chunk_source(data):
+        return None, (data if isinstance(data, (list, tuple)) else OneShotChunks(data))
+    return (data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)), None
+
+
+class OneShotChunks:
+    """
+    Wraps a chunk iterator (reader, generator) that can only be consumed once. A second
+    iter() raises ValueError instead of silently yielding no chunks, so results that
+    need another pass over the data fail loudly rather than coming out empty.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.consumed = False
+
+    def __iter__(self):
+        if self.consumed:
+            raise ValueError("This chunk iterator was already consumed by a previous pass; pass a DataFrame "
+                             "or a list of chunks to run analyses that need to read the data again")
+        self.consumed = True
+        return self._chunks
+
+    def __next__(self):
+        self.consumed = True
+        return next(self._chunks)
+
+
+class GroupMoments:
+    """Count, mean and sum of squared deviations (M2) per group, merged chunk by chunk."""
+
+    def __init__(self):
+        self.table = None
+
+    def update(self, values: pd.Series, keys=None):
+        """Adds a chunk; keys=None accumulates a single global group."""
+        if keys is None:
+            keys = np.zeros(len(values), dtype=np.int8)
+        stats = values.groupby(keys).agg(['count', 'mean', 'var'])
+        chunk = pd.DataFrame({
+            'count': stats['count'].astype(np.float64),
+            'mean': stats['mean'],
+            'm2': (stats['var'] * (stats['count'] - 1)).fillna(0.0),
+        })
+        self.merge(chunk)
+
+    def merge(self, other: pd.DataFrame):
+        if self.table is None:
+            self.table = other
+            return
+        a, b = self.table.align(other, join='outer')
+        a = a.fillna({'count': 0.0, 'm2': 0.0})
+        b = b.fillna({'count': 0.0, 'm2': 0.0})
+        count = a['count'] + b['count']
+        delta = b['mean'].fillna(0.0) - a['mean'].fillna(0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = (b['count'] / count).fillna(0.0)
+            mean = a['mean'].fillna(0.0) + delta * weight
+            m2 = a['m2'] + b['m2'] + delta ** 2 * a['count'] * weight
+        self.table = pd.DataFrame({'count': count, 'mean': mean.where(count > 0), 'm2': m2})
+
+    def result(self) -> pd.DataFrame:
+        """Per-group count, mean and sample standard deviation (ddof=1), sorted by group."""
+        if self.table is None:
+            # Nenhuma linha vista: tabela vazia com as mesmas colunas
+            return pd.DataFrame({'count': pd.Series(dtype=np.int64), 'mean': pd.Series(dtype=np.float64),
+                                 'std': pd.Series(dtype=np.float64)})
+        table = self.table.sort_index()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(table['m2'] / (table['count'] - 1)).where(table['count'] > 1)
+        return pd.DataFrame({'count': table['count'].astype(np.int64), 'mean': table['mean'], 'std': std})
+
+
+class StreamingMoments:
+    """
+    Count, mean and the 2nd to 4th central moment sums of each column, merged chunk
+    by chunk with Pébay's pairwise update. skewness() and kurtosis() match
+    scipy.stats.skew / kurtosis with the default bias=True (Fisher kurtosis).
+    """
+
+    def __init__(self, n_columns: int):
+        self.n = 0
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+
+    def update(self, values):
+        """Adds a chunk (2-D array-like, one column per tracked column); NaN propagates as in scipy."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        if len(values) == 0:
+            return self
+        chunk = StreamingMoments(values.shape[1])
+        chunk.n = len(values)
+        chunk.mean = values.mean(axis=0)
+        deviation = values - chunk.mean
+        squared = deviation ** 2
+        chunk.m2 = squared.sum(axis=0)
+        chunk.m3 = (squared * deviation).sum(axis=0)
+        chunk.m4 = (squared ** 2).sum(axis=0)
+        return self.merge(chunk)
+
+    def merge(self, other: 'StreamingMoments'):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = other.n, other.mean, other.m2, other.m3, other.m4
+            return self
+        na, nb = float(self.n), float(other.n)
+        n = na + nb
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3.0 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6.0 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+              + 4.0 * delta * (na * other.m3 - nb * self.m3) / n)
+        self.n = int(n)
+        self.mean = self.mean + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    def skewness(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.n * self.m4 / self.m2 ** 2 - 3.0
+
+
+class ChunkedAggregates:
+    """
+    Consumes a chunk source once and accumulates the requested aggregates:
+
+    group_stats: list of (by, column) pairs, by being a column name or list of names
+    moments: columns whose global mean and standard deviation are needed
+    value_counts: columns whose frequency tables are needed
+
+    Results match the in-memory pandas computations up to floating-point rounding.
+    """
+
+    def __init__(self, chunks, group_stats=(), moments=(), value_counts=()):
+        self._group_moments = {self._group_key(by, column): GroupMoments() for by, column in group_stats}
+        self._moments = {column: GroupMoments() for column in moments}
+        self._counts = {column: None for column in value_counts}
+
+        for chunk in chunks:
+            for (by, column), accumulator in self._group_moments.items():
+                accumulator.update(chunk[column], [chunk[c] for c in by] if isinstance(by, tuple) else chunk[by])
+            for column, accumulator in self._moments.items():
+                accumulator.update(chunk[column])
+            for column, counts in self._counts.items():
+                chunk_counts = chunk[column].value_counts()
+                self._counts[column] = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+
+    def group_stats(self, by, column) -> pd.DataFrame:
+        key = self._group_key(by, column)
+        table = self._group_moments[key].result()
+        if isinstance(key[0], tuple):
+            if not isinstance(table.index, pd.MultiIndex):
+                # Fonte sem linhas: índice vazio com um nível por coluna de agrupamento
+                table.index = pd.MultiIndex.from_arrays([[]] * len(key[0]))
+            table.index.names = list(key[0])
+        else:
+            table.index.name = key[0]
+        return table
+
+    def column_moments(self, column) -> dict:
+        table = self._moments[column].result()
+        if table.empty:
+            return {'mean': np.nan, 'std': np.nan}
+        row = table.iloc[0]
+        return {'mean': row['mean'], 'std': row['std']}
+
+    def value_counts(self, column, normalize: bool = True) -> pd.Series:
+        counts = self._counts[column]
+        if counts is None:
+            counts = pd.Series(dtype=np.int64)
+        counts = counts.astype(np.int64).sort_values(ascending=False, kind='stable')
+        counts.index.name = column
+        if normalize:
+            counts = counts / counts.sum()
+            counts.name = 'proportion'
+        return counts
+
+    @staticmethod
+    def _group_key(by, column):
+        return (tuple(by) if isinstance(by, list) else by), column
@@ -0,0 +1,154 @@
+"""
+Module: columnar_report
+
+Report type returned by the detectors. Flagged records are kept as one array per
+field (or a single scalar repeated on every row) instead of one Python dict per
+record; rows are only materialized as dicts when they are accessed.
+
+Classes:
+    ColumnarReport - read-only sequence of report rows backed by columns.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def _as_column(values):
+    """Array for a per-row field; None when values is a scalar to repeat on every row."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy() if isinstance(values.dtype, np.dtype) else values.array
+    if isinstance(values, (np.ndarray, pd.api.extensions.ExtensionArray)):
+        return values
+    if isinstance(values, list):
+        # Passa pelo pandas para manter tuplas/listas como objetos e não misturar tipos
+        return _as_column(pd.Series(values, dtype=object if not values else None))
+    return None
+
+
+def _scalar(value):
+    """NumPy scalars become Python/pandas scalars, like Series.tolist()."""
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value)
+    if isinstance(value, np.timedelta64):
+        return pd.Timedelta(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ColumnarReport(Sequence):
+    """
+    Sequence of report rows (dicts) stored column by column. Indexing with an int
+    returns the row dict, a slice or boolean mask returns another ColumnarReport, and
+    a report compares equal to the list of dicts it represents.
+
+    columns: dict field -> array-like (one value per row) or scalar (same value on
+             every row); lists are treated as per-row values
+    length: number of rows, required only when every field is a scalar
+    """
+
+    def __init__(self, columns: dict, length: int = None):
+        self._arrays = {}
+        self._scalars = {}
+        for name, values in columns.items():
+            column = _as_column(values)
+            if column is None:
+                self._scalars[name] = values
+            else:
+                self._arrays[name] = column
+        self._fields = list(columns)
+
+        lengths = {len(column) for column in self._arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("All report columns must have the same length")
+        if lengths:
+            self._length = lengths.pop()
+            if length is not None and length != self._length:
+                raise ValueError("length does not match the report columns")
+        else:
+            self._length = length or 0
+
+    @classmethod
+    def from_records(cls, records: list, fields: list = None) -> 'ColumnarReport':
+        """Builds a report from a list of dicts (e.g. a legacy report)."""
+        fields = fields if fields is not None else (list(records[0]) if records else [])
+        return cls({field: [record[field] for record in records] for field in fields}, length=len(records))
+
+    @property
+    def fields(self) -> list:
+        return list(self._fields)
+
+    def column(self, name) -> np.ndarray:
+        """Values of one field for every row (scalars are broadcast)."""
+        if name in self._arrays:
+            return self._arrays[name]
+        value = self._scalars[name]
+        if isinstance(value, (list, tuple, dict, set)):
+            column = np.empty(self._length, dtype=object)
+            for i in range(self._length):
+                column[i] = value
+            return column
+        return np.full(self._length, value)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            position = key + self._length if key < 0 else key
+            if not 0 <= position < self._length:
+                raise IndexError("report index out of range")
+            return {
+                name: _scalar(self._arrays[name][position]) if name in self._arrays else self._scalars[name]
+                for name in self._fields
+            }
+        if isinstance(key, slice):
+            length = len(range(*key.indices(self._length)))
+        else:
+            key = np.asarray(key)
+            length = int(key.sum()) if key.dtype == bool else len(key)
+        return ColumnarReport({
+            name: self._arrays[name][key] if name in self._arrays else self._scalars[name]
+            for name in self._fields
+        }, length=length)
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarReport):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ColumnarReport({self._length} rows; fields: {', '.join(map(str, self._fields))})"
+
+    def to_dicts(self) -> list:
+        """Every row as a dict, converting each column at once."""
+        if not self._fields:
+            return [{} for _ in range(self._length)]
+        columns = []
+        for name in self._fields:
+            if name in self._arrays:
+                columns.append(pd.Series(self._arrays[name], copy=False).tolist())
+            else:
+                columns.append([self._scalars[name]] * self._length)
+        return [dict(zip(self._fields, row)) for row in zip(*columns)]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name) for name in self._fields}, index=pd.RangeIndex(self._length))
+
+    def to_arrow(self):
+        """pyarrow.Table with one column per field (requires pyarrow)."""
+        import pyarrow
+        return pyarrow.Table.from_pandas(self.to_frame(), preserve_index=False)
+
+    def to_parquet(self, path, **kwargs):
+        """Writes the report with DataFrame.to_parquet (requires pyarrow or fastparquet)."""
+        self.to_frame().to_parquet(path, index=False, **kwargs)
@@ -4,8 +4,11 @@ ConstraintQueueShiftDetector
 Detecta variáveis que funcionam como gargalos sucessivos, onde ao resolver uma restrição outra variável surge como bloqueio principal (teoria das restrições dinâmica).
 """
 
+import numpy as np
 import pandas as pd
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
 class ConstraintQueueShiftDetector:
     def __init__(self, data, constraint_cols):
         """
@@ -16,13 +19,11 @@ class ConstraintQueueShiftDetector:
         self.constraint_cols = constraint_cols
 
     def analyze(self):
-        constraint_report = []
         variances = self.data[self.constraint_cols].var().sort_values(ascending=False)
-        for idx, (col, var) in enumerate(variances.items()):
-            constraint_report.append({
-                "rank": idx + 1,
-                "constraint_variable": col,
-                "variance": var,
-                "potential_new_bottleneck": idx > 0  # Marca como novo gargalo se não for o 1º
-            })
-        return constraint_report
+        rank = np.arange(1, len(variances) + 1)
+        return ColumnarReport({
+            "rank": rank,
+            "constraint_variable": variances.index,
+            "variance": variances.to_numpy(),
+            "potential_new_bottleneck": rank > 1  # Marca como novo gargalo se não for o 1º
+        })
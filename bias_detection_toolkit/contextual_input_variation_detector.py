@@ -8,59 +8,157 @@ ou têm distribuição diferenciada por motivos externos (exemplo: provas com di
 import pandas as pd
 import numpy as np
 
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sampled_statistics import SampledAggregates, interval_contains
+from bias_detection_toolkit.significance import group_significance
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
+
 class ContextualInputVariationDetector:
-    def __init__(self, data, context_col, score_col, group_col=None):
+    # Custo relativo para o DetectionSuite: média e desvio por contexto
+    COST_HINT = 3.0
+
+    def __init__(self, data, context_col, score_col, group_col=None, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         context_col: coluna que indica o contexto da geração (ex: número da prova, lote, tipo)
         score_col: coluna com os valores a serem analisados (ex: nota, resultado)
         group_col: opcional, coluna para agrupar (ex: aluno, turma)
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
+        self._sampled = None
         self.context_col = context_col
         self.score_col = score_col
         self.group_col = group_col
 
-    def analyze(self):
+    def analyze(self, approximate=False, sample_size=200, confidence=0.95, escalate=True, seed=None,
+                significance=None, n_resamples=10_000, alpha=0.05, n_jobs=1):
         """
         Identifica variações suspeitas no contexto, como desvios muito maiores que a média, 
         assimetrias ou manipulações direcionadas.
 
+        approximate: estima média e desvio de cada contexto com uma amostra estratificada (uma passada,
+                     cerca de sample_size linhas por contexto; contextos menores entram inteiros e
+                     ficam exatos) e informa os intervalos de confiança;
+                     com group_col as estatísticas são médias de grupos e o cálculo é sempre exato
+        confidence: nível dos intervalos de confiança no modo aproximado
+        escalate: recalcula de forma exata os contextos cujo intervalo cruza um limiar de decisão
+        seed: semente da amostragem e das reamostragens
+        significance: opcional, 'permutation' ou 'bootstrap'; calcula o p-valor de cada contexto (da média
+                      para desvios de média, do desvio-padrão para desvios altos) e só marca os contextos
+                      cujo p-valor ajustado (Benjamini-Hochberg) fica abaixo de alpha
+        n_resamples: número de reamostragens do teste de significância
+        alpha: taxa de falsas descobertas aceita
+        n_jobs: processos usados nas reamostragens (o resultado não depende dele)
+        Com um iterador de uma só passada, o resultado exato e o aproximado (com os mesmos
+        sample_size, confidence e seed) ficam guardados; passar de um modo ao outro exigiria
+        reler os dados e levanta ValueError
+
         Retorna um relatório com contextos que apresentaram variações incomuns.
         """
-        report = []
+        if significance is not None and ((approximate and not self.group_col) or self.chunks is not None):
+            raise ValueError("significance requires exact analysis of an in-memory DataFrame")
+        if approximate and not self.group_col:
+            return self._analyze_approximate(sample_size, confidence, escalate, seed)
+        stats = self._statistics()
 
         # Se houver agrupamento (ex: por aluno), calcula estatísticas dentro do grupo
         if self.group_col:
-            grouped = self.data.groupby([self.context_col, self.group_col])[self.score_col].mean().reset_index()
-            context_stats = grouped.groupby(self.context_col)[self.score_col].agg(['mean','std']).reset_index()
+            grouped = stats.group_stats(self._context_keys(), self.score_col)['mean']
+            context_stats = grouped.groupby(level=self.context_col).agg(['mean','std']).reset_index()
         else:
-            context_stats = self.data.groupby(self.context_col)[self.score_col].agg(['mean','std']).reset_index()
+            context_stats = stats.group_stats(self.context_col, self.score_col)[['mean','std']].reset_index()
 
         # Calcula média geral e desvio padrão dos scores para comparação
-        global_mean = self.data[self.score_col].mean()
-        global_std = self.data[self.score_col].std()
-
-        for _, row in context_stats.iterrows():
-            mean = row['mean']
-            std = row['std']
-
-            # Detecta se a média ou o desvio do contexto se afastam muito da média global
-            if (mean > global_mean + 2*global_std) or (mean < global_mean - 2*global_std):
-                report.append({
-                    "context": row[self.context_col],
-                    "mean": mean,
-                    "std": std,
-                    "variation_type": "mean deviation",
-                    "suspected": True
-                })
-            elif std > global_std * 1.5:
-                report.append({
-                    "context": row[self.context_col],
-                    "mean": mean,
-                    "std": std,
-                    "variation_type": "high std deviation",
-                    "suspected": True
-                })
-
-        return report
+        moments = stats.column_moments(self.score_col)
+        global_mean = moments['mean']
+        global_std = moments['std']
+
+        mean = context_stats['mean'].to_numpy()
+        std = context_stats['std'].to_numpy()
+
+        # Detecta se a média ou o desvio do contexto se afastam muito da média global
+        mean_deviation = (mean > global_mean + 2*global_std) | (mean < global_mean - 2*global_std)
+        high_std = ~mean_deviation & (std > global_std * 1.5)
+        flagged = mean_deviation | high_std
+
+        report = {
+            "context": context_stats[self.context_col].to_numpy(),
+            "mean": mean,
+            "std": std,
+            "variation_type": np.where(mean_deviation, "mean deviation", "high std deviation").astype(object),
+        }
+        if significance is not None:
+            # As unidades testadas são as linhas, ou as médias por grupo quando há group_col
+            if self.group_col:
+                values, keys = grouped, grouped.index.get_level_values(self.context_col)
+            else:
+                values, keys = self.data[self.score_col], self.data[self.context_col]
+            contexts = pd.Index(report["context"])
+            options = dict(method=significance, n_resamples=n_resamples, n_jobs=n_jobs, seed=seed)
+            tested = group_significance(values, keys, contexts, statistic='mean', **options)
+            if high_std.any():
+                spread = group_significance(values, keys, contexts, statistic='std', **options)
+                tested = tested.where(pd.Series(mean_deviation, index=contexts), spread, axis=0)
+            report["p_value"] = tested['p_value'].to_numpy()
+            report["p_value_adjusted"] = tested['p_value_adjusted'].to_numpy()
+            flagged = flagged & (report["p_value_adjusted"] < alpha)
+        report = {name: values[flagged] for name, values in report.items()}
+        report["suspected"] = True
+        return ColumnarReport(report)
+
+    def _analyze_approximate(self, sample_size, confidence, escalate, seed):
+        sampled = self._sampled_statistics(sample_size, confidence, seed)
+        moments = sampled.column_moments()
+        global_mean = moments['mean']
+        global_std = moments['std']
+        estimates = sampled.group_estimates()
+        if escalate:
+            undecided = (
+                interval_contains(estimates['mean_low'], estimates['mean_high'],
+                                  [global_mean - 2*global_std, global_mean + 2*global_std])
+                | interval_contains(estimates['std_low'], estimates['std_high'], [global_std * 1.5])
+            )
+            estimates = sampled.escalate(estimates.index[undecided])
+
+        mean = estimates['mean'].to_numpy()
+        std = estimates['std'].to_numpy()
+        mean_deviation = (mean > global_mean + 2*global_std) | (mean < global_mean - 2*global_std)
+        high_std = ~mean_deviation & (std > global_std * 1.5)
+        flagged = mean_deviation | high_std
+
+        return ColumnarReport({
+            "context": estimates.index[flagged],
+            "mean": mean[flagged],
+            "std": std[flagged],
+            "mean_ci_low": estimates['mean_low'].to_numpy()[flagged],
+            "mean_ci_high": estimates['mean_high'].to_numpy()[flagged],
+            "std_ci_low": estimates['std_low'].to_numpy()[flagged],
+            "std_ci_high": estimates['std_high'].to_numpy()[flagged],
+            "variation_type": np.where(mean_deviation[flagged], "mean deviation", "high std deviation").astype(object),
+            "exact": estimates['exact'].to_numpy()[flagged],
+            "suspected": True
+        })
+
+    def _sampled_statistics(self, sample_size, confidence, seed):
+        params = (sample_size, confidence, seed)
+        if self._sampled is None or self._sampled[0] != params:
+            source = self.data if self.chunks is None else self.chunks
+            self._sampled = params, SampledAggregates(source, self.context_col, self.score_col,
+                                                      sample_size, confidence, seed)
+        return self._sampled[1]
+
+    def _context_keys(self):
+        return [self.context_col, self.group_col] if self.group_col else self.context_col
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, group_stats=[(self._context_keys(), self.score_col)],
+                                                 moments=[self.score_col])
+        return self._aggregates
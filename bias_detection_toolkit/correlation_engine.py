@@ -0,0 +1,140 @@
+"""
+Module: correlation_engine
+
+Pairwise Pearson correlations computed block by block from columns standardized
+once, keeping only the pairs above a threshold as a sparse edge list. The dense
+p x p correlation matrix is never built: besides the standardized columns, peak
+memory is a few block_size x block_size tiles.
+
+Classes:
+    CorrelationEngine - standardized columns with blocked, thresholded correlation search.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CorrelationEngine:
+    """
+    Pearson correlations between the given columns, matching DataFrame.corr():
+    without missing values every tile is a single product of standardized columns;
+    with missing values each pair uses its pairwise-complete rows (the means and
+    variances of the tile are rebuilt from masked sums). Correlations of constant
+    columns or of pairs with fewer than two common rows are NaN.
+
+    dtype: np.float32 halves the memory of the standardized columns; correlations
+           are then accurate to about 1e-6
+    block_size: number of columns per tile
+    """
+
+    def __init__(self, frame: pd.DataFrame, columns: list, dtype=np.float64, block_size: int = 1024):
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+
+        n_rows, n_cols = len(frame), len(self.columns)
+        self._values = np.empty((n_rows, n_cols), dtype=self.dtype)
+        self._observed = None
+        self._constant = np.zeros(n_cols, dtype=bool)
+        for start in range(0, n_cols, block_size):
+            stop = min(start + block_size, n_cols)
+            block = frame[self.columns[start:stop]].to_numpy(dtype=np.float64)
+            observed = ~np.isnan(block)
+            if not observed.all() and self._observed is None:
+                self._observed = np.ones((n_rows, n_cols), dtype=self.dtype)
+            if self._observed is not None:
+                self._observed[:, start:stop] = observed
+            # Padroniza uma única vez; ausentes viram 0 e só entram nas somas pela máscara
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.nanmean(block, axis=0) if self._observed is not None else block.mean(axis=0)
+                centered = np.where(observed, block - mean, 0.0)
+                norm = np.sqrt((centered ** 2).sum(axis=0))
+                self._constant[start:stop] = ~(norm > 0)
+                self._values[:, start:stop] = centered / np.where(norm > 0, norm, np.nan)
+
+        if self._observed is not None:
+            # Ausentes e colunas constantes (NaN após a divisão) viram 0; as constantes ficam em _constant
+            np.nan_to_num(self._values, copy=False, nan=0.0)
+
+    @property
+    def has_missing(self) -> bool:
+        return self._observed is not None
+
+    def select(self, columns: list, block_size: int = None) -> 'CorrelationEngine':
+        """
+        Engine over a subset of the columns, reusing their standardized values (each
+        column is standardized on its own, so nothing is recomputed). A contiguous run
+        of columns shares memory with this engine; any other selection is copied.
+        """
+        position = {name: k for k, name in enumerate(self.columns)}
+        positions = np.array([position[name] for name in columns], dtype=np.int64)
+        if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            positions = slice(int(positions[0]), int(positions[0]) + len(positions))
+
+        engine = CorrelationEngine.__new__(CorrelationEngine)
+        engine.columns = list(columns)
+        engine.dtype = self.dtype
+        engine.block_size = block_size if block_size is not None else self.block_size
+        engine._values = self._values[:, positions]
+        engine._observed = self._observed[:, positions] if self._observed is not None else None
+        engine._constant = self._constant[positions]
+        return engine
+
+    def edges(self, threshold: float, absolute: bool = True):
+        """
+        Pairs (i, j), i < j, whose correlation exceeds threshold (in absolute value by
+        default). Returns (first, second, correlation) arrays ordered by (i, j).
+        """
+        n_cols = len(self.columns)
+        firsts, seconds, values = [], [], []
+        for a in range(0, n_cols, self.block_size):
+            b = min(a + self.block_size, n_cols)
+            for c in range(a, n_cols, self.block_size):
+                d = min(c + self.block_size, n_cols)
+                tile = self._tile(a, b, c, d)
+                hits = np.abs(tile) > threshold if absolute else tile > threshold
+                if c == a:
+                    hits &= np.triu(np.ones(hits.shape, dtype=bool), k=1)
+                i, j = np.nonzero(hits)
+                firsts.append(i + a)
+                seconds.append(j + c)
+                values.append(tile[i, j])
+
+        first = np.concatenate(firsts) if firsts else np.empty(0, dtype=np.int64)
+        second = np.concatenate(seconds) if seconds else np.empty(0, dtype=np.int64)
+        correlation = np.concatenate(values) if values else np.empty(0)
+        order = np.lexsort((second, first))
+        return first[order], second[order], correlation[order]
+
+    def correlations_with(self, column) -> np.ndarray:
+        """Correlation of every column with one of them (by name)."""
+        k = self.columns.index(column)
+        n_cols = len(self.columns)
+        return np.concatenate([
+            self._tile(start, min(start + self.block_size, n_cols), k, k + 1)[:, 0]
+            for start in range(0, n_cols, self.block_size)
+        ]) if n_cols else np.empty(0)
+
+    def _tile(self, a: int, b: int, c: int, d: int) -> np.ndarray:
+        """Correlations between columns [a, b) and [c, d) as float64."""
+        x, y = self._values[:, a:b], self._values[:, c:d]
+        if self._observed is None:
+            return (x.T @ y).astype(np.float64)
+
+        mx, my = self._observed[:, a:b], self._observed[:, c:d]
+        count = (mx.T @ my).astype(np.float64)
+        sum_x = (x.T @ my).astype(np.float64)
+        sum_y = (mx.T @ y).astype(np.float64)
+        sum_xx = ((x * x).T @ my).astype(np.float64)
+        sum_yy = (mx.T @ (y * y)).astype(np.float64)
+        sum_xy = (x.T @ y).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sum_xy - sum_x * sum_y / count
+            var_x = sum_xx - sum_x ** 2 / count
+            var_y = sum_yy - sum_y ** 2 / count
+            corr = cov / np.sqrt(var_x * var_y)
+        # Variância nula nas linhas em comum (só ruído de arredondamento): correlação indefinida
+        tolerance = 100 * np.finfo(self.dtype).eps
+        invalid = ((count < 2) | (var_x <= tolerance * sum_xx) | (var_y <= tolerance * sum_yy)
+                   | self._constant[a:b, None] | self._constant[None, c:d])
+        return np.where(invalid, np.nan, np.clip(corr, -1.0, 1.0))
@@ -0,0 +1,135 @@
+"""
+Module: detection_suite
+
+Runs several configured detectors over one dataset concurrently in a process pool.
+The dataset is placed once in shared memory; workers rebuild the DataFrame on top of
+the shared buffers instead of receiving a pickled copy per detector.
+
+Classes:
+    DetectorSpec - a detector class plus its constructor arguments (without data).
+    DetectionSuite - schedules the detectors and collects one report.
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class DetectorSpec:
+    """
+    Configuration of one detector of the `Detector(data, **params).analyze()` family.
+
+    cost: optional relative cost hint used to start heavyweight detectors first;
+          defaults to the detector class's COST_HINT (1.0 when it has none). After
+          the first run the suite uses the measured wall time instead.
+    """
+
+    def __init__(self, detector_cls, params: dict = None, name: str = None, cost: float = None):
+        self.detector_cls = detector_cls
+        self.params = dict(params or {})
+        self.name = name or detector_cls.__name__
+        self.cost = cost if cost is not None else getattr(detector_cls, 'COST_HINT', 1.0)
+
+
+# DataFrame reconstruído uma única vez em cada processo do pool
+_WORKER_FRAME = {}
+
+
+def _share_frame(frame: pd.DataFrame):
+    """Copies the numeric columns into shared memory blocks; other columns travel pickled once per worker."""
+    blocks, layout, others = [], [], {}
+    for position, column in enumerate(frame.columns):
+        values = frame.iloc[:, position]
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+            array = np.ascontiguousarray(values.to_numpy())
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            blocks.append(block)
+            layout.append((column, block.name, array.dtype.str, array.shape))
+        else:
+            others[column] = values
+    return blocks, (layout, others, list(frame.columns), frame.index)
+
+
+def _attach_frame(shared_layout):
+    layout, others, columns, index = shared_layout
+    handles, data = [], dict(others)
+    for column, block_name, dtype, shape in layout:
+        block = shared_memory.SharedMemory(name=block_name)
+        handles.append(block)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        data[column] = array
+    _WORKER_FRAME['handles'] = handles
+    _WORKER_FRAME['frame'] = pd.DataFrame({column: data[column] for column in columns}, index=index, copy=False)
+
+
+def _run_detector(spec: DetectorSpec):
+    start = time.perf_counter()
+    try:
+        result = spec.detector_cls(_WORKER_FRAME['frame'], **spec.params).analyze()
+        return spec.name, result, None, time.perf_counter() - start
+    except Exception:
+        return spec.name, None, traceback.format_exc(), time.perf_counter() - start
+
+
+class DetectionSuite:
+    def __init__(self, detectors: list, n_workers: int = None):
+        """
+        detectors: list of DetectorSpec (or detector classes, run without extra arguments)
+        n_workers: size of the process pool (defaults to the number of CPUs)
+        """
+        self.specs = [d if isinstance(d, DetectorSpec) else DetectorSpec(d) for d in detectors]
+        names = [spec.name for spec in self.specs]
+        if len(set(names)) != len(names):
+            raise ValueError("Detector names must be unique; pass name= to DetectorSpec")
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.observed_times = {}
+
+    def run(self, data) -> dict:
+        """
+        Runs every detector on data and returns a report with the results, per-detector
+        wall time, failures (tracebacks) and the total wall time.
+        """
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        report = {'results': {}, 'timings': {}, 'failures': {}, 'wall_time': None}
+        start = time.perf_counter()
+
+        blocks, shared_layout = _share_frame(frame)
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_attach_frame,
+                                     initargs=(shared_layout,)) as pool:
+                # Mais pesados primeiro: o tempo total se aproxima do detector mais lento
+                futures = {pool.submit(_run_detector, spec): spec for spec in self._schedule()}
+                for future in as_completed(futures):
+                    try:
+                        name, result, failure, elapsed = future.result()
+                    except Exception:
+                        # O processo do worker morreu (ex.: falta de memória) antes de responder
+                        name, result, failure = futures[future].name, None, traceback.format_exc()
+                        elapsed = time.perf_counter() - start
+                    report['timings'][name] = elapsed
+                    self.observed_times[name] = elapsed
+                    if failure is None:
+                        report['results'][name] = result
+                    else:
+                        report['failures'][name] = failure
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        report['wall_time'] = time.perf_counter() - start
+        return report
+
+    def _schedule(self) -> list:
+        def cost(spec):
+            if spec.name in self.observed_times:
+                return self.observed_times[spec.name]
+            return spec.cost
+        return sorted(self.specs, key=cost, reverse=True)
@@ -7,16 +7,28 @@ Detecta variáveis internas que parecem causar um resultado, mas na verdade são
 import pandas as pd
 import numpy as np
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
+
 class DownstreamVariableShadowingDetector:
-    def __init__(self, data, target_variable, variable_group):
+    # Custo relativo para o DetectionSuite: matriz de correlação do grupo de variáveis
+    COST_HINT = 10.0
+
+    def __init__(self, data, target_variable, variable_group, stats=None, dtype=np.float64, block_size=1024):
         """
         data: pandas DataFrame com os dados
         target_variable: string, nome da variável de resultado que queremos entender
         variable_group: lista de strings, variáveis do grupo para analisar shadowing
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
+        dtype: np.float32 reduz à metade a memória das colunas padronizadas (precisão ~1e-6)
+        block_size: colunas por bloco no cálculo das correlações (limita o pico de memória)
         """
         self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
         self.target_variable = target_variable
         self.variable_group = variable_group
+        self.dtype = dtype
+        self.block_size = block_size
 
     def analyze(self):
         """
@@ -26,28 +38,31 @@ class DownstreamVariableShadowingDetector:
         Retorna:
           shadowing_report: lista de dicionários com variáveis que parecem shadowing.
         """
-        shadowing_report = []
-
-        # Correlações entre variáveis do grupo e com a variável alvo
-        corr_matrix = self.data[self.variable_group + [self.target_variable]].corr()
+        # Correlações entre variáveis do grupo e com a variável alvo, sem matriz densa
+        n_group = len(self.variable_group)
+        engine = self.stats.correlation_engine(self.data, self.variable_group + [self.target_variable],
+                                               self.dtype, self.block_size)
 
         # Correl com target
-        target_corr = corr_matrix[self.target_variable]
+        target_corr = engine.correlations_with(self.target_variable)[:n_group]
+
+        # Pares do grupo com correlação alta, nos dois sentidos e em ordem de coluna
+        first, second, _ = engine.edges(0.8)
+        inside = second < n_group
+        variable = np.concatenate([first[inside], second[inside]])
+        other = np.concatenate([second[inside], first[inside]])
+        order = np.lexsort((other, variable))
+        counts = np.bincount(variable, minlength=n_group)
 
         # Para cada variável do grupo, verifica se a correlação com a target é baixa
         # mas a correlação com outra variável do grupo é alta
-        for var in self.variable_group:
-            corr_with_target = target_corr[var]
-            # verifica outras variáveis do grupo com alta correlação com essa var
-            high_corr_vars = corr_matrix[var][self.variable_group].drop(var).abs()
-            high_corr_vars = high_corr_vars[high_corr_vars > 0.8]
-
-            if abs(corr_with_target) < 0.3 and not high_corr_vars.empty:
-                shadowing_report.append({
-                    "variable": var,
-                    "corr_with_target": corr_with_target,
-                    "high_corr_with": list(high_corr_vars.index),
-                    "shadowing_suspected": True
-                })
-
-        return shadowing_report
+        flagged = (np.abs(target_corr) < 0.3) & (counts > 0)
+
+        names = np.array(self.variable_group, dtype=object)
+        high_corr_with = np.split(names[other[order]], np.cumsum(counts)[:-1])
+        return ColumnarReport({
+            "variable": names[flagged],
+            "corr_with_target": target_corr[flagged],
+            "high_corr_with": [high_corr_with[k].tolist() for k in np.flatnonzero(flagged)],
+            "shadowing_suspected": True
+        })
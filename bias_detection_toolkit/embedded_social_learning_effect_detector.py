@@ -4,29 +4,64 @@ EmbeddedSocialLearningEffectDetector
 Detecta mudanças comportamentais nos dados causadas por aprendizado social ou influência externa não explícita nos registros.
 """
 
-import pandas as pd
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.significance import group_significance
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
 
 class EmbeddedSocialLearningEffectDetector:
-    def __init__(self, data, behavior_col, group_col):
+    # Custo relativo para o DetectionSuite: médias por grupo
+    COST_HINT = 2.0
+
+    def __init__(self, data, behavior_col, group_col, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         behavior_col: coluna de comportamento observável
         group_col: coluna que identifica grupos sociais
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
         self.behavior_col = behavior_col
         self.group_col = group_col
 
-    def analyze(self):
-        learning_effects = []
-        group_means = self.data.groupby(self.group_col)[self.behavior_col].mean()
-        global_mean = self.data[self.behavior_col].mean()
-        for group, mean in group_means.items():
-            if abs(mean - global_mean) > global_mean * 0.3:
-                learning_effects.append({
-                    "group": group,
-                    "behavior_mean": mean,
-                    "deviation_from_global": abs(mean - global_mean),
-                    "embedded_social_learning_detected": True
-                })
-        return learning_effects
+    def analyze(self, significance=None, n_resamples=10_000, alpha=0.05, n_jobs=1, seed=None):
+        """
+        significance: opcional, 'permutation' ou 'bootstrap'; calcula o p-valor de cada grupo e só
+                      marca os grupos cujo p-valor ajustado (Benjamini-Hochberg) fica abaixo de alpha
+        n_resamples: número de reamostragens do teste de significância
+        alpha: taxa de falsas descobertas aceita
+        n_jobs: processos usados nas reamostragens (o resultado não depende dele)
+        seed: semente das reamostragens
+        """
+        if significance is not None and self.chunks is not None:
+            raise ValueError("significance requires an in-memory DataFrame")
+        stats = self._statistics()
+        group_means = stats.group_stats(self.group_col, self.behavior_col)['mean']
+        global_mean = stats.column_moments(self.behavior_col)['mean']
+        deviation = (group_means - global_mean).abs()
+        flagged = (deviation > global_mean * 0.3).to_numpy()
+        report = {
+            "group": group_means.index,
+            "behavior_mean": group_means.to_numpy(),
+            "deviation_from_global": deviation.to_numpy(),
+        }
+        if significance is not None:
+            tested = group_significance(self.data[self.behavior_col], self.data[self.group_col], group_means.index,
+                                        method=significance, n_resamples=n_resamples, n_jobs=n_jobs, seed=seed)
+            report["p_value"] = tested['p_value'].to_numpy()
+            report["p_value_adjusted"] = tested['p_value_adjusted'].to_numpy()
+            flagged = flagged & (report["p_value_adjusted"] < alpha)
+        report = {name: values[flagged] for name, values in report.items()}
+        report["embedded_social_learning_detected"] = True
+        return ColumnarReport(report)
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, group_stats=[(self.group_col, self.behavior_col)],
+                                                 moments=[self.behavior_col])
+        return self._aggregates
@@ -4,9 +4,16 @@ ExplainableOutlierWithHiddenCauseDetector
 Detecta outliers que parecem legítimos mas cuja causa raiz está oculta no conjunto de dados.
 """
 
+import numpy as np
 import pandas as pd
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sketches import KLLSketch
+
 class ExplainableOutlierWithHiddenCauseDetector:
+    # Custo relativo para o DetectionSuite: quantis (ordenação) de cada coluna-chave
+    COST_HINT = 4.0
+
     def __init__(self, data, key_columns):
         """
         data: DataFrame com os dados
@@ -15,19 +22,59 @@ class ExplainableOutlierWithHiddenCauseDetector:
         self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
         self.key_columns = key_columns
 
-    def analyze(self):
-        outlier_report = []
+    def analyze(self, quantile_method="exact", columnar=False, sketches=None):
+        """
+        quantile_method: "exact" (Series.quantile) ou "sketch" (KLLSketch, aproximado e mesclável)
+        columnar: se True, retorna {coluna: {"positions", "values", "lower_bound", "upper_bound"}}
+                  com arrays NumPy em vez de um dicionário por outlier
+        sketches: opcional, {coluna: KLLSketch} já construídos (ex.: mesclados de várias partições)
+        """
+        if quantile_method == "sketch" and sketches is None:
+            sketches = self.build_quantile_sketches()
+        elif quantile_method not in ("exact", "sketch"):
+            raise ValueError("quantile_method must be 'exact' or 'sketch'")
+
+        outlier_report = {}
         for col in self.key_columns:
-            q1 = self.data[col].quantile(0.25)
-            q3 = self.data[col].quantile(0.75)
+            values = self.data[col]
+            if quantile_method == "sketch":
+                q1, q3 = sketches[col].quantile([0.25, 0.75])
+            else:
+                q1 = values.quantile(0.25)
+                q3 = values.quantile(0.75)
             iqr = q3 - q1
             lower_bound = q1 - 1.5 * iqr
             upper_bound = q3 + 1.5 * iqr
-            outliers = self.data[(self.data[col] < lower_bound) | (self.data[col] > upper_bound)]
-            for _, row in outliers.iterrows():
-                outlier_report.append({
-                    "column": col,
-                    "value": row[col],
-                    "hidden_cause_suspected": True
-                })
-        return outlier_report
+            mask = ((values < lower_bound) | (values > upper_bound)).to_numpy()
+            outlier_report[col] = {
+                "positions": np.flatnonzero(mask),
+                "values": values.to_numpy()[mask],
+                "lower_bound": lower_bound,
+                "upper_bound": upper_bound
+            }
+        if columnar:
+            return outlier_report
+
+        flagged = [outlier_report[col]["values"] for col in self.key_columns]
+        if len({values.dtype for values in flagged}) > 1:
+            # Colunas de tipos diferentes: mantém cada valor com o tipo da sua coluna
+            flagged = [values.astype(object) for values in flagged]
+        return ColumnarReport({
+            "column": np.repeat(np.array(self.key_columns, dtype=object), [len(values) for values in flagged]),
+            "value": np.concatenate(flagged) if flagged else np.empty(0),
+            "hidden_cause_suspected": True
+        })
+
+    def build_quantile_sketches(self, chunks=None, k=200, chunk_size=1_000_000):
+        """
+        Constrói um KLLSketch por coluna-chave em uma passada. chunks: iterador opcional
+        de DataFrames (fluxo ou partição); por padrão percorre self.data em blocos.
+        Sketches de partições diferentes podem ser combinados com KLLSketch.merge.
+        """
+        if chunks is None:
+            chunks = (self.data.iloc[start:start + chunk_size] for start in range(0, len(self.data), chunk_size))
+        sketches = {col: KLLSketch(k=k, seed=42) for col in self.key_columns}
+        for chunk in chunks:
+            for col, sketch in sketches.items():
+                sketch.update(chunk[col].to_numpy(dtype=np.float64))
+        return sketches
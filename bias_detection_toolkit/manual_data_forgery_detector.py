@@ -4,26 +4,101 @@ ManualDataForgeryDetector
 Detecta adulteração manual de dados que se comportam como outliers disfarçados dentro do grupo.
 """
 
-import pandas as pd
+import math
+
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sketches import MisraGriesSketch
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
 
 class ManualDataForgeryDetector:
-    def __init__(self, data, key_columns):
+    # Custo relativo para o DetectionSuite: uma tabela de frequências por coluna-chave
+    COST_HINT = 3.0
+    # Proporção a partir da qual um valor repetido é considerado suspeito
+    PROPORTION_THRESHOLD = 0.9
+
+    def __init__(self, data, key_columns, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         key_columns: lista de colunas críticas para verificar padrões suspeitos
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
+        self._sketches = None
         self.key_columns = key_columns
 
-    def analyze(self):
-        forgery_suspects = []
+    def analyze(self, frequency_method="exact", sketches=None):
+        """
+        frequency_method: "exact" (tabelas de frequências completas) ou "sketch" (heavy
+        hitters em uma passada, memória O(1/limiar) por coluna); os candidatos do sketch
+        são recontados de forma exata numa segunda passada quando os dados podem ser
+        relidos (DataFrame ou lista de chunks), senão decidem os limites inferiores
+        sketches: opcional, dicionário coluna -> MisraGriesSketch já construído
+        Com um iterador de uma só passada, cada modo guarda o resultado da sua passada; o outro
+        modo precisaria reler os dados e levanta ValueError
+        """
+        columns, repeated_values = [], []
+        if frequency_method == "sketch":
+            if sketches is None:
+                sketches = self._default_sketches()
+        elif frequency_method == "exact":
+            stats = self._statistics()
+        else:
+            raise ValueError("frequency_method must be 'exact' or 'sketch'")
         for col in self.key_columns:
-            freq_table = self.data[col].value_counts(normalize=True)
-            highly_repeated_values = freq_table[freq_table > 0.9].index.tolist()
+            if frequency_method == "sketch":
+                freq_table = sketches[col].verified_heavy_hitters(self.PROPORTION_THRESHOLD,
+                                                                  self._second_pass(col))
+            else:
+                freq_table = stats.value_counts(col)
+            highly_repeated_values = freq_table[freq_table > self.PROPORTION_THRESHOLD].index.tolist()
             if highly_repeated_values:
-                forgery_suspects.append({
-                    "column": col,
-                    "repeated_values": highly_repeated_values,
-                    "manual_forgery_suspected": True
-                })
-        return forgery_suspects
+                columns.append(col)
+                repeated_values.append(highly_repeated_values)
+        return ColumnarReport({
+            "column": columns,
+            "repeated_values": repeated_values,
+            "manual_forgery_suspected": True
+        })
+
+    def build_heavy_hitter_sketches(self, chunks=None, capacity=None, chunk_size=1_000_000):
+        """
+        Constrói um MisraGriesSketch por coluna-chave em uma passada. chunks: iterador
+        opcional de DataFrames (fluxo ou partição); por padrão percorre os chunks do
+        detector ou self.data em blocos. capacity: número de contadores (padrão
+        20 / limiar). Sketches de partições diferentes podem ser combinados com
+        MisraGriesSketch.merge.
+        """
+        if chunks is None:
+            chunks = self.chunks if self.chunks is not None else (
+                self.data.iloc[start:start + chunk_size] for start in range(0, len(self.data), chunk_size))
+        capacity = capacity or math.ceil(20 / self.PROPORTION_THRESHOLD)
+        sketches = {col: MisraGriesSketch(capacity) for col in self.key_columns}
+        for chunk in chunks:
+            for col, sketch in sketches.items():
+                sketch.update(chunk[col])
+        return sketches
+
+    def _default_sketches(self):
+        if self._sketches is None:
+            # Uma única passada pela fonte do detector; os sketches ficam guardados para novas análises
+            self._sketches = self.build_heavy_hitter_sketches()
+        return self._sketches
+
+    def _second_pass(self, col):
+        """Valores da coluna para a recontagem exata, ou None se a fonte não pode ser relida."""
+        if self.chunks is None:
+            return [self.data[col]]
+        if isinstance(self.chunks, (list, tuple)):
+            return (chunk[col] for chunk in self.chunks)
+        return None
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, value_counts=self.key_columns)
+        return self._aggregates
@@ -4,26 +4,94 @@ MaskedFeedbackBiasDetector
 Detecta vieses ocultos em feedbacks onde as respostas foram intencionalmente suavizadas ou mascaradas.
 """
 
-import pandas as pd
+import math
+
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sketches import MisraGriesSketch
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
 
 class MaskedFeedbackBiasDetector:
-    def __init__(self, data, feedback_col):
+    # Custo relativo para o DetectionSuite: tabela de frequências do feedback
+    COST_HINT = 2.0
+    # Proporção a partir da qual um único valor de feedback é considerado suspeito
+    PROPORTION_THRESHOLD = 0.8
+
+    def __init__(self, data, feedback_col, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         feedback_col: coluna que contém os feedbacks numéricos ou categóricos
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
+        self._sketches = None
         self.feedback_col = feedback_col
 
-    def analyze(self):
-        bias_report = []
-        value_counts = self.data[self.feedback_col].value_counts(normalize=True)
+    def analyze(self, frequency_method="exact", sketches=None):
+        """
+        frequency_method: "exact" (tabela de frequências completa) ou "sketch" (heavy hitters
+        em uma passada, memória O(1/limiar)); os candidatos do sketch são recontados de
+        forma exata numa segunda passada quando os dados podem ser relidos (DataFrame ou
+        lista de chunks), senão decidem os limites inferiores
+        sketches: opcional, dicionário coluna -> MisraGriesSketch já construído
+        Com um iterador de uma só passada, cada modo guarda o resultado da sua passada; o outro
+        modo precisaria reler os dados e levanta ValueError
+        """
+        if frequency_method == "sketch":
+            if sketches is None:
+                sketches = self._default_sketches()
+            value_counts = sketches[self.feedback_col].verified_heavy_hitters(self.PROPORTION_THRESHOLD,
+                                                                              self._second_pass(self.feedback_col))
+        elif frequency_method == "exact":
+            value_counts = self._statistics().value_counts(self.feedback_col)
+        else:
+            raise ValueError("frequency_method must be 'exact' or 'sketch'")
         # Detecta concentrações suspeitas no valor mais alto ou médio
-        for val, proportion in value_counts.items():
-            if proportion > 0.8:
-                bias_report.append({
-                    "feedback_value": val,
-                    "proportion": proportion,
-                    "masked_bias_suspected": True
-                })
-        return bias_report
+        flagged = (value_counts > self.PROPORTION_THRESHOLD).to_numpy()
+        return ColumnarReport({
+            "feedback_value": value_counts.index[flagged],
+            "proportion": value_counts.to_numpy()[flagged],
+            "masked_bias_suspected": True
+        })
+
+    def build_heavy_hitter_sketches(self, chunks=None, capacity=None, chunk_size=1_000_000):
+        """
+        Constrói um MisraGriesSketch para a coluna de feedback em uma passada. chunks:
+        iterador opcional de DataFrames (fluxo ou partição); por padrão percorre os chunks
+        do detector ou self.data em blocos. capacity: número de contadores (padrão
+        20 / limiar, erro de no máximo 5% do limiar). Sketches de partições diferentes
+        podem ser combinados com MisraGriesSketch.merge.
+        """
+        if chunks is None:
+            chunks = self.chunks if self.chunks is not None else (
+                self.data.iloc[start:start + chunk_size] for start in range(0, len(self.data), chunk_size))
+        capacity = capacity or math.ceil(20 / self.PROPORTION_THRESHOLD)
+        sketches = {self.feedback_col: MisraGriesSketch(capacity)}
+        for chunk in chunks:
+            for col, sketch in sketches.items():
+                sketch.update(chunk[col])
+        return sketches
+
+    def _default_sketches(self):
+        if self._sketches is None:
+            # Uma única passada pela fonte do detector; os sketches ficam guardados para novas análises
+            self._sketches = self.build_heavy_hitter_sketches()
+        return self._sketches
+
+    def _second_pass(self, col):
+        """Valores da coluna para a recontagem exata, ou None se a fonte não pode ser relida."""
+        if self.chunks is None:
+            return [self.data[col]]
+        if isinstance(self.chunks, (list, tuple)):
+            return (chunk[col] for chunk in self.chunks)
+        return None
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, value_counts=[self.feedback_col])
+        return self._aggregates
@@ -6,6 +6,8 @@ Detecta alterações nos dados que permanecem dentro dos limites aceitáveis, ma
 
 import pandas as pd
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
 class RangeDriftWithoutBreachDetector:
     def __init__(self, data, monitored_col, min_limit, max_limit):
         """
@@ -20,14 +22,13 @@ class RangeDriftWithoutBreachDetector:
         self.max_limit = max_limit
 
     def analyze(self):
-        drift_report = []
         within_range = self.data[(self.data[self.monitored_col] >= self.min_limit) & 
                                  (self.data[self.monitored_col] <= self.max_limit)]
         mean_value = within_range[self.monitored_col].mean()
-        if mean_value > (self.max_limit - self.min_limit) * 0.8 + self.min_limit:
-            drift_report.append({
-                "mean_value": mean_value,
-                "status": "Drift detected within range",
-                "action_recommended": True
-            })
-        return drift_report
+        drift_detected = mean_value > (self.max_limit - self.min_limit) * 0.8 + self.min_limit
+        # Relatório com uma linha quando há drift, vazio caso contrário
+        return ColumnarReport({
+            "mean_value": mean_value,
+            "status": "Drift detected within range",
+            "action_recommended": True
+        }, length=int(drift_detected))
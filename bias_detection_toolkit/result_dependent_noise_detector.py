@@ -4,27 +4,83 @@ ResultDependentNoiseDetector
 Detecta ruídos nos dados que são subprodutos do resultado e não erros de amostragem ou análise.
 """
 
-import pandas as pd
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sampled_statistics import SampledAggregates, interval_contains
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
 
 class ResultDependentNoiseDetector:
-    def __init__(self, data, target_col, noise_col):
+    # Custo relativo para o DetectionSuite: desvio-padrão por grupo
+    COST_HINT = 2.0
+
+    def __init__(self, data, target_col, noise_col, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         target_col: coluna de resultado
         noise_col: coluna suspeita de conter ruído dependente do resultado
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
+        self._sampled = None
         self.target_col = target_col
         self.noise_col = noise_col
 
-    def analyze(self):
-        noise_report = []
-        grouped = self.data.groupby(self.target_col)[self.noise_col].std()
-        for target_value, std_dev in grouped.items():
-            if std_dev > self.data[self.noise_col].std():
-                noise_report.append({
-                    "target_value": target_value,
-                    "std_dev": std_dev,
-                    "result_dependent_noise_suspected": True
-                })
-        return noise_report
+    def analyze(self, approximate=False, sample_size=200, confidence=0.95, escalate=True, seed=None):
+        """
+        approximate: estima o desvio-padrão de cada grupo com uma amostra estratificada (uma passada,
+                     cerca de sample_size linhas por grupo; grupos menores entram inteiros e ficam
+                     exatos) e informa o intervalo de confiança
+        confidence: nível dos intervalos de confiança no modo aproximado
+        escalate: recalcula de forma exata os grupos cujo intervalo cruza o limiar de decisão
+        seed: semente da amostragem
+        Com um iterador de uma só passada, o resultado exato e o aproximado (com os mesmos
+        sample_size, confidence e seed) ficam guardados; passar de um modo ao outro exigiria
+        reler os dados e levanta ValueError
+        """
+        if approximate:
+            return self._analyze_approximate(sample_size, confidence, escalate, seed)
+        stats = self._statistics()
+        grouped = stats.group_stats(self.target_col, self.noise_col)['std']
+        global_std = stats.column_moments(self.noise_col)['std']
+        flagged = (grouped > global_std).to_numpy()
+        return ColumnarReport({
+            "target_value": grouped.index[flagged],
+            "std_dev": grouped.to_numpy()[flagged],
+            "result_dependent_noise_suspected": True
+        })
+
+    def _analyze_approximate(self, sample_size, confidence, escalate, seed):
+        sampled = self._sampled_statistics(sample_size, confidence, seed)
+        global_std = sampled.column_moments()['std']
+        estimates = sampled.group_estimates()
+        if escalate:
+            undecided = interval_contains(estimates['std_low'], estimates['std_high'], [global_std])
+            estimates = sampled.escalate(estimates.index[undecided])
+        flagged = (estimates['std'] > global_std).to_numpy()
+        return ColumnarReport({
+            "target_value": estimates.index[flagged],
+            "std_dev": estimates['std'].to_numpy()[flagged],
+            "std_ci_low": estimates['std_low'].to_numpy()[flagged],
+            "std_ci_high": estimates['std_high'].to_numpy()[flagged],
+            "exact": estimates['exact'].to_numpy()[flagged],
+            "result_dependent_noise_suspected": True
+        })
+
+    def _sampled_statistics(self, sample_size, confidence, seed):
+        params = (sample_size, confidence, seed)
+        if self._sampled is None or self._sampled[0] != params:
+            source = self.data if self.chunks is None else self.chunks
+            self._sampled = params, SampledAggregates(source, self.target_col, self.noise_col,
+                                                      sample_size, confidence, seed)
+        return self._sampled[1]
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, group_stats=[(self.target_col, self.noise_col)],
+                                                 moments=[self.noise_col])
+        return self._aggregates
@@ -0,0 +1,279 @@
+"""
+Module: sampled_statistics
+
+Approximate per-group statistics from a stratified sample drawn in one streaming
+pass, with confidence intervals, for audits of tables too large to aggregate
+exactly. Rows are only hashed to their group and counted; just the sampled rows are
+aggregated, so the pass costs a fraction of an exact aggregation, and small groups
+are sampled whole. Groups whose decision falls inside the error margin can be
+escalated to an exact computation restricted to those groups.
+
+Classes:
+    StratifiedSample - per-group sample of about `capacity` rows with exact group counts.
+    SampledAggregates - group estimates with confidence intervals and exact escalation.
+
+Functions:
+    interval_contains - which intervals contain any of the given decision boundaries.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bias_detection_toolkit.chunked_statistics import GroupMoments, is_chunk_source
+
+
+def interval_contains(low, high, boundaries) -> np.ndarray:
+    """
+    True where [low, high] contains one of the boundaries, i.e. the decision is not
+    settled by the interval; also True where an interval bound is NaN.
+    """
+    low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+    contains = np.isnan(low) | np.isnan(high)
+    for boundary in boundaries:
+        contains |= (low <= boundary) & (boundary <= high)
+    return contains
+
+
+class StratifiedSample:
+    """
+    Per-group sample of about `capacity` rows, with the exact row count of every group.
+    A row of a group that has seen m rows so far is kept with probability
+    min(1, capacity / m): every row gets a priority uniform on [0, 1) and stays while
+    its priority is below the current rate of its group. Rates only go down, so the
+    rows left at any point are a Bernoulli sample of each group at its current rate,
+    i.e. a uniform sample without replacement given its size. Groups of at most
+    `capacity` rows are kept whole. Rejected rows cost O(1) and no sorting is needed:
+    past about 2 x capacity x groups kept rows, the rows above the current rates are
+    dropped.
+    """
+
+    # Maior faixa de chaves inteiras resolvida por tabela direta em vez de hash
+    TABLE_SIZE = 1 << 20
+
+    def __init__(self, capacity: int, seed=None):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self.groups = pd.Index([])
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+        self._parts = []
+        self._size = 0
+        self._table, self._low = None, 0
+
+    @property
+    def rates(self) -> np.ndarray:
+        """Current sampling probability of each group, aligned to groups."""
+        with np.errstate(divide='ignore'):
+            return np.minimum(1.0, self.capacity / self.counts)
+
+    def update(self, keys, values):
+        """Adds a batch of (group key, value) pairs; rows with a missing key or value are ignored."""
+        keys, values = np.asarray(keys), np.asarray(values, dtype=np.float64)
+        codes = self._codes(keys)
+        missing = np.isnan(values)
+        if missing.any() or codes.min(initial=0) < 0:
+            valid = (codes >= 0) & ~missing
+            codes, values = codes[valid], values[valid]
+        self.counts += np.bincount(codes, minlength=len(self.counts))
+
+        # Taxa de cada grupo já com as linhas deste lote: no máximo a taxa vigente ao chegar de cada linha
+        priorities = self._rng.random(len(codes))
+        keep = np.flatnonzero(priorities < self.rates[codes])
+        self._parts.append((codes[keep], values[keep], priorities[keep]))
+        self._size += len(keep)
+        if self._size > 2 * self.capacity * len(self.groups):
+            self._thin()
+        return self
+
+    @property
+    def rows(self) -> pd.DataFrame:
+        """The sampled rows, as a DataFrame with columns key and value."""
+        codes, values = self.sampled()
+        return pd.DataFrame({'key': self.groups[codes], 'value': values})
+
+    def sampled(self):
+        """The sampled rows as (codes, values) arrays, codes being positions in groups."""
+        self._thin()
+        if not self._parts:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float64)
+        codes, values, _ = self._parts[0]
+        return codes, values
+
+    def _codes(self, keys) -> np.ndarray:
+        if len(self.groups) == 0:
+            uniques = pd.unique(keys)
+            self.groups = pd.Index(uniques[~pd.isna(uniques)])
+        codes = self._table_codes(keys)
+        if codes is None:
+            codes = self.groups.get_indexer(keys)
+        unknown = codes < 0
+        if unknown.any():
+            # Grupos novos vão para o fim do índice; chaves ausentes continuam com -1
+            uniques = pd.unique(keys[unknown])
+            uniques = uniques[~pd.isna(uniques)]
+            if len(uniques):
+                self.groups = self.groups.append(pd.Index(uniques))
+                self._table = None
+                codes[unknown] = self.groups.get_indexer(keys[unknown])
+        if len(self.counts) < len(self.groups):
+            self.counts = np.concatenate([self.counts, np.zeros(len(self.groups) - len(self.counts), dtype=np.int64)])
+        return codes
+
+    def _table_codes(self, keys):
+        """Codes read from a direct value -> code table when the integer keys span a short range, else None."""
+        if keys.dtype.kind not in 'iu' or self.groups.dtype.kind not in 'iu' or len(keys) == 0:
+            return None
+        low, high = int(keys.min()), int(keys.max())
+        if self._table is None or low < self._low or high >= self._low + len(self._table):
+            low, high = min(low, int(self.groups.min())), max(high, int(self.groups.max()))
+            if high - low >= max(self.TABLE_SIZE, 8 * len(self.groups)):
+                return None
+            self._low, self._table = low, np.full(high - low + 1, -1, dtype=np.intp)
+            self._table[self.groups.to_numpy() - low] = np.arange(len(self.groups))
+        return self._table[keys - self._low if self._low else keys]
+
+    def _thin(self):
+        # Só ficam as linhas com prioridade abaixo da taxa atual do grupo
+        if not self._parts:
+            return
+        codes, values, priorities = (np.concatenate(arrays) for arrays in zip(*self._parts))
+        keep = priorities < self.rates[codes]
+        self._parts = [(codes[keep], values[keep], priorities[keep])]
+        self._size = int(keep.sum())
+
+
+class SampledAggregates:
+    """
+    One pass over a DataFrame or a chunk source computing the exact global mean and
+    standard deviation of `column`, the exact row count of every group and a
+    stratified sample of about `sample_size` rows per group (StratifiedSample). Only
+    the sampled rows are aggregated, so on sources much larger than sample_size x
+    groups the pass is several times cheaper than ChunkedAggregates
+    (benchmarks/bench_sampled_statistics.py).
+
+    group_estimates() gives, per group, the exact row count, the sample mean with a t
+    interval (with finite-population correction) and the sample standard deviation
+    with a chi-square interval, which assumes roughly normal values within the group.
+    Groups with at most sample_size rows are sampled whole: their statistics are exact
+    and their intervals collapse to the point. A larger group left with fewer than two
+    sampled rows has NaN estimates, which interval_contains treats as undecided.
+    escalate() recomputes the given groups exactly with a second pass, which needs a
+    DataFrame or a list/tuple of chunks; a one-shot iterator cannot be read twice and
+    its groups stay approximate.
+    """
+
+    def __init__(self, data, by, column, sample_size: int = 200, confidence: float = 0.95,
+                 seed=None, chunk_size: int = 1_000_000):
+        self.by = by
+        self.column = column
+        self.confidence = confidence
+        self._data = data
+        self._chunk_size = chunk_size
+        self.reusable = isinstance(data, (pd.DataFrame, list, tuple))
+
+        sample = StratifiedSample(sample_size, seed=seed)
+        moments = (0, 0.0, 0.0)
+        for chunk in self._chunks():
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            moments = _merge_moments(moments, values)
+            sample.update(chunk[by], values)
+
+        count, mean, m2 = moments
+        self._moments = {
+            'mean': mean if count else np.nan,
+            'std': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan,
+        }
+        self._estimates = self._estimate(sample)
+
+    def column_moments(self) -> dict:
+        """Exact global mean and sample standard deviation of the column."""
+        return dict(self._moments)
+
+    def group_estimates(self) -> pd.DataFrame:
+        """
+        Per group (sorted): count, sample_count, mean, mean_low, mean_high, std,
+        std_low, std_high and exact (whether the statistics are exact).
+        """
+        return self._estimates.copy()
+
+    def escalate(self, groups) -> pd.DataFrame:
+        """
+        Estimates with the given groups recomputed exactly (when the source can be read
+        again). The cached estimates are left untouched: group_estimates() still returns
+        the sampled values afterwards.
+        """
+        groups = pd.Index(groups).intersection(self._estimates.index)
+        groups = groups[~self._estimates.loc[groups, 'exact'].to_numpy()]
+        if len(groups) == 0 or not self.reusable:
+            return self.group_estimates()
+
+        moments = GroupMoments()
+        for chunk in self._chunks():
+            chunk = chunk[chunk[self.by].isin(groups)]
+            if len(chunk):
+                moments.update(chunk[self.column], chunk[self.by])
+        exact = moments.result()
+        estimates = self.group_estimates()
+        for statistic in ('mean', 'std'):
+            for column in (statistic, f'{statistic}_low', f'{statistic}_high'):
+                estimates.loc[exact.index, column] = exact[statistic]
+        estimates.loc[exact.index, 'exact'] = True
+        return estimates
+
+    def _chunks(self):
+        if is_chunk_source(self._data):
+            return iter(self._data)
+        frame = self._data if isinstance(self._data, pd.DataFrame) else pd.DataFrame(self._data)
+        return (frame.iloc[start:start + self._chunk_size] for start in range(0, len(frame), self._chunk_size))
+
+    def _estimate(self, sample: StratifiedSample) -> pd.DataFrame:
+        from scipy import special
+
+        codes, values = sample.sampled()
+        total = sample.counts.astype(np.float64)
+        n = np.bincount(codes, minlength=len(total)).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(codes, weights=values, minlength=len(total)) / n
+            deviations = values - mean[codes]
+            std = np.sqrt(np.bincount(codes, weights=deviations ** 2, minlength=len(total)) / (n - 1))
+        std[n < 2] = np.nan
+        alpha = 1.0 - self.confidence
+        exact = n >= total
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Intervalo t para a média, com correção para população finita
+            margin = special.stdtrit(n - 1, 1.0 - alpha / 2) * std / np.sqrt(n) * np.sqrt(1.0 - n / total)
+            # Intervalo qui-quadrado para o desvio-padrão
+            std_low = std * np.sqrt((n - 1) / special.chdtri(n - 1, alpha / 2))
+            std_high = std * np.sqrt((n - 1) / special.chdtri(n - 1, 1.0 - alpha / 2))
+
+        estimates = pd.DataFrame({
+            'count': sample.counts,
+            'sample_count': n.astype(np.int64),
+            'mean': mean,
+            'mean_low': np.where(exact, mean, mean - margin),
+            'mean_high': np.where(exact, mean, mean + margin),
+            'std': std,
+            'std_low': np.where(exact, std, std_low),
+            'std_high': np.where(exact, std, std_high),
+            'exact': exact,
+        }, index=sample.groups)
+        estimates.index.name = self.by
+        return estimates.sort_index()
+
+
+def _merge_moments(moments, values):
+    """Merges the count, mean and M2 of the non-missing values into moments (Chan et al.)."""
+    missing = np.isnan(values)
+    if missing.any():
+        values = values[~missing]
+    if len(values) == 0:
+        return moments
+    count, mean, m2 = moments
+    chunk_mean = values.mean()
+    deviations = values - chunk_mean
+    total = count + len(values)
+    delta = chunk_mean - mean
+    weight = len(values) / total
+    return total, mean + delta * weight, m2 + deviations @ deviations + delta ** 2 * count * weight
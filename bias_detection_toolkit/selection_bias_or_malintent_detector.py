@@ -4,30 +4,106 @@ SelectionBiasOrMalintentDetector
 Detecta seleção de dados enviesada ou com intenção maliciosa no processo de geração do conjunto de dados.
 """
 
-import pandas as pd
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates, split_data_source
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sampled_statistics import SampledAggregates, interval_contains
+from bias_detection_toolkit.significance import group_significance
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
 
 class SelectionBiasOrMalintentDetector:
-    def __init__(self, data, group_col, metric_col):
+    # Custo relativo para o DetectionSuite: médias por grupo
+    COST_HINT = 2.0
+
+    def __init__(self, data, group_col, metric_col, stats=None):
         """
-        data: DataFrame com os dados
+        data: DataFrame com os dados, ou iterador de DataFrames (chunks) para execução fora da memória
         group_col: coluna usada para agrupar os dados
         metric_col: coluna métrica para verificar desvios entre os grupos
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
         """
-        self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.data, self.chunks = split_data_source(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
+        self._aggregates = None
+        self._sampled = None
         self.group_col = group_col
         self.metric_col = metric_col
 
-    def analyze(self):
-        bias_report = []
-        group_means = self.data.groupby(self.group_col)[self.metric_col].mean()
-        global_mean = self.data[self.metric_col].mean()
-        for group, mean in group_means.items():
-            deviation = abs(mean - global_mean) / global_mean
-            if deviation > 0.5:  # grande desvio indica possível viés de seleção
-                bias_report.append({
-                    "group": group,
-                    "mean": mean,
-                    "deviation_from_global": deviation,
-                    "selection_bias_or_malintent": True
-                })
-        return bias_report
+    def analyze(self, approximate=False, sample_size=200, confidence=0.95, escalate=True, seed=None,
+                significance=None, n_resamples=10_000, alpha=0.05, n_jobs=1):
+        """
+        approximate: estima a média de cada grupo com uma amostra estratificada (uma passada,
+                     cerca de sample_size linhas por grupo; grupos menores entram inteiros e ficam
+                     exatos) e informa o intervalo de confiança
+        confidence: nível dos intervalos de confiança no modo aproximado
+        escalate: recalcula de forma exata os grupos cujo intervalo cruza o limiar de decisão
+        seed: semente da amostragem e das reamostragens
+        significance: opcional, 'permutation' ou 'bootstrap'; calcula o p-valor de cada grupo e só
+                      marca os grupos cujo p-valor ajustado (Benjamini-Hochberg) fica abaixo de alpha
+        n_resamples: número de reamostragens do teste de significância
+        alpha: taxa de falsas descobertas aceita
+        n_jobs: processos usados nas reamostragens (o resultado não depende dele)
+        Com um iterador de uma só passada, o resultado exato e o aproximado (com os mesmos
+        sample_size, confidence e seed) ficam guardados; passar de um modo ao outro exigiria
+        reler os dados e levanta ValueError
+        """
+        if significance is not None and (approximate or self.chunks is not None):
+            raise ValueError("significance requires exact analysis of an in-memory DataFrame")
+        if approximate:
+            return self._analyze_approximate(sample_size, confidence, escalate, seed)
+        stats = self._statistics()
+        group_means = stats.group_stats(self.group_col, self.metric_col)['mean']
+        global_mean = stats.column_moments(self.metric_col)['mean']
+        deviation = (group_means - global_mean).abs() / global_mean
+        flagged = (deviation > 0.5).to_numpy()  # grande desvio indica possível viés de seleção
+        report = {
+            "group": group_means.index,
+            "mean": group_means.to_numpy(),
+            "deviation_from_global": deviation.to_numpy(),
+        }
+        if significance is not None:
+            tested = group_significance(self.data[self.metric_col], self.data[self.group_col], group_means.index,
+                                        method=significance, n_resamples=n_resamples, n_jobs=n_jobs, seed=seed)
+            report["p_value"] = tested['p_value'].to_numpy()
+            report["p_value_adjusted"] = tested['p_value_adjusted'].to_numpy()
+            flagged = flagged & (report["p_value_adjusted"] < alpha)
+        report = {name: values[flagged] for name, values in report.items()}
+        report["selection_bias_or_malintent"] = True
+        return ColumnarReport(report)
+
+    def _analyze_approximate(self, sample_size, confidence, escalate, seed):
+        sampled = self._sampled_statistics(sample_size, confidence, seed)
+        global_mean = sampled.column_moments()['mean']
+        estimates = sampled.group_estimates()
+        if escalate:
+            # Desvio relativo de 0.5 para cada lado da média global
+            boundaries = [global_mean - 0.5 * global_mean, global_mean + 0.5 * global_mean]
+            undecided = interval_contains(estimates['mean_low'], estimates['mean_high'], boundaries)
+            estimates = sampled.escalate(estimates.index[undecided])
+        deviation = (estimates['mean'] - global_mean).abs() / global_mean
+        flagged = (deviation > 0.5).to_numpy()
+        return ColumnarReport({
+            "group": estimates.index[flagged],
+            "mean": estimates['mean'].to_numpy()[flagged],
+            "mean_ci_low": estimates['mean_low'].to_numpy()[flagged],
+            "mean_ci_high": estimates['mean_high'].to_numpy()[flagged],
+            "deviation_from_global": deviation.to_numpy()[flagged],
+            "exact": estimates['exact'].to_numpy()[flagged],
+            "selection_bias_or_malintent": True
+        })
+
+    def _sampled_statistics(self, sample_size, confidence, seed):
+        params = (sample_size, confidence, seed)
+        if self._sampled is None or self._sampled[0] != params:
+            source = self.data if self.chunks is None else self.chunks
+            self._sampled = params, SampledAggregates(source, self.group_col, self.metric_col,
+                                                      sample_size, confidence, seed)
+        return self._sampled[1]
+
+    def _statistics(self):
+        if self.chunks is None:
+            return self.stats.for_frame(self.data)
+        if self._aggregates is None:
+            # Uma única passada pelos chunks; o resultado fica guardado para novas análises
+            self._aggregates = ChunkedAggregates(self.chunks, group_stats=[(self.group_col, self.metric_col)],
+                                                 moments=[self.metric_col])
+        return self._aggregates
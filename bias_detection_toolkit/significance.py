@@ -0,0 +1,236 @@
+"""
+Module: significance
+
+Resampling p-values for every group at once, used by the group-deviation detectors
+to confirm their heuristic flags. Under the permutation null the statistic of a
+group of k rows is that of k values drawn without replacement from the pooled
+values, so it only depends on k: each resample draws distinct rows once and the
+prefix sums of that draw give the null statistic of every group size (groups
+larger than half the rows use the complement). Sizes whose draw would exceed an
+eighth of the rows (a group and its complement both large) instead share one
+random byte per row and resample, cut near the size and corrected to it exactly,
+so no row is ever shuffled. For the bootstrap the rows are sorted by group once
+and each batch of resamples is a (resamples x rows) matrix gathered with
+within-group random indices, reduced with a single reduceat over the group
+boundaries. Batches draw from independent streams spawned from one SeedSequence,
+so the p-values only depend on the seed, whatever the number of worker processes.
+
+Functions:
+    group_pvalues - permutation or bootstrap p-values of group means or standard deviations.
+    benjamini_hochberg - FDR-adjusted p-values (Benjamini and Hochberg, 1995).
+    group_significance - p-values and adjusted p-values aligned to a group index.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('permutation', 'bootstrap')
+STATISTICS = ('mean', 'std')
+
+
+def _group_statistic(sums, sumsq, sizes, statistic):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if statistic == 'mean':
+            return sums / sizes
+        return np.sqrt(np.maximum(sumsq - sums ** 2 / sizes, 0.0) / (sizes - 1))
+
+
+def _distinct_indices(rng, n, rows, depth):
+    """
+    (rows x depth) indices in [0, n), distinct within each row. Repeated indices are
+    redrawn until none is left; the rule only looks at which indices are equal, so
+    every ordered draw without replacement is equally likely and each prefix is a
+    uniform sample without replacement of its length.
+    """
+    indices = rng.integers(0, n, (rows, depth))
+    while True:
+        order = np.argsort(indices, axis=1, kind='stable')
+        ranked = np.take_along_axis(indices, order, axis=1)
+        row, column = np.nonzero(ranked[:, 1:] == ranked[:, :-1])
+        if len(row) == 0:
+            return indices
+        indices[row, order[row, column + 1]] = rng.integers(0, n, len(row))
+
+
+def _subset_sums(rng, weighted, depths):
+    """
+    Column sums of weighted (rows x moments) over a uniform sample without
+    replacement of depths[i] rows, for every i. Each row draws one random byte and
+    the rows under a cut near depths[i] / rows are kept; random kept rows are then
+    dropped (or random other rows added) to reach exactly depths[i]. No step tells
+    the rows apart, so every sample of that size is equally likely.
+    """
+    n = len(weighted)
+    keys = np.frombuffer(rng.bytes(n), dtype=np.uint8)
+    sums = np.empty((len(depths), weighted.shape[1]))
+    for i, depth in enumerate(depths):
+        kept = keys < round(256 * depth / n)
+        count = np.count_nonzero(kept)
+        sums[i] = kept @ weighted
+        if count != depth:
+            pool = np.flatnonzero(kept if count > depth else ~kept)
+            chosen = pool[rng.choice(len(pool), abs(count - depth), replace=False)]
+            sums[i] += np.sign(depth - count) * weighted[chosen].sum(axis=0)
+    return sums
+
+
+def _prefix_exceedances(values, codes, n_groups, batches, statistic, center, observed):
+    """Permutation exceedances from one draw without replacement per resample, shared by all group sizes."""
+    n = len(values)
+    sizes = np.bincount(codes, minlength=n_groups)
+    present = np.flatnonzero(sizes)
+    sizes = sizes[present]
+    # Grupos com mais da metade das linhas: soma = total - soma das n - k linhas restantes
+    complement = sizes > n - sizes
+    depth = np.where(complement, n - sizes, sizes)
+    # Profundidades acima de um oitavo das linhas: uma amostra por reamostragem, sem índices distintos
+    deep = 8 * depth > n
+    shallow_depth = int(depth[~deep].max(initial=0))
+    deep_depths, deep_index = np.unique(depth[deep], return_inverse=True)
+    weighted = np.column_stack([values, values ** 2] if statistic == 'std' else [values])
+    totals = weighted.sum(axis=0)
+
+    exceedances = np.zeros(n_groups, dtype=np.int64)
+    for seed, size in batches:
+        rng = np.random.default_rng(seed)
+        moments = [np.empty((size, len(sizes))) for _ in totals]
+        if not deep.all():
+            drawn = values[_distinct_indices(rng, n, size, shallow_depth)]
+            for power, moment in enumerate(moments, start=1):
+                prefix = np.zeros((size, shallow_depth + 1))
+                np.cumsum(drawn ** power, axis=1, out=prefix[:, 1:])
+                moment[:, ~deep] = prefix[:, depth[~deep]]
+        if deep.any():
+            for row in range(size):
+                sums = _subset_sums(rng, weighted, deep_depths)
+                for k, moment in enumerate(moments):
+                    moment[row, deep] = sums[deep_index, k]
+        moments = [np.where(complement, total - moment, moment) for moment, total in zip(moments, totals)]
+        sums, sumsq = moments[0], moments[1] if statistic == 'std' else None
+        resampled = np.abs(_group_statistic(sums, sumsq, sizes, statistic) - center)
+        exceedances[present] += (resampled >= observed[present] * (1 - 1e-9)).sum(axis=0)
+    return exceedances
+
+
+def _bootstrap_exceedances(values, codes, n_groups, batches, statistic, center, observed):
+    """Count, per group, the bootstrap resamples whose statistic is at least as extreme as observed."""
+    # Linhas ordenadas por grupo: cada grupo é um trecho contíguo, somado com reduceat
+    order = np.argsort(codes, kind='stable')
+    codes, values = codes[order], values[order]
+    first = np.r_[True, codes[1:] != codes[:-1]]
+    starts = np.flatnonzero(first)
+    sizes = np.diff(np.r_[starts, len(codes)])
+    # Posição de cada linha entre os grupos presentes (grupos sem linhas ficam de fora)
+    dense = np.cumsum(first) - 1
+    present = codes[starts]
+
+    # Hipótese nula imposta em cada grupo: média (ou desvio) igual ao valor global
+    means = np.add.reduceat(values, starts) / sizes
+    deviations = values - means[dense]
+    if statistic == 'mean':
+        null = deviations + center
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stds = np.sqrt(np.add.reduceat(deviations ** 2, starts) / (sizes - 1))
+            scale = np.where(stds > 0, center / stds, 1.0)
+        null = deviations * scale[dense] + means[dense]
+
+    exceedances = np.zeros(n_groups, dtype=np.int64)
+    for seed, size in batches:
+        rng = np.random.default_rng(seed)
+        # Reamostragem com reposição dentro do grupo de cada posição
+        resample = null[starts[dense] + (rng.random((size, len(values))) * sizes[dense]).astype(np.int64)]
+        sums = np.add.reduceat(resample, starts, axis=1)
+        sumsq = np.add.reduceat(resample ** 2, starts, axis=1) if statistic == 'std' else None
+        resampled = np.abs(_group_statistic(sums, sumsq, sizes, statistic) - center)
+        exceedances[present] += (resampled >= observed[present] * (1 - 1e-9)).sum(axis=0)
+    return exceedances
+
+
+def group_pvalues(values, codes, n_groups: int, statistic: str = 'mean', method: str = 'permutation',
+                  n_resamples: int = 10_000, batch_size: int = None, n_jobs: int = 1, seed=None) -> np.ndarray:
+    """
+    Two-sided p-value, per group, of |group statistic - overall statistic|.
+
+    values: float array, one per row (no missing values)
+    codes: group code of every row, in [0, n_groups)
+    statistic: 'mean' or 'std' (sample standard deviation)
+    method: 'permutation' shuffles the group labels; 'bootstrap' resamples each group
+            with replacement after shifting (mean) or rescaling (std) it to the null
+    batch_size: resamples per batch (default: about 4M matrix cells per batch)
+    seed: seed of the SeedSequence whose spawned streams feed the batches
+    n_jobs: worker processes (joblib); the result does not depend on it
+
+    Returns (1 + exceedances) / (1 + n_resamples); NaN for the std of groups with a single row.
+    The smallest attainable p-value is 1 / (1 + n_resamples): with m groups, a group
+    can only pass the Benjamini-Hochberg cutoff at level alpha if n_resamples is well
+    above m / alpha divided by the number of discoveries.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    if statistic not in STATISTICS:
+        raise ValueError(f"statistic must be one of {STATISTICS}")
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes, dtype=np.int32 if n_groups < 2 ** 31 else np.int64)
+
+    sizes = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    sumsq = np.bincount(codes, weights=values ** 2, minlength=n_groups)
+    center = values.mean() if statistic == 'mean' else values.std(ddof=1)
+    observed = np.abs(_group_statistic(sums, sumsq, sizes, statistic) - center)
+
+    if method == 'permutation':
+        # Matriz de reamostragem com depth + grupos colunas, em vez de uma coluna por linha; as
+        # profundidades acima de um oitavo das linhas são sorteadas uma reamostragem por vez
+        depth = np.minimum(sizes, len(values) - sizes)
+        engine, arguments = _prefix_exceedances, (statistic, center, observed)
+        cells = int(depth[8 * depth <= len(values)].max(initial=0)) + np.count_nonzero(sizes)
+    else:
+        engine, arguments = _bootstrap_exceedances, (statistic, center, observed)
+        cells = len(values)
+
+    batch_size = batch_size or max(1, min(n_resamples, 2 ** 22 // max(cells, 1)))
+    n_batches = -(-n_resamples // batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    batches = [(seeds[k], min(batch_size, n_resamples - k * batch_size)) for k in range(n_batches)]
+
+    if n_jobs == 1:
+        exceedances = engine(values, codes, n_groups, batches, *arguments)
+    else:
+        from joblib import Parallel, delayed
+
+        # Poucas tarefas grandes: os arrays são enviados uma vez por tarefa
+        n_tasks = min(len(batches), 4 * (n_jobs if n_jobs > 0 else 8))
+        exceedances = sum(Parallel(n_jobs=n_jobs)(
+            delayed(engine)(values, codes, n_groups, batches[task::n_tasks], *arguments)
+            for task in range(n_tasks)
+        ))
+
+    p_values = (1.0 + exceedances) / (1.0 + n_resamples)
+    return np.where(np.isnan(observed), np.nan, p_values)
+
+
+def benjamini_hochberg(p_values) -> np.ndarray:
+    """Benjamini-Hochberg adjusted p-values; NaN entries are left out of the family and stay NaN."""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p_values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p_values))
+    if len(valid) == 0:
+        return adjusted
+    order = valid[np.argsort(p_values[valid], kind='stable')]
+    ranked = p_values[order] * len(valid) / np.arange(1, len(valid) + 1)
+    adjusted[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return adjusted
+
+
+def group_significance(values: pd.Series, keys, groups: pd.Index, **kwargs) -> pd.DataFrame:
+    """
+    p_value and p_value_adjusted (Benjamini-Hochberg over all the groups) for each
+    entry of groups, computed from the rows whose key is in groups and whose value is
+    not missing. kwargs are passed to group_pvalues.
+    """
+    codes = groups.get_indexer(pd.Index(keys))
+    values = np.asarray(values, dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values)
+    p_values = group_pvalues(values[keep], codes[keep], len(groups), **kwargs)
+    return pd.DataFrame({'p_value': p_values, 'p_value_adjusted': benjamini_hochberg(p_values)}, index=groups)
@@ -0,0 +1,288 @@
+"""
+Module: sketches
+
+Mergeable streaming summaries used by the detectors when the data arrives in chunks
+or partitions and the exact statistic would need the whole column in memory.
+
+Classes:
+    KLLSketch - approximate quantiles (Karnin, Lang and Liberty, 2016).
+    MisraGriesSketch - frequent values above a proportion threshold (Misra and Gries, 1982).
+    CountSketch - random linear projection of the rows of a matrix (Clarkson and Woodruff, 2013).
+    ReservoirSample - uniform sample of fixed size over a stream of rows (Vitter, 1985).
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    """
+    Quantile sketch with O(k log(n / k)) memory. The rank error is roughly 1.7 / k
+    with high probability (about 1% for the default k=200). Sketches built on
+    separate partitions can be merged. While no compaction has happened (fewer than
+    k values) quantiles are exact and interpolated like pandas.
+    """
+
+    def __init__(self, k: int = 200, seed=None):
+        self.k = k
+        self.n = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Adds a batch of values; NaN values are ignored, as in Series.quantile."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Estimated quantile(s) for q in [0, 1]; NaN for an empty sketch."""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if len(self._levels) == 1:
+            return np.quantile(self._levels[0], q)
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        targets = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        position = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(items) - 1)
+        return items[position]
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self._levels)
+        return max(int(math.ceil(self.k * (2.0 / 3.0) ** (depth - h - 1))), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if len(items) < self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            # Compacta o nível: ordena e promove metade dos itens (peso dobrado) ao nível seguinte
+            items = np.sort(items)
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            pairs = items[:len(items) - len(keep)]
+            promoted = pairs[self._rng.integers(2)::2]
+            self._levels[h] = keep
+            self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+            h = 0
+
+
+class MisraGriesSketch:
+    """
+    Heavy-hitter summary with at most `capacity` counters, merged as in Agarwal et al.
+    (2012). Every value whose frequency exceeds n / (capacity + 1) keeps a counter, and
+    each counter underestimates its value's count by at most
+    (n - sum of counters) / (capacity + 1). While the number of distinct values stays
+    within capacity the counts are exact. Missing values are ignored, as in value_counts.
+    Counters only bound the counts: verified_heavy_hitters confirms the candidates
+    with an exact second pass before they are reported.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.n = 0
+        self.counts = None
+
+    def update(self, values):
+        """
+        Adds a batch of values (array-like or Series). The batch is counted in slices of
+        max(65536, 32 x capacity) values, each folded into the counters (at most
+        `capacity`) before the next one, so the counting memory does not grow with the
+        number of distinct values in the batch.
+        """
+        values = values if isinstance(values, pd.Series) else pd.Series(values)
+        step = max(1 << 16, 32 * self.capacity)
+        for start in range(0, len(values), step):
+            counts = values.iloc[start:start + step].value_counts()
+            self._add(counts, int(counts.sum()))
+        return self
+
+    def merge(self, other: 'MisraGriesSketch'):
+        if other.counts is not None:
+            self._add(other.counts, other.n)
+        return self
+
+    def upper_bounds(self) -> pd.Series:
+        """Upper bound of the count of every tracked value (at least its true count)."""
+        if self.counts is None:
+            return pd.Series(dtype=np.float64)
+        slack = (self.n - self.counts.sum()) / (self.capacity + 1)
+        return self.counts + slack
+
+    def lower_bounds(self) -> pd.Series:
+        """Lower bound of the count of every tracked value (the counter itself)."""
+        if self.counts is None:
+            return pd.Series(dtype=np.int64)
+        return self.counts.copy()
+
+    def heavy_hitters(self, threshold: float) -> pd.Series:
+        """
+        Values whose proportion may exceed threshold, mapped to the upper bound of their
+        proportion and sorted in decreasing order. No value above the threshold is missed
+        as long as threshold >= 1 / (capacity + 1).
+        """
+        if self.n == 0:
+            return pd.Series(dtype=np.float64, name='proportion')
+        proportions = self.upper_bounds() / self.n
+        proportions = proportions[proportions > threshold].sort_values(ascending=False, kind='stable')
+        proportions.name = 'proportion'
+        return proportions
+
+    def verified_heavy_hitters(self, threshold: float, batches=None) -> pd.Series:
+        """
+        Values whose proportion exceeds threshold, sorted in decreasing order. The
+        candidates of heavy_hitters are counted exactly in a second pass over batches
+        (an iterable over the same values again), so the result matches
+        value_counts(normalize=True) filtered at the threshold. Without batches the
+        counters (lower bounds) decide: nothing below the threshold is reported, but
+        values just above it may be missed.
+        """
+        candidates = self.heavy_hitters(threshold).index
+        if batches is None:
+            counts = self.lower_bounds().loc[candidates]
+        else:
+            counts = pd.Series(0, index=candidates, dtype=np.int64)
+            for batch in batches:
+                batch = batch if isinstance(batch, pd.Series) else pd.Series(batch)
+                counts = counts.add(batch[batch.isin(candidates)].value_counts(), fill_value=0)
+        proportions = counts.astype(np.float64) / self.n if self.n else counts.astype(np.float64)
+        proportions = proportions[proportions > threshold].sort_values(ascending=False, kind='stable')
+        proportions.name = 'proportion'
+        return proportions
+
+    def __len__(self):
+        return self.n
+
+    def _add(self, counts: pd.Series, n: int):
+        self.n += n
+        combined = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        if len(combined) > self.capacity:
+            # Subtrai a (capacity + 1)-ésima maior contagem de todas e descarta as que zeram
+            cut = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > cut] - cut
+        self.counts = combined.astype(np.int64)
+
+
+class CountSketch:
+    """
+    Sketch S @ X of a tall matrix X (n x p) with `sketch_rows` rows: every input row
+    is added, with a random sign, to one random sketch row. The sketch is linear, so
+    centering can be applied afterwards (S @ (X - 1 mu^T) = S @ X - (S @ 1) mu^T, with
+    S @ 1 kept in row_sums), and exact linear dependencies between the columns of X
+    hold in the sketch too. Sketches of separate partitions with the same number of
+    sketch rows can be merged.
+    """
+
+    def __init__(self, sketch_rows: int, n_columns: int, seed=None):
+        if sketch_rows < 1:
+            raise ValueError("sketch_rows must be at least 1")
+        self.n = 0
+        self.table = np.zeros((sketch_rows, n_columns))
+        self.row_sums = np.zeros(sketch_rows)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Adds a batch of rows (2-D array-like with n_columns columns)."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        if len(values) == 0:
+            return self
+        buckets = self._rng.integers(0, len(self.table), size=len(values))
+        signs = self._rng.choice(np.array([-1.0, 1.0]), size=len(values))
+        # Ordena as linhas por balde e soma cada trecho de uma vez (evita np.add.at)
+        order = np.argsort(buckets, kind='stable')
+        buckets, signs = buckets[order], signs[order]
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        self.table[buckets[starts]] += np.add.reduceat(values[order] * signs[:, None], starts, axis=0)
+        self.row_sums[buckets[starts]] += np.add.reduceat(signs, starts)
+        self.n += len(values)
+        return self
+
+    def merge(self, other: 'CountSketch'):
+        if other.table.shape != self.table.shape:
+            raise ValueError("Only sketches with the same shape can be merged")
+        self.table += other.table
+        self.row_sums += other.row_sums
+        self.n += other.n
+        return self
+
+    def centered(self, mean) -> np.ndarray:
+        """Sketch of X - 1 mean^T."""
+        return self.table - np.outer(self.row_sums, mean)
+
+    def __len__(self):
+        return self.n
+
+
+class ReservoirSample:
+    """
+    Uniform random sample of at most `capacity` rows out of every row seen so far
+    (Algorithm R, vectorized per batch). Memory is bounded by capacity whatever the
+    length of the stream.
+    """
+
+    def __init__(self, capacity: int, seed=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.n = 0
+        self.rows = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Adds a batch of rows (array-like; rows along the first axis)."""
+        values = np.asarray(values)
+        if len(values) == 0:
+            return self
+        if self.rows is None:
+            self.rows = np.empty((0,) + values.shape[1:], dtype=values.dtype)
+
+        # Enquanto o reservatório não enche, as linhas entram direto
+        free = max(0, min(self.capacity - len(self.rows), len(values)))
+        self.rows = np.concatenate([self.rows, values[:free]])
+        self.n += free
+        values = values[free:]
+        if len(values) == 0:
+            return self
+
+        # A t-ésima linha (base 0) substitui a posição j ~ U{0..t} quando j < capacity
+        seen = self.n + np.arange(len(values))
+        slots = (self._rng.random(len(values)) * (seen + 1)).astype(np.int64)
+        accepted = np.flatnonzero(slots < self.capacity)
+        # Se duas linhas caem na mesma posição, fica a mais recente
+        reverse = accepted[::-1]
+        positions, last = np.unique(slots[reverse], return_index=True)
+        self.rows[positions] = values[reverse[last]]
+        self.n += len(values)
+        return self
+
+    @property
+    def sample(self) -> np.ndarray:
+        return self.rows if self.rows is not None else np.empty(0)
+
+    def __len__(self):
+        return self.n
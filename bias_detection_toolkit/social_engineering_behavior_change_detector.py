@@ -11,6 +11,18 @@ Classes:
 import pandas as pd
 import numpy as np
 
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
+# Diferença mínima entre as médias pós e pré-evento para considerar uma mudança relevante
+SHIFT_THRESHOLD = 0.1
+
+
+def _segment_means(cum_sum: np.ndarray, cum_count: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """Means over the sorted rows [start, stop) from prefix sums, skipping NaN like pandas."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (cum_sum[stop] - cum_sum[start]) / (cum_count[stop] - cum_count[start])
+
+
 class SocialEngineeringBehaviorChangeDetector:
     def __init__(self):
         pass
@@ -44,10 +56,82 @@ class SocialEngineeringBehaviorChangeDetector:
                     'pre_event_mean': pre_event,
                     'post_event_mean': post_event,
                     'difference': diff,
-                    'shift_detected': abs(diff) > 0.1  # Threshold for meaningful shift
+                    'shift_detected': abs(diff) > SHIFT_THRESHOLD
                 })
         return shifts_report
 
+    def detect_behavior_shifts_fast(self, data: pd.DataFrame, subject_col: str, behavior_metric: str,
+                                    event_dates: list) -> ColumnarReport:
+        """
+        Same shifts as detect_behavior_shifts, computed for all subjects and events at
+        once: a single sort by (subject, time), prefix sums of the behavior metric and
+        searchsorted to split each subject's rows at every event date. Events are
+        processed one at a time, so besides the report memory is O(rows + subjects).
+
+        Returns:
+        - ColumnarReport with one row per (subject, event) pair that has data on both
+          sides of the event (subject, event_date, pre_event_mean, post_event_mean,
+          difference, shift_detected), in the order of the nested report
+        """
+        times = pd.Index(data.index)
+        events = pd.Index(event_dates)
+        codes, subjects = pd.factorize(data[subject_col], sort=True)
+        # Linhas sem sujeito ou sem data não entram em nenhuma das janelas
+        keep = (codes >= 0) & ~np.asarray(times.isna())
+        times = times[keep]
+
+        # Posição de cada instante na linha do tempo (dados + eventos): a chave inteira
+        # sujeito * largura + posição ordena as linhas por (sujeito, tempo)
+        timeline = times.append(events).unique().sort_values()
+        width = len(timeline)
+        keys = codes[keep].astype(np.int64) * width + timeline.get_indexer(times)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+
+        values = data[behavior_metric].to_numpy(dtype=np.float64)[keep][order]
+        observed = ~np.isnan(values)
+        cum_sum = np.concatenate([[0.0], np.cumsum(np.where(observed, values, 0.0))])
+        cum_count = np.concatenate([[0], np.cumsum(observed)])
+
+        subject_base = np.arange(len(subjects), dtype=np.int64) * width
+        start = np.searchsorted(keys, subject_base)
+        stop = np.searchsorted(keys, subject_base + width)
+
+        # Um evento por vez, sem matrizes sujeitos x eventos: cada evento guarda só os pares
+        # válidos, que depois são espalhados na ordem (sujeito, evento) do relatório
+        per_subject = np.zeros(len(subjects), dtype=np.int64)
+        parts = []
+        for event_rank in timeline.get_indexer(events):
+            # Primeira linha de cada sujeito com tempo >= evento
+            split = np.searchsorted(keys, subject_base + event_rank)
+            pre = _segment_means(cum_sum, cum_count, start, split)
+            post = _segment_means(cum_sum, cum_count, split, stop)
+            rows = np.flatnonzero(~(np.isnan(pre) | np.isnan(post)))
+            per_subject[rows] += 1
+            parts.append((rows, pre[rows], post[rows]))
+
+        filled = np.concatenate([[0], np.cumsum(per_subject)[:-1]]) if len(subjects) else per_subject
+        total = int(per_subject.sum())
+        event_idx = np.empty(total, dtype=np.int64)
+        pre_event, post_event = np.empty(total), np.empty(total)
+        for j, (rows, pre, post) in enumerate(parts):
+            positions = filled[rows]
+            filled[rows] += 1
+            event_idx[positions] = j
+            pre_event[positions] = pre
+            post_event[positions] = post
+            parts[j] = None
+
+        diff = post_event - pre_event
+        return ColumnarReport({
+            'subject': subjects.take(np.repeat(np.arange(len(subjects)), per_subject)),
+            'event_date': events.take(event_idx),
+            'pre_event_mean': pre_event,
+            'post_event_mean': post_event,
+            'difference': diff,
+            'shift_detected': np.abs(diff) > SHIFT_THRESHOLD,
+        })
+
 # Example usage
 if __name__ == "__main__":
     import pandas as pd
@@ -67,3 +151,6 @@ if __name__ == "__main__":
 
     import pprint
     pprint.pprint(report)
+
+    # Mesmo resultado em formato colunar (uma linha por sujeito e evento)
+    print(detector.detect_behavior_shifts_fast(data, 'subject', 'behavior_score', event_dates).to_frame())
@@ -7,18 +7,126 @@ that explain both and invalidate their direct association.
 Author: Edenilson Brandl
 """
 
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr
-from sklearn.linear_model import LinearRegression
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+
+def pearson_pvalues(r: np.ndarray, n_obs: int) -> np.ndarray:
+    """Two-sided p-values for Pearson correlations over n_obs observations, as in pearsonr."""
+    from scipy.stats import t as t_dist
+
+    r = np.asarray(r, dtype=np.float64)
+    dof = n_obs - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = np.abs(r) * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+    return np.where(np.isnan(r), np.nan, 2 * t_dist.sf(t_stat, dof))
+
+
+def explained_correlation(r_xz: np.ndarray, r_yz: np.ndarray) -> np.ndarray:
+    """
+    Correlation between the fitted values of x ~ z and y ~ z.
+
+    Both fits are affine functions of z whose slopes carry the signs of r_xz and
+    r_yz, so their correlation is sign(r_xz * r_yz), or undefined (NaN) when either
+    fit is constant.
+    """
+    explained = np.sign(r_xz * r_yz)
+    return np.where(explained == 0, np.nan, explained)
+
+
+def _first_explainers(corr_x: np.ndarray, corr_y: np.ndarray, x_idx: np.ndarray, y_idx: np.ndarray,
+                      corr_xy: np.ndarray):
+    """
+    For each candidate pair (one row of corr_x / corr_y, the correlations of x and y
+    with every variable), yields (pair position, first explainer z, explained_corr).
+    """
+    # explained_corr de cada trio (x, y, z), um par por linha
+    explained = explained_correlation(corr_x, corr_y)
+    with np.errstate(invalid='ignore'):
+        valid = (np.abs(explained) > 0.8) & (np.abs(explained) >= np.abs(corr_xy)[:, None] * 0.9)
+    pair_pos = np.arange(len(x_idx))
+    valid[pair_pos, x_idx] = False
+    valid[pair_pos, y_idx] = False
+
+    explainer = valid.argmax(axis=1)
+    for k in np.flatnonzero(valid.any(axis=1)):
+        yield k, explainer[k], explained[k, explainer[k]]
+
+
+# Estado de cada processo do pool: matriz padronizada (variáveis x observações) mapeada em memória
+_TILE_WORKER = {}
+
+
+def _init_tile_worker(path: str, shape: Tuple[int, int], corr_threshold: float, pval_threshold: float,
+                      max_results: int, pair_chunk: int = 4096):
+    _TILE_WORKER['matrix'] = np.memmap(path, dtype=np.float32, mode='r', shape=shape)
+    _TILE_WORKER['corr_threshold'] = corr_threshold
+    _TILE_WORKER['pval_threshold'] = pval_threshold
+    _TILE_WORKER['max_results'] = max_results
+    _TILE_WORKER['pair_chunk'] = pair_chunk
+
+
+def _search_tile(tile: Tuple[int, int, int, int]) -> List[tuple]:
+    """Searches the pairs x in [i0, i1), y in [j0, j1), x < y; returns (x, y, corr_xy, z, explained)."""
+    i0, i1, j0, j1 = tile
+    matrix = _TILE_WORKER['matrix']
+    corr_block = (matrix[i0:i1] @ matrix[j0:j1].T).astype(np.float64)
+
+    x_idx, y_idx = np.meshgrid(np.arange(i0, i1), np.arange(j0, j1), indexing='ij')
+    x_idx, y_idx, corr_xy = x_idx.ravel(), y_idx.ravel(), corr_block.ravel()
+    upper = x_idx < y_idx
+    x_idx, y_idx, corr_xy = x_idx[upper], y_idx[upper], corr_xy[upper]
+
+    pval = pearson_pvalues(corr_xy, matrix.shape[1])
+    weak = (np.abs(corr_xy) < _TILE_WORKER['corr_threshold']) | (pval > _TILE_WORKER['pval_threshold'])
+    x_idx, y_idx, corr_xy = x_idx[~weak], y_idx[~weak], corr_xy[~weak]
+    if len(x_idx) == 0:
+        return []
+
+    # Correlações completas só para as variáveis envolvidas em pares candidatos
+    involved, position = np.unique(np.concatenate([x_idx, y_idx]), return_inverse=True)
+    involved_corr = (matrix[involved] @ matrix.T).astype(np.float64)
+    x_rows, y_rows = position[:len(x_idx)], position[len(x_idx):]
+
+    # Pares em blocos de pair_chunk: as matrizes (pares x variáveis) ficam limitadas
+    found = []
+    max_results = _TILE_WORKER['max_results']
+    pair_chunk = _TILE_WORKER['pair_chunk']
+    for start in range(0, len(x_idx), pair_chunk):
+        chunk = slice(start, start + pair_chunk)
+        for k, z, explained in _first_explainers(involved_corr[x_rows[chunk]], involved_corr[y_rows[chunk]],
+                                                 x_idx[chunk], y_idx[chunk], corr_xy[chunk]):
+            found.append((int(x_idx[start + k]), int(y_idx[start + k]), float(corr_xy[start + k]), int(z),
+                          float(explained)))
+            if max_results is not None and len(found) >= max_results:
+                return found
+    return found
+
 
 class SpuriousCorrelationDetector:
     def __init__(self, corr_threshold=0.5, pval_threshold=0.05):
         self.corr_threshold = corr_threshold
         self.pval_threshold = pval_threshold
 
-    def detect_spurious_pairs(self, df: pd.DataFrame, variables: List[str]) -> List[dict]:
+    def detect_spurious_pairs(self, df: pd.DataFrame, variables: List[str], engine: str = 'regression') -> List[dict]:
+        """
+        engine='regression' fits x ~ z and y ~ z for every candidate pair and explainer;
+        engine='matrix' derives the same records from one correlation matrix.
+        """
+        if engine == 'matrix':
+            return self._detect_spurious_pairs_matrix(df, variables)
+        if engine != 'regression':
+            raise ValueError(f"Unknown engine '{engine}'. Choose 'regression' or 'matrix'")
+
+        from scipy.stats import pearsonr
+        from sklearn.linear_model import LinearRegression
+
         n = len(variables)
         results = []
 
@@ -54,6 +162,90 @@ class SpuriousCorrelationDetector:
 
         return results
 
+    def _detect_spurious_pairs_matrix(self, df: pd.DataFrame, variables: List[str], pair_chunk=4096) -> List[dict]:
+        values = df[variables].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.atleast_2d(np.corrcoef(values, rowvar=False))
+
+        rows, cols = np.triu_indices(len(variables), k=1)
+        pair_corr = corr[rows, cols]
+        pair_pval = pearson_pvalues(pair_corr, len(values))
+        weak = (np.abs(pair_corr) < self.corr_threshold) | (pair_pval > self.pval_threshold)
+        rows, cols, pair_corr = rows[~weak], cols[~weak], pair_corr[~weak]
+
+        results = []
+        for start in range(0, len(rows), pair_chunk):
+            x_idx = rows[start:start + pair_chunk]
+            y_idx = cols[start:start + pair_chunk]
+            corr_xy = pair_corr[start:start + pair_chunk]
+
+            for k, z, explained in _first_explainers(corr[x_idx], corr[y_idx], x_idx, y_idx, corr_xy):
+                results.append(self._record(variables, x_idx[k], y_idx[k], corr_xy[k], z, explained))
+
+        return results
+
+    def iter_spurious_pairs_parallel(self, df: pd.DataFrame, variables: List[str], n_workers: int = None,
+                                     tile_size: int = 512, max_results_per_tile: int = None,
+                                     pair_chunk: int = 4096) -> Iterator[dict]:
+        """
+        Parallel variant of the matrix engine for very wide tables.
+
+        The pair space is split into tile_size x tile_size tiles that a process pool
+        searches independently. Workers read a standardized float32 copy of the data
+        from a memory-mapped file instead of receiving it per task. Records are
+        yielded as tiles complete, so their order differs from detect_spurious_pairs,
+        and correlations computed in float32 may differ in the last rounded digit.
+        Candidate pairs of a tile are checked pair_chunk at a time, which bounds the
+        per-worker memory to about pair_chunk x n_variables correlations.
+        """
+        n_workers = n_workers or os.cpu_count() or 1
+        n_vars = len(variables)
+        tmp_dir = tempfile.mkdtemp(prefix='spurious_tiles_')
+        path = os.path.join(tmp_dir, 'standardized.f32')
+        try:
+            shape = (n_vars, len(df))
+            matrix = np.memmap(path, dtype=np.float32, mode='w+', shape=shape)
+            for start in range(0, n_vars, tile_size):
+                block = df[variables[start:start + tile_size]].to_numpy(dtype=np.float64).T
+                block = block - block.mean(axis=1, keepdims=True)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    matrix[start:start + tile_size] = block / np.sqrt((block ** 2).sum(axis=1, keepdims=True))
+            matrix.flush()
+            del matrix
+
+            tiles = iter([(i0, min(i0 + tile_size, n_vars), j0, min(j0 + tile_size, n_vars))
+                          for i0 in range(0, n_vars, tile_size)
+                          for j0 in range(i0, n_vars, tile_size)])
+            initargs = (path, shape, self.corr_threshold, self.pval_threshold, max_results_per_tile, pair_chunk)
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_tile_worker,
+                                     initargs=initargs) as pool:
+                pending = set()
+                for tile in tiles:
+                    pending.add(pool.submit(_search_tile, tile))
+                    if len(pending) >= 2 * n_workers:
+                        break
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for x, y, corr_xy, z, explained in future.result():
+                            yield self._record(variables, x, y, corr_xy, z, explained)
+                        tile = next(tiles, None)
+                        if tile is not None:
+                            pending.add(pool.submit(_search_tile, tile))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _record(variables, x, y, corr_xy, z, explained) -> dict:
+        return {
+            'var1': variables[x],
+            'var2': variables[y],
+            'original_corr': round(float(corr_xy), 4),
+            'common_explainer': variables[z],
+            'explained_corr': round(float(explained), 4),
+            'spurious': True
+        }
+
 # Exemplo de uso
 if __name__ == "__main__":
     np.random.seed(42)
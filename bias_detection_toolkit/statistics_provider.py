@@ -0,0 +1,109 @@
+"""
+Module: statistics_provider
+
+Memoizes the statistics that several detectors compute over the same DataFrame
+(correlation engines, group aggregates, column moments and frequency tables), so
+an audit running many detectors on one frame computes each of them only once.
+
+Classes:
+    StatisticsProvider - per-frame cache of shared statistics.
+    FrameStatistics - the provider bound to a single frame.
+"""
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from bias_detection_toolkit.correlation_engine import CorrelationEngine
+
+
+class StatisticsProvider:
+    """
+    Cache keyed by frame identity, statistic and columns. Entries for a frame are
+    dropped when the frame is garbage collected; frames are assumed not to be
+    mutated while they are being audited (call clear(frame) otherwise).
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def correlation_engine(self, frame: pd.DataFrame, columns: list, dtype=np.float64,
+                           block_size: int = 1024) -> CorrelationEngine:
+        """
+        Columns standardized once for blocked, thresholded correlation searches; served
+        from any cached engine of the same dtype whose columns cover the requested ones.
+        """
+        columns = list(columns)
+        dtype = np.dtype(dtype).str
+        key = ('corr_engine', tuple(columns), dtype, block_size)
+        cache = self._frame_cache(frame)
+        if key not in cache:
+            for cached_key, engine in cache.items():
+                if cached_key[0] == 'corr_engine' and cached_key[2] == dtype and set(columns) <= set(cached_key[1]):
+                    self.hits += 1
+                    return engine.select(columns, block_size)
+        return self._memoize(frame, key, lambda: CorrelationEngine(frame, columns, dtype, block_size))
+
+    def column_moments(self, frame: pd.DataFrame, column) -> dict:
+        """Global mean and sample standard deviation of a column."""
+        return self._memoize(frame, ('moments', column), lambda: {
+            'mean': frame[column].mean(),
+            'std': frame[column].std(),
+        })
+
+    def group_stats(self, frame: pd.DataFrame, by, column) -> pd.DataFrame:
+        """Per-group count, mean and sample standard deviation of a column."""
+        key = ('group', tuple(by) if isinstance(by, list) else by, column)
+        return self._memoize(frame, key, lambda: frame.groupby(by)[column].agg(['count', 'mean', 'std']))
+
+    def value_counts(self, frame: pd.DataFrame, column, normalize: bool = True) -> pd.Series:
+        return self._memoize(frame, ('value_counts', column, normalize),
+                             lambda: frame[column].value_counts(normalize=normalize))
+
+    def for_frame(self, frame: pd.DataFrame) -> 'FrameStatistics':
+        """View bound to one frame, with the same interface as chunked_statistics.ChunkedAggregates."""
+        return FrameStatistics(self, frame)
+
+    def clear(self, frame: pd.DataFrame = None):
+        if frame is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(id(frame), None)
+
+    def _frame_cache(self, frame: pd.DataFrame) -> dict:
+        frame_id = id(frame)
+        if frame_id not in self._cache:
+            self._cache[frame_id] = {}
+            # Libera as entradas quando o DataFrame deixa de existir (o id pode ser reutilizado)
+            weakref.finalize(frame, self._cache.pop, frame_id, None)
+        return self._cache[frame_id]
+
+    def _memoize(self, frame: pd.DataFrame, key: tuple, compute):
+        cache = self._frame_cache(frame)
+        if key in cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            cache[key] = compute()
+        return cache[key]
+
+
+class FrameStatistics:
+    def __init__(self, provider: StatisticsProvider, frame: pd.DataFrame):
+        self.provider = provider
+        self.frame = frame
+
+    def correlation_engine(self, columns: list, dtype=np.float64, block_size: int = 1024) -> CorrelationEngine:
+        return self.provider.correlation_engine(self.frame, columns, dtype, block_size)
+
+    def column_moments(self, column) -> dict:
+        return self.provider.column_moments(self.frame, column)
+
+    def group_stats(self, by, column) -> pd.DataFrame:
+        return self.provider.group_stats(self.frame, by, column)
+
+    def value_counts(self, column, normalize: bool = True) -> pd.Series:
+        return self.provider.value_counts(self.frame, column, normalize)
@@ -7,24 +7,120 @@ Detecta dados sintéticos gerados a partir de fórmulas ou pesos intencionais pa
 import pandas as pd
 import numpy as np
 
+from bias_detection_toolkit.chunked_statistics import StreamingMoments
+from bias_detection_toolkit.columnar_report import ColumnarReport
+from bias_detection_toolkit.sketches import CountSketch, ReservoirSample
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
+
 class SyntheticDataFormulaDetector:
-    def __init__(self, data, columns):
+    # Custo relativo para o DetectionSuite: correlações de todos os pares e busca de fórmulas
+    COST_HINT = 20.0
+
+    def __init__(self, data, columns, stats=None, dtype=np.float64, block_size=1024):
         """
         data: DataFrame com os dados
         columns: lista de colunas para verificar relações lineares/fórmulas suspeitas
+        stats: opcional, StatisticsProvider compartilhado entre detectores para reaproveitar estatísticas
+        dtype: np.float32 reduz à metade a memória das colunas padronizadas (precisão ~1e-6)
+        block_size: colunas por bloco no cálculo das correlações (limita o pico de memória)
         """
         self.data = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        self.stats = stats if stats is not None else StatisticsProvider()
         self.columns = columns
+        self.dtype = dtype
+        self.block_size = block_size
 
     def analyze(self):
-        formula_suspects = []
-        corr_matrix = self.data[self.columns].corr().abs()
-        for i, col1 in enumerate(self.columns):
-            for col2 in self.columns[i+1:]:
-                if corr_matrix.loc[col1, col2] > 0.95:
-                    formula_suspects.append({
-                        "columns": (col1, col2),
-                        "correlation": corr_matrix.loc[col1, col2],
-                        "synthetic_pattern_suspected": True
-                    })
-        return formula_suspects
+        # Só os pares (i < j) acima do limiar, sem montar a matriz de correlação inteira
+        engine = self.stats.correlation_engine(self.data, self.columns, self.dtype, self.block_size)
+        first, second, correlation = engine.edges(0.95)
+        names = np.array(self.columns, dtype=object)
+        return ColumnarReport({
+            "columns": list(zip(names[first], names[second])),
+            "correlation": np.abs(correlation),
+            "synthetic_pattern_suspected": True
+        })
+
+    def detect_linear_formulas(self, tolerance=1e-3, sketch_rows=None, sample_size=10_000,
+                               chunks=None, chunk_size=None, seed=None):
+        """
+        Detecta colunas geradas como combinação linear (quase exata) de várias outras,
+        que escapam da busca por pares. Uma passada pelos dados acumula um CountSketch
+        das linhas e uma amostra (reservatório); a QR com pivoteamento do sketch
+        padronizado revela o posto e as colunas dependentes, e cada fórmula é conferida
+        na amostra, nas unidades originais. A memória depende de sketch_rows, do número
+        de colunas e de sample_size, não do número de linhas.
+
+        tolerance: desvio-padrão residual máximo, relativo ao da coluna, para a relação contar como fórmula
+        sketch_rows: linhas do sketch (padrão: 4 x número de colunas)
+        sample_size: linhas da amostra usada para confirmar cada fórmula
+        chunks: iterador opcional de DataFrames; por padrão percorre self.data em fatias de chunk_size
+                linhas (padrão: cerca de um milhão de valores por fatia)
+        seed: semente do sketch e da amostra
+
+        A coluna apontada como dependente é uma das colunas da fórmula: qualquer uma
+        delas pode ser escrita em função das demais.
+        """
+        from scipy.linalg import lstsq, qr, solve_triangular
+
+        n_cols = len(self.columns)
+        sketch_seed, sample_seed = np.random.SeedSequence(seed).spawn(2)
+        sketch = CountSketch(sketch_rows or 4 * n_cols, n_cols, seed=sketch_seed)
+        sample = ReservoirSample(sample_size, seed=sample_seed)
+        moments = StreamingMoments(n_cols)
+        if chunks is None:
+            chunk_size = chunk_size or max(1, 1_000_000 // max(n_cols, 1))
+            chunks = (self.data.iloc[start:start + chunk_size] for start in range(0, len(self.data), chunk_size))
+        for chunk in chunks:
+            values = chunk[self.columns].to_numpy(dtype=np.float64)
+            # A fórmula só pode ser conferida nas linhas completas
+            values = values[~np.isnan(values).any(axis=1)]
+            sketch.update(values)
+            sample.update(values)
+            moments.update(values)
+
+        report = {"column": [], "formula_columns": [], "coefficients": [], "intercept": [], "residual_std": []}
+        std = np.sqrt(moments.m2 / max(moments.n, 1))
+        # Colunas constantes não entram: seriam "fórmulas" só com intercepto
+        varying = np.flatnonzero(std > 0)
+        if moments.n > 1 and len(varying) > 1:
+            standardized = sketch.centered(moments.mean)[:, varying] / std[varying]
+            r, pivots = qr(standardized, mode='r', pivoting=True)
+            diagonal = np.abs(np.diag(r))
+            rank = int(np.sum(diagonal > tolerance * diagonal[0]))
+            basis = pivots[:rank]
+            rows = sample.sample
+
+            for position in range(rank, len(pivots)):
+                target = pivots[position]
+                # Coeficientes nas unidades padronizadas (direto do R); os desprezíveis saem da fórmula
+                coefficients = solve_triangular(r[:rank, :rank], r[:rank, position])
+                support = np.sort(basis[np.abs(coefficients) > tolerance])
+                if len(support) == 0:
+                    continue
+                coefficients = lstsq(standardized[:, support], standardized[:, target])[0]
+
+                # De volta às unidades originais: x_d = intercepto + soma(beta_k * x_k)
+                columns, dependent = varying[support], varying[target]
+                beta = coefficients * std[dependent] / std[columns]
+                intercept = moments.mean[dependent] - beta @ moments.mean[columns]
+                residual = rows[:, dependent] - intercept - rows[:, columns] @ beta
+                residual_std = np.sqrt(np.mean(residual ** 2)) / std[dependent]
+                if residual_std > tolerance:
+                    continue
+                report["column"].append(dependent)
+                report["formula_columns"].append(columns)
+                report["coefficients"].append(beta)
+                report["intercept"].append(intercept)
+                report["residual_std"].append(residual_std)
+
+        order = np.argsort(report["column"], kind='stable')
+        names = np.array(self.columns, dtype=object)
+        return ColumnarReport({
+            "column": names[np.asarray(report["column"], dtype=np.int64)[order]],
+            "formula_columns": [tuple(names[report["formula_columns"][k]]) for k in order],
+            "coefficients": [tuple(report["coefficients"][k].tolist()) for k in order],
+            "intercept": np.asarray(report["intercept"], dtype=np.float64)[order],
+            "residual_std": np.asarray(report["residual_std"], dtype=np.float64)[order],
+            "synthetic_pattern_suspected": True
+        })
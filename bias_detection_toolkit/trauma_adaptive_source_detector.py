@@ -9,35 +9,87 @@ Author: Edenilson Brandl
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from scipy.stats import kurtosis, skew
+
+from bias_detection_toolkit.chunked_statistics import StreamingMoments, split_data_source
 
 class TraumaAdaptiveSourceDetector:
     def __init__(self):
+        from sklearn.decomposition import PCA
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
         self.scaler = StandardScaler()
         self.pca = PCA(n_components=2)
         self.isolation_model = IsolationForest(contamination=0.1, random_state=42)
+        self.features = None
 
     def analyze_behavior_distortion(self, df: pd.DataFrame, features: list) -> dict:
-        scaled = self.scaler.fit_transform(df[features])
-        pcs = self.pca.fit_transform(scaled)
+        """Fits the pipeline on df and scores the same rows (fit + score)."""
+        return self.fit(df, features).score(df)
+
+    def fit(self, reference_df: pd.DataFrame, features: list) -> 'TraumaAdaptiveSourceDetector':
+        """Fits the scaler, PCA and IsolationForest once on the reference data."""
+        scaled = self.scaler.fit_transform(reference_df[features].to_numpy())
+        self.isolation_model.fit(self.pca.fit_transform(scaled))
+        self.features = list(features)
+        return self
+
+    def score(self, batch) -> dict:
+        """
+        Scores a batch against the fitted reference without refitting. batch may be a
+        DataFrame or an iterator of DataFrame chunks; skewness and kurtosis are
+        accumulated in the same single pass. suspected_points holds the index labels
+        of the flagged rows instead of a copy of them.
+        """
+        if self.features is None:
+            raise ValueError("Detector is not fitted; call fit() or load() first")
 
-        df_pca = pd.DataFrame(pcs, columns=['PC1', 'PC2'])
-        scores = self.isolation_model.fit_predict(df_pca)
-        df_result = df.copy()
-        df_result["adaptive_flag"] = scores
+        frame, chunks = split_data_source(batch)
+        moments = StreamingMoments(len(self.features))
+        suspected, n_rows = [], 0
+        for chunk in ([frame] if chunks is None else chunks):
+            values = chunk[self.features].to_numpy()
+            if len(values) == 0:
+                continue
+            flags = self.isolation_model.predict(self.pca.transform(self.scaler.transform(values)))
+            suspected.append(chunk.index[flags == -1])
+            moments.update(values)
+            n_rows += len(values)
 
+        suspected_points = suspected[0].append(suspected[1:]) if suspected else pd.Index([])
+        skewness, kurtosis = moments.skewness(), moments.kurtosis()
         # estatísticas gerais
-        summary = {
-            "skewness": {col: round(skew(df[col]), 4) for col in features},
-            "kurtosis": {col: round(kurtosis(df[col]), 4) for col in features},
-            "adaptive_data_percent": round((df_result["adaptive_flag"] == -1).sum() / len(df) * 100, 2),
-            "suspected_points": df_result[df_result["adaptive_flag"] == -1]
+        return {
+            "skewness": {col: round(float(value), 4) for col, value in zip(self.features, skewness)},
+            "kurtosis": {col: round(float(value), 4) for col, value in zip(self.features, kurtosis)},
+            "adaptive_data_percent": round(len(suspected_points) / n_rows * 100, 2) if n_rows else 0.0,
+            "suspected_points": suspected_points
         }
 
-        return summary
+    def save(self, path):
+        """Persists the fitted pipeline (scaler, PCA, IsolationForest and features) with joblib."""
+        import joblib
+
+        if self.features is None:
+            raise ValueError("Detector is not fitted; call fit() first")
+        joblib.dump({
+            "features": self.features,
+            "scaler": self.scaler,
+            "pca": self.pca,
+            "isolation_model": self.isolation_model,
+        }, path)
+
+    @classmethod
+    def load(cls, path) -> 'TraumaAdaptiveSourceDetector':
+        import joblib
+
+        state = joblib.load(path)
+        detector = cls()
+        detector.features = state["features"]
+        detector.scaler = state["scaler"]
+        detector.pca = state["pca"]
+        detector.isolation_model = state["isolation_model"]
+        return detector
 
 # Exemplo de uso
 if __name__ == "__main__":
@@ -53,3 +105,7 @@ if __name__ == "__main__":
 
     import pprint
     pprint.pprint(results)
+
+    # Pontuação de novos lotes contra a referência já ajustada, sem reajustar o modelo
+    new_batch = pd.DataFrame(np.random.normal(loc=10, scale=2, size=(10, 2)), columns=['response_time', 'pressure_signal'])
+    pprint.pprint(detector.score(new_batch))
@@ -9,16 +9,59 @@ Author: Edenilson Brandl
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
 from typing import List, Dict
 
+ROLLING_WINDOW = 5
+
+
+def _segment_residuals(values: np.ndarray, segment_start: np.ndarray, segment_stop: np.ndarray) -> np.ndarray:
+    """
+    values minus their centered rolling mean, computed within each segment (entity) of
+    the sorted rows. NaN where the window crosses a segment boundary or holds a NaN,
+    like Series.rolling(window, center=True).mean() applied per entity.
+    """
+    n, half = len(values), ROLLING_WINDOW // 2
+    padded = np.concatenate([np.full(half, np.nan), values, np.full(half, np.nan)])
+    window_sum = np.zeros(n)
+    for offset in range(ROLLING_WINDOW):
+        window_sum += padded[offset:offset + n]
+    positions = np.arange(n)
+    inside = (positions - half >= segment_start) & (positions + half < segment_stop)
+    rolling_mean = np.where(inside, window_sum / ROLLING_WINDOW, np.nan)
+    return values - rolling_mean
+
+
+def _isolation_forest_labels(residuals: np.ndarray, bounds: np.ndarray, contamination: float) -> np.ndarray:
+    """Fits one IsolationForest per segment [bounds[k], bounds[k + 1]); -1 marks anomalies."""
+    from sklearn.ensemble import IsolationForest
+
+    labels = np.empty(len(residuals), dtype=np.int8)
+    filled = np.where(np.isnan(residuals), 0.0, residuals)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        model = IsolationForest(contamination=contamination, random_state=42)
+        labels[start:stop] = model.fit_predict(filled[start:stop].reshape(-1, 1))
+    return labels
+
+
+def _robust_z_labels(residuals: np.ndarray, codes: np.ndarray, threshold: float) -> np.ndarray:
+    """Per-entity robust z-score (median/MAD); -1 marks anomalies, NaN residuals are never flagged."""
+    series = pd.Series(residuals)
+    deviation = (series - series.groupby(codes).transform('median')).abs()
+    mad = deviation.groupby(codes).transform('median')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        robust_z = 0.6745 * deviation.to_numpy() / mad.to_numpy()
+    return np.where(robust_z > threshold, -1, 1).astype(np.int8)
+
+
 class TriggerPatternDisruptionDetector:
     def __init__(self, anomaly_sensitivity=0.15):
         self.anomaly_sensitivity = anomaly_sensitivity
 
     def detect_disruptions(self, df: pd.DataFrame, target_col: str, time_col: str, context_cols: List[str]) -> Dict:
+        from sklearn.ensemble import IsolationForest
+
         df_sorted = df.sort_values(time_col).reset_index(drop=True)
-        rolling_mean = df_sorted[target_col].rolling(window=5, center=True).mean()
+        rolling_mean = df_sorted[target_col].rolling(window=ROLLING_WINDOW, center=True).mean()
         residuals = df_sorted[target_col] - rolling_mean
 
         df_sorted['residual'] = residuals
@@ -43,6 +86,77 @@ class TriggerPatternDisruptionDetector:
             "full_df": df_sorted
         }
 
+    def detect_disruptions_grouped(self, df: pd.DataFrame, entity_col: str, target_col: str, time_col: str,
+                                   context_cols: List[str], scorer: str = 'isolation_forest', n_jobs: int = 1,
+                                   robust_z_threshold: float = 3.5, return_full_df: bool = False) -> Dict:
+        """
+        detect_disruptions for every entity of df in one call. Rows are sorted once by
+        (entity, time) and the centered rolling residuals of all entities are computed
+        in a single vectorized pass.
+
+        scorer: 'isolation_forest' fits one model per entity (as detect_disruptions does
+                for a single series), spread over n_jobs joblib workers; 'robust_z' flags
+                residuals whose per-entity median/MAD z-score exceeds robust_z_threshold,
+                without fitting any model
+        return_full_df: also return the sorted frame with residual and anomaly columns;
+                        by default memory stays proportional to the anomalies
+
+        Returns a dict with the anomalous rows, potential triggers per entity
+        ({entity: {"col:value": count}}) and, if requested, full_df.
+        """
+        if scorer not in ('isolation_forest', 'robust_z'):
+            raise ValueError(f"Unknown scorer '{scorer}'. Choose 'isolation_forest' or 'robust_z'")
+
+        codes, entities = pd.factorize(df[entity_col], sort=True)
+        positions = np.flatnonzero(codes >= 0)
+        # Ordena uma única vez por (entidade, tempo); linhas sem entidade ficam de fora, como no groupby
+        order = positions[np.lexsort((df[time_col].to_numpy()[positions], codes[positions]))]
+        codes = codes[order]
+
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(entities)))])
+        values = df[target_col].to_numpy(dtype=np.float64)[order]
+        residuals = _segment_residuals(values, bounds[codes], bounds[codes + 1])
+
+        if scorer == 'robust_z':
+            labels = _robust_z_labels(residuals, codes, robust_z_threshold)
+        else:
+            from joblib import Parallel, delayed
+
+            # Lotes contíguos de entidades: cada tarefa recebe só o trecho de resíduos do seu lote
+            n_batches = max(min(len(entities), 4 * (n_jobs if n_jobs > 0 else 1)), 1)
+            batch_bounds = bounds[np.unique(np.linspace(0, len(entities), n_batches + 1).astype(np.int64))]
+            batches = Parallel(n_jobs=n_jobs)(
+                delayed(_isolation_forest_labels)(
+                    residuals[start:stop], bounds[(bounds >= start) & (bounds <= stop)] - start,
+                    self.anomaly_sensitivity
+                )
+                for start, stop in zip(batch_bounds[:-1], batch_bounds[1:])
+            )
+            labels = np.concatenate(batches) if batches else np.empty(0, dtype=np.int8)
+
+        anomaly_rows = order[labels == -1]
+        anomalies = df.iloc[anomaly_rows][[entity_col, time_col, target_col] + context_cols].reset_index(drop=True)
+
+        # Possíveis gatilhos contextuais, por entidade
+        potential_triggers = {}
+        for col in context_cols:
+            val_counts = anomalies.groupby([entity_col, col], sort=False).size()
+            for (entity, val), count in val_counts[val_counts > 1].items():
+                key = f"{col}:{val}"
+                entity_triggers = potential_triggers.setdefault(entity, {})
+                entity_triggers[key] = entity_triggers.get(key, 0) + int(count)
+
+        result = {
+            "anomalies": anomalies,
+            "potential_triggers": potential_triggers
+        }
+        if return_full_df:
+            full_df = df.iloc[order].reset_index(drop=True)
+            full_df['residual'] = residuals
+            full_df['anomaly'] = labels
+            result["full_df"] = full_df
+        return result
+
 # Exemplo de uso
 if __name__ == "__main__":
     np.random.seed(42)
@@ -5,6 +5,7 @@ setup(
     version='0.1.0',
     packages=find_packages(),
     install_requires=[
+        'joblib',
         'numpy',
         'pandas',
         'scikit-learn',
@@ -21,5 +22,5 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
\ No newline at end of file
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.artificial_result_improvement_detector import ArtificialResultImprovementDetector
+
+
+def make_data(n_groups=3, n_months=24, rows_per_month=20, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for k in range(n_groups):
+        months = pd.date_range('2021-01-01', periods=n_months, freq='MS')
+        # Cada série tem um salto artificial em um mês diferente
+        level = np.where(np.arange(n_months) == 8 + 4 * k, 300.0, 100.0)
+        dates = np.repeat(months, rows_per_month) + pd.to_timedelta(
+            rng.integers(0, 28, n_months * rows_per_month), unit='D')
+        frames.append(pd.DataFrame({
+            'branch': f"b{k}",
+            'date': dates,
+            'payments': rng.normal(np.repeat(level, rows_per_month), 5.0),
+        }))
+    # Linhas das séries intercaladas, como chegariam de um sistema de origem
+    data = pd.concat(frames, ignore_index=True)
+    return data.iloc[rng.permutation(len(data))].reset_index(drop=True)
+
+
+def latest_month(report, period):
+    return [row for row in report.to_dicts() if row['period'] == period]
+
+
+@pytest.mark.parametrize('group_col', [None, 'branch'])
+def test_partial_fit_matches_analyze_on_the_data_seen_so_far(group_col):
+    data = make_data()
+    if group_col is None:
+        data = data[data['branch'] == 'b0']
+    stream = ArtificialResultImprovementDetector(pd.DataFrame(), 'payments', 'date', group_col=group_col)
+    periods = data['date'].dt.to_period('M')
+
+    flagged = 0
+    for period in sorted(periods.unique()):
+        month = data[periods == period]
+        # O mês chega em duas partes; a avaliação da segunda parte é a definitiva
+        first_part = month.iloc[:len(month) // 3]
+        assert first_part['branch'].nunique() == month['branch'].nunique()
+        stream.partial_fit(first_part)
+        report = stream.partial_fit(month.iloc[len(month) // 3:])
+
+        seen = data[periods <= period]
+        expected = ArtificialResultImprovementDetector(seen, 'payments', 'date', group_col=group_col).analyze()
+        actual = sorted(report.to_dicts(), key=lambda row: str(row.get('group')))
+        expected = sorted(latest_month(expected, str(period)), key=lambda row: str(row.get('group')))
+        assert len(actual) == len(expected)
+        for a, b in zip(actual, expected):
+            assert (a.get('group'), a['period']) == (b.get('group'), b['period'])
+            assert a['value'] == pytest.approx(b['value'], rel=1e-9)
+        flagged += len(actual)
+    assert flagged > 0
+
+
+def test_grouped_analyze_matches_one_detector_per_group():
+    data = make_data()
+    grouped = ArtificialResultImprovementDetector(data, 'payments', 'date', group_col='branch').analyze()
+    expected = []
+    for branch, subset in data.groupby('branch'):
+        report = ArtificialResultImprovementDetector(subset, 'payments', 'date').analyze()
+        expected += [dict(row, group=branch) for row in report.to_dicts()]
+    assert sorted(grouped.to_dicts(), key=lambda row: (row['group'], row['period'])) == pytest.approx(
+        sorted(expected, key=lambda row: (row['group'], row['period'])))
+
+
+def test_partial_fit_rejects_months_out_of_order():
+    data = make_data(n_groups=1)
+    periods = data['date'].dt.to_period('M')
+    detector = ArtificialResultImprovementDetector(pd.DataFrame(), 'payments', 'date')
+    detector.partial_fit(data[periods == periods.max()])
+    with pytest.raises(ValueError):
+        detector.partial_fit(data[periods == periods.min()])
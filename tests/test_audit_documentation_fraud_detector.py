@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.audit_documentation_fraud_detector import (
+    FileTailSource,
+    QueueSource,
+    StreamingAuditDocumentationFraudDetector,
+)
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(0)
+    n = 3000
+    frame = pd.DataFrame({
+        'author': rng.integers(0, 20, n),
+        'quality': rng.normal(50, 3, n),
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='s').astype(str),
+    })
+    frame.loc[rng.choice(n, 30, replace=False), 'quality'] += 40
+    return [{'author': int(a), 'quality': float(q), 'timestamp': t}
+            for a, q, t in zip(frame['author'], frame['quality'], frame['timestamp'])]
+
+
+def make_detector(**kwargs):
+    return StreamingAuditDocumentationFraudDetector('quality', 'timestamp', key_col='author', **kwargs)
+
+
+def reference_spikes(events):
+    history, spikes = {}, []
+    for event in events:
+        values = history.setdefault(event['author'], [])
+        if len(values) >= 2 and abs(event['quality'] - values[-1]) > 2 * np.std(values, ddof=1):
+            spikes.append((event['author'], event['timestamp']))
+        values.append(event['quality'])
+    return spikes
+
+
+def test_process_batch_matches_per_key_reference(events):
+    report = make_detector().process_batch(events)
+    assert len(report) > 0
+    assert [(r['key'], r['timestamp']) for r in report] == reference_spikes(events)
+
+
+def test_process_batch_accepts_dataframe(events):
+    assert make_detector().process_batch(pd.DataFrame(events)) == make_detector().process_batch(events)
+
+
+def test_queue_source_matches_process_batch(events):
+    expected = make_detector().process_batch(events).to_dicts()
+
+    async def main():
+        queue, received = asyncio.Queue(), []
+
+        async def produce():
+            for i, event in enumerate(events):
+                await queue.put(event)
+                if i % 500 == 0:
+                    await asyncio.sleep(0)
+            await queue.put(None)
+
+        processed, _ = await asyncio.gather(
+            make_detector().consume(QueueSource(queue, max_batch=64), lambda report: received.extend(report.to_dicts())),
+            produce(),
+        )
+        return processed, received
+
+    processed, received = asyncio.run(main())
+    assert processed == len(events)
+    assert received == expected
+
+
+def test_file_tail_source_matches_process_batch(events, tmp_path):
+    expected = make_detector().process_batch(events).to_dicts()
+    path = tmp_path / 'events.jsonl'
+    path.write_text('')
+
+    async def main():
+        source = FileTailSource(path, max_batch=100, poll_interval=0.01, idle_timeout=0.2)
+        received = []
+
+        async def on_report(report):
+            received.extend(report.to_dicts())
+
+        async def write():
+            with open(path, 'a', encoding='utf-8') as handle:
+                for i, event in enumerate(events):
+                    line = json.dumps(event) + '\n'
+                    if i % 700 == 0:
+                        # Linha escrita em duas partes: a fonte espera o fim da linha
+                        handle.write(line[:10])
+                        handle.flush()
+                        await asyncio.sleep(0.02)
+                        line = line[10:]
+                    handle.write(line)
+                    if i % 400 == 0:
+                        handle.flush()
+                        await asyncio.sleep(0)
+
+        processed, _ = await asyncio.gather(make_detector().consume(source, on_report), write())
+        return processed, received
+
+    processed, received = asyncio.run(main())
+    assert processed == len(events)
+    assert received == expected
+
+
+def test_ttl_and_max_keys_bound_the_state(events):
+    now = [0.0]
+    detector = make_detector(ttl=10, max_keys=5, clock=lambda: now[0])
+    for i, event in enumerate(events):
+        now[0] = i * 0.01
+        detector.update(event)
+        assert detector.active_keys <= 5
+    assert detector.evicted_keys > 0
+
+    now[0] += 100
+    detector.update({'author': -1, 'quality': 1.0, 'timestamp': 'late'})
+    assert detector.active_keys == 1
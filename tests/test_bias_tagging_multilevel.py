@@ -0,0 +1,67 @@
+import pytest
+
+from bias_detection_toolkit.bias_tagging_multilevel import MultilevelBiasTaggerNLP, TaggerResultCache
+
+SAMPLE_TEXTS = [
+    "I feel like the government is rigged, but maybe it's just my bias.",
+    "My brain struggles to keep up with politics.",
+    "Some say astrology and energy healing explain my emotions.",
+    "The research was an empirical experiment with exact, concrete results.",
+    "I'm unsure, my memory of the training is vague and foggy.",
+    "They punish and reward us like conditioning, and it makes me angry.",
+]
+
+
+def make_texts(n):
+    # Textos repetidos entre os lotes, para exercitar o cache e a deduplicação
+    return [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] + f" (response {i % 10})" for i in range(n)]
+
+
+@pytest.mark.parametrize('batch_size', [1, 4, 32])
+def test_analyze_batch_matches_analyze_text(batch_size):
+    # Perfil "lexicon": não carrega modelos, roda sem spaCy nem transformers
+    tagger = MultilevelBiasTaggerNLP(profile='lexicon')
+    texts = make_texts(40)
+    assert tagger.analyze_batch(texts, batch_size=batch_size) == [tagger.analyze_text(t) for t in texts]
+
+
+def test_cached_batch_matches_uncached(tmp_path):
+    texts = make_texts(40)
+    expected = [MultilevelBiasTaggerNLP(profile='lexicon').analyze_text(t) for t in texts]
+
+    cache = TaggerResultCache(path=str(tmp_path / 'tags.sqlite'))
+    tagger = MultilevelBiasTaggerNLP(profile='lexicon', cache=cache)
+    assert tagger.analyze_batch(texts, batch_size=8) == expected
+    assert tagger.analyze_batch(texts, batch_size=8) == expected
+    assert cache.stats()['misses'] == len(set(texts))
+    cache.close()
+
+    # Segunda execução: resultados lidos do SQLite
+    cache = TaggerResultCache(path=str(tmp_path / 'tags.sqlite'))
+    assert MultilevelBiasTaggerNLP(profile='lexicon', cache=cache).analyze_batch(texts) == expected
+    assert cache.stats()['misses'] == 0
+    cache.close()
+
+
+def test_cached_results_are_copies():
+    tagger = MultilevelBiasTaggerNLP(profile='lexicon', cache=TaggerResultCache())
+    first = tagger.analyze_text(SAMPLE_TEXTS[1])
+    first['Level 1 Tags'].append('mutated')
+    assert 'mutated' not in tagger.analyze_text(SAMPLE_TEXTS[1])['Level 1 Tags']
+
+
+def test_keywords_change_cache_namespace():
+    tagger = MultilevelBiasTaggerNLP(profile='lexicon', cache=TaggerResultCache())
+    text = "A text about quasars."
+    assert 'astronomy' not in tagger.analyze_text(text)['Level 1 Tags']
+    tagger.add_keywords('astronomy', ['quasars'], level=1)
+    assert 'astronomy' in tagger.analyze_text(text)['Level 1 Tags']
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = TaggerResultCache(max_entries=2)
+    for key in 'abc':
+        cache.put(key, {'Level 1 Tags': [key]})
+    assert cache.get('a') is None
+    assert cache.get('c') == {'Level 1 Tags': ['c']}
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import adjusted_rand_score
+
+from bias_detection_toolkit.causal_matrix_decomposition_detector import CausalMatrixDecompositionDetector
+
+INPUTS = ['x1', 'x2', 'x3']
+
+
+def make_data(rows_per_cause=150, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    # Cada saída vem de duas combinações de entradas bem separadas; a saída 99 tem só duas linhas
+    for output, centers in [(3, [(1, 2, 0), (8, 0, 9)]), (5, [(2, 3, 0), (5, 0, 7)]), (20, [(10, 5, 10), (0, 9, 1)])]:
+        for center in centers:
+            frames.append(pd.DataFrame(rng.normal(center, 0.3, (rows_per_cause, 3)), columns=INPUTS).assign(
+                output=output))
+    frames.append(pd.DataFrame([[0, 0, 0], [1, 1, 1]], columns=INPUTS).assign(output=99))
+    data = pd.concat(frames, ignore_index=True)
+    # Índice não padrão e linhas embaralhadas: os rótulos precisam seguir as linhas do df
+    data = data.iloc[rng.permutation(len(data))]
+    data.index = data.index * 10 + 7
+    return data
+
+
+def reference_decomposition(data, n_clusters=2, variance_threshold=0.9):
+    results = {}
+    for value, group in data.groupby('output'):
+        if len(group) < n_clusters * 2:
+            continue
+        pca = PCA()
+        transformed = pca.fit_transform(group[INPUTS])
+        reduced_dims = np.argmax(np.cumsum(pca.explained_variance_ratio_) >= variance_threshold) + 1
+        labels = KMeans(n_clusters=n_clusters, random_state=42).fit_predict(transformed[:, :reduced_dims])
+        results[value] = (pd.Series(labels, index=group.index), reduced_dims)
+    return results
+
+
+def test_serial_decomposition_matches_reference_loop():
+    data = make_data()
+    results = CausalMatrixDecompositionDetector().analyze_output_variability(data, INPUTS, 'output')
+
+    expected = reference_decomposition(data)
+    assert set(results) == set(expected) == {3, 5, 20}
+    for value, (labels, reduced_dims) in expected.items():
+        result = results[value]
+        assert result['group_size'] == len(labels) and result['original_output'] == value
+        assert result['reduced_dimensions_used'] == reduced_dims
+        assert result['distinct_causal_clusters'] == 2
+        pd.testing.assert_index_equal(result['cluster_labels'].index, labels.index)
+        np.testing.assert_array_equal(result['cluster_labels'].to_numpy(), labels.to_numpy())
+
+
+def test_parallel_and_incremental_paths_agree_with_serial():
+    data = make_data()
+    serial = CausalMatrixDecompositionDetector().analyze_output_variability(data, INPUTS, 'output')
+    parallel = CausalMatrixDecompositionDetector(n_jobs=2).analyze_output_variability(data, INPUTS, 'output')
+    incremental = CausalMatrixDecompositionDetector(incremental_threshold=100, batch_size=64).analyze_output_variability(
+        data, INPUTS, 'output')
+
+    assert set(parallel) == set(incremental) == set(serial)
+    for value, result in serial.items():
+        pd.testing.assert_series_equal(parallel[value]['cluster_labels'], result['cluster_labels'])
+        # Mini-lotes podem numerar os grupos de outra forma, mas a partição das linhas é a mesma
+        labels = incremental[value]['cluster_labels']
+        pd.testing.assert_index_equal(labels.index, result['cluster_labels'].index)
+        assert adjusted_rand_score(result['cluster_labels'], labels) == pytest.approx(1.0)
+        assert incremental[value]['reduced_dimensions_used'] == result['reduced_dimensions_used']
@@ -0,0 +1,73 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.chronic_drift_detector import (
+    DRIFT_METRICS,
+    ChronicDriftDetector,
+    StreamingChronicDriftDetector,
+)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 600
+    frame = pd.DataFrame({
+        'date': pd.date_range('2020-01-01', periods=n, freq='h'),
+        'mood': rng.normal(size=n).cumsum() * 0.1,
+        'engagement': rng.normal(size=n),
+    })
+    frame.loc[5:7, 'mood'] = np.nan
+    # Linhas fora de ordem: os detectores ordenam pelo tempo
+    return frame.sample(frac=1.0, random_state=1)
+
+
+def assert_same_records(expected, actual):
+    assert len(expected) == len(actual)
+    for a, b in zip(expected, actual):
+        assert a['index'] == b['index']
+        assert a['time'] == b['time']
+        assert a['drift_score'] == pytest.approx(b['drift_score'], abs=1e-4)
+
+
+def test_fast_engine_matches_window_loop(data):
+    detector = ChronicDriftDetector(window_size=10, drift_threshold=0.5)
+    expected = detector.detect_drift(data, ['mood', 'engagement'], 'date')
+    assert len(expected) > 0
+    assert_same_records(expected, list(detector.detect_drift_fast(data, ['mood', 'engagement'], 'date')))
+
+
+def test_sweep_matches_single_window_runs(data):
+    detector = ChronicDriftDetector(drift_threshold=0.5)
+    sweep = detector.sweep_window_sizes(data, ['mood', 'engagement'], 'date', [5, 10, 20], metric='cityblock')
+    for window_size, report in sweep.items():
+        single = ChronicDriftDetector(window_size, 0.5).detect_drift_fast(data, ['mood', 'engagement'], 'date',
+                                                                          metric='cityblock')
+        assert report == single
+
+
+def test_unknown_metric_is_rejected(data):
+    with pytest.raises(ValueError):
+        ChronicDriftDetector().detect_drift_fast(data, ['mood'], 'date', metric='manhattan')
+    assert 'euclidean' in DRIFT_METRICS
+
+
+def test_streaming_matches_batch_across_state_snapshot(data):
+    ordered = data.sort_values('date').reset_index(drop=True)
+    expected = ChronicDriftDetector(window_size=10, drift_threshold=0.5).detect_drift(data, ['mood', 'engagement'],
+                                                                                      'date')
+
+    stream = StreamingChronicDriftDetector(['mood', 'engagement'], 'date', window_size=10, drift_threshold=0.5)
+    records = stream.partial_fit(ordered.iloc[:250])
+    resumed = StreamingChronicDriftDetector.from_state(pickle.loads(pickle.dumps(stream.get_state())))
+    for _, row in ordered.iloc[250:400].iterrows():
+        record = resumed.update(row)
+        if record is not None:
+            records.append(record)
+    records += resumed.partial_fit(ordered.iloc[400:])
+
+    # O fluxo também pontua o último índice, que o laço em lote não alcança
+    assert_same_records(expected, [r for r in records if r['index'] < len(ordered) - 10])
@@ -0,0 +1,133 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.chunked_statistics import (
+    ChunkedAggregates,
+    GroupMoments,
+    is_chunk_source,
+    split_data_source,
+)
+from bias_detection_toolkit.contextual_input_variation_detector import ContextualInputVariationDetector
+from bias_detection_toolkit.embedded_social_learning_effect_detector import EmbeddedSocialLearningEffectDetector
+from bias_detection_toolkit.manual_data_forgery_detector import ManualDataForgeryDetector
+from bias_detection_toolkit.masked_feedback_bias_detector import MaskedFeedbackBiasDetector
+from bias_detection_toolkit.result_dependent_noise_detector import ResultDependentNoiseDetector
+from bias_detection_toolkit.selection_bias_or_malintent_detector import SelectionBiasOrMalintentDetector
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    n = 8000
+    groups = rng.integers(0, 30, n)
+    frame = pd.DataFrame({
+        'g': groups,
+        'h': rng.integers(0, 4, n),
+        't': rng.integers(0, 6, n),
+        'm': rng.gamma(2, 1, n) * (1 + (groups % 7 == 0) * 2) + (groups % 11 == 0) * rng.normal(0, 5, n),
+        'fb': np.where(rng.random(n) < 0.85, 5, rng.integers(1, 5, n)),
+        'k1': np.where(rng.random(n) < 0.95, 1.0, rng.random(n)),
+    })
+    frame.loc[rng.integers(0, n, 40), 'm'] = np.nan
+    return frame
+
+
+def chunks(frame, size=997):
+    return (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+def assert_same_reports(expected, actual):
+    expected, actual = expected.to_dicts(), actual.to_dicts()
+    assert len(expected) == len(actual)
+    for a, b in zip(expected, actual):
+        assert a.keys() == b.keys()
+        for key in a:
+            if isinstance(a[key], float):
+                assert b[key] == pytest.approx(a[key], rel=1e-9, nan_ok=True)
+            else:
+                assert a[key] == b[key]
+
+
+def test_chunk_sources_are_recognized(data):
+    assert is_chunk_source(chunks(data)) and is_chunk_source([data, data])
+    assert not is_chunk_source(data) and not is_chunk_source([])
+    frame, source = split_data_source(data.to_dict('list'))
+    assert source is None and frame.equals(data)
+
+
+def test_chunked_aggregates_match_pandas(data):
+    aggregates = ChunkedAggregates(chunks(data), group_stats=[('g', 'm'), (['g', 'h'], 'm')], moments=['m'],
+                                   value_counts=['fb'])
+    expected = data.groupby('g')['m'].agg(['count', 'mean', 'std'])
+    pd.testing.assert_frame_equal(aggregates.group_stats('g', 'm'), expected, check_dtype=False)
+    expected = data.groupby(['g', 'h'])['m'].agg(['count', 'mean', 'std'])
+    pd.testing.assert_frame_equal(aggregates.group_stats(['g', 'h'], 'm'), expected, check_dtype=False)
+    moments = aggregates.column_moments('m')
+    assert moments['mean'] == pytest.approx(data['m'].mean()) and moments['std'] == pytest.approx(data['m'].std())
+    pd.testing.assert_series_equal(aggregates.value_counts('fb').sort_index(),
+                                   data['fb'].value_counts(normalize=True).sort_index())
+
+
+def test_group_moments_single_group(data):
+    moments = GroupMoments()
+    for chunk in chunks(data, 3000):
+        moments.update(chunk['m'])
+    result = moments.result().iloc[0]
+    assert result['count'] == data['m'].count()
+    assert result['std'] == pytest.approx(data['m'].std())
+
+
+DETECTORS = {
+    'selection': lambda source: SelectionBiasOrMalintentDetector(source, 'g', 'm'),
+    'embedded': lambda source: EmbeddedSocialLearningEffectDetector(source, 'm', 'g'),
+    'contextual': lambda source: ContextualInputVariationDetector(source, 'g', 'm'),
+    'contextual_grouped': lambda source: ContextualInputVariationDetector(source, 'g', 'm', 'h'),
+    'noise': lambda source: ResultDependentNoiseDetector(source, 't', 'm'),
+    'manual': lambda source: ManualDataForgeryDetector(source, ['k1', 'fb']),
+    'masked': lambda source: MaskedFeedbackBiasDetector(source, 'fb'),
+}
+
+
+@pytest.mark.parametrize('name', sorted(DETECTORS))
+def test_chunked_detectors_match_in_memory(data, name):
+    expected = DETECTORS[name](data).analyze()
+    detector = DETECTORS[name](chunks(data))
+    assert_same_reports(expected, detector.analyze())
+    # A fonte de uma só passada é consumida uma vez; a segunda análise usa os agregados
+    assert_same_reports(expected, detector.analyze())
+
+
+def test_csv_reader_chunks(data):
+    buffer = io.StringIO()
+    data.to_csv(buffer, index=False)
+    buffer.seek(0)
+    reader = pd.read_csv(buffer, chunksize=3000)
+    assert_same_reports(SelectionBiasOrMalintentDetector(data, 'g', 'm').analyze(),
+                        SelectionBiasOrMalintentDetector(reader, 'g', 'm').analyze())
+
+
+@pytest.mark.parametrize('name', sorted(DETECTORS))
+def test_empty_chunk_sources_give_empty_reports(name):
+    assert len(DETECTORS[name](iter([])).analyze()) == 0
+
+
+def test_empty_chunk_source_gives_empty_aggregates():
+    aggregates = ChunkedAggregates(iter([]), group_stats=[('g', 'm'), (['g', 'h'], 'm')], moments=['m'],
+                                   value_counts=['fb'])
+    assert aggregates.group_stats('g', 'm').empty
+    assert aggregates.group_stats(['g', 'h'], 'm').index.names == ['g', 'h']
+    assert np.isnan(aggregates.column_moments('m')['mean'])
+    assert aggregates.value_counts('fb').empty
+
+
+def test_one_shot_sources_refuse_a_second_pass(data):
+    _, source = split_data_source(chunks(data))
+    ChunkedAggregates(source, moments=['m'])
+    with pytest.raises(ValueError, match='already consumed'):
+        ChunkedAggregates(source, moments=['m'])
+    # Listas de chunks podem ser relidas
+    _, source = split_data_source(list(chunks(data)))
+    assert isinstance(source, list)
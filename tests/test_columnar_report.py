@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.audit_documentation_fraud_detector import AuditDocumentationFraudDetector
+from bias_detection_toolkit.columnar_report import ColumnarReport
+
+
+def legacy_analyze(data, quality_col, timestamp_col):
+    records = []
+    spikes = data[quality_col].diff().abs() > data[quality_col].std() * 2
+    for index, spike in spikes.items():
+        if spike:
+            records.append({
+                "index": index,
+                "timestamp": data.loc[index, timestamp_col],
+                "doc_quality": data.loc[index, quality_col],
+                "fraud_pattern_suspected": True
+            })
+    return records
+
+
+@pytest.fixture
+def report():
+    return ColumnarReport({
+        'group': np.array(['a', 'b', 'c']),
+        'mean': pd.Series([1.5, 2.5, 3.5]),
+        'time': pd.date_range('2024-01-01', periods=3),
+        'flagged': True,
+    })
+
+
+def test_detector_report_matches_dict_loop():
+    rng = np.random.default_rng(0)
+    n = 5000
+    quality = np.where(np.arange(n) % 2, 10.0, -10.0)
+    quality[rng.random(n) < 0.05] = 0.0
+    data = pd.DataFrame({'quality': quality, 'timestamp': pd.date_range('2020-01-01', periods=n, freq='min')},
+                        index=pd.RangeIndex(100, 100 + n))
+
+    report = AuditDocumentationFraudDetector(data, 'quality', 'timestamp').analyze()
+    assert len(report) > 0
+    assert report == legacy_analyze(data, 'quality', 'timestamp')
+
+
+def test_rows_are_python_scalars(report):
+    row = report[1]
+    assert row == {'group': 'b', 'mean': 2.5, 'time': pd.Timestamp('2024-01-02'), 'flagged': True}
+    assert type(row['group']) is str and type(row['mean']) is float
+    assert report[-1]['group'] == 'c'
+    with pytest.raises(IndexError):
+        report[3]
+
+
+def test_slices_and_masks_return_reports(report):
+    assert report[1:] == report.to_dicts()[1:]
+    masked = report[np.array([True, False, True])]
+    assert isinstance(masked, ColumnarReport)
+    assert [row['group'] for row in masked] == ['a', 'c']
+    assert masked.column('flagged').tolist() == [True, True]
+
+
+def test_from_records_round_trip(report):
+    rebuilt = ColumnarReport.from_records(report.to_dicts())
+    assert rebuilt == report
+    assert rebuilt.fields == report.fields
+    assert len(ColumnarReport.from_records([], ['a', 'b'])) == 0
+
+
+def test_scalar_only_report_needs_length():
+    assert ColumnarReport({'suspected': True}, length=2).to_dicts() == [{'suspected': True}] * 2
+    with pytest.raises(ValueError):
+        ColumnarReport({'a': [1, 2], 'b': [1]})
+
+
+def test_to_frame(report):
+    frame = report.to_frame()
+    assert list(frame.columns) == report.fields
+    assert frame['flagged'].tolist() == [True] * 3
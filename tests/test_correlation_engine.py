@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.correlation_engine import CorrelationEngine
+from bias_detection_toolkit.downstream_variable_shadowing_detector import DownstreamVariableShadowingDetector
+from bias_detection_toolkit.statistics_provider import StatisticsProvider
+from bias_detection_toolkit.synthetic_data_formula_detector import SyntheticDataFormulaDetector
+
+
+def make_data(n_rows=300, n_columns=120, seed=42):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, n_columns))
+    for j in range(0, n_columns - 1, 25):
+        values[:, j + 1] = 3 * values[:, j] + 0.01 * rng.normal(size=n_rows)
+    values[:, 7] = 1.0
+    return pd.DataFrame(values, columns=[f"c{j}" for j in range(n_columns)])
+
+
+def dense_edges(data, threshold):
+    corr = data.corr().to_numpy()
+    rows, cols = np.triu_indices(len(corr), k=1)
+    hits = np.abs(corr[rows, cols]) > threshold
+    return rows[hits], cols[hits], corr[rows[hits], cols[hits]]
+
+
+@pytest.mark.parametrize('block_size', [16, 50, 1024])
+def test_edges_match_dense_corr(block_size):
+    data = make_data()
+    first, second, correlation = CorrelationEngine(data, list(data.columns), block_size=block_size).edges(0.2)
+    rows, cols, expected = dense_edges(data, 0.2)
+    assert first.tolist() == rows.tolist() and second.tolist() == cols.tolist()
+    np.testing.assert_allclose(correlation, expected, atol=1e-10)
+
+
+def test_float32_edges_match_within_tolerance():
+    data = make_data()
+    first, second, correlation = CorrelationEngine(data, list(data.columns), dtype=np.float32, block_size=32).edges(0.9)
+    rows, cols, expected = dense_edges(data, 0.9)
+    assert first.tolist() == rows.tolist() and second.tolist() == cols.tolist()
+    np.testing.assert_allclose(correlation, expected, atol=1e-5)
+
+
+def test_missing_values_use_pairwise_complete_rows():
+    data = make_data(n_columns=40)
+    rng = np.random.default_rng(1)
+    data = data.mask(rng.random(data.shape) < 0.1)
+    engine = CorrelationEngine(data, list(data.columns), block_size=16)
+    assert engine.has_missing
+    expected = data.corr().to_numpy()
+    np.testing.assert_allclose(engine.correlations_with('c3'), expected[:, 3], atol=1e-10)
+    assert np.isnan(engine.correlations_with('c7')).all()
+
+
+def test_formula_detector_finds_dense_pairs():
+    data = make_data()
+    rows, cols, _ = dense_edges(data, 0.95)
+    for dtype in (np.float64, np.float32):
+        report = SyntheticDataFormulaDetector(data, list(data.columns), dtype=dtype, block_size=32).analyze()
+        assert list(report.column('columns')) == list(zip(data.columns[rows], data.columns[cols]))
+
+
+@pytest.mark.parametrize('columns', [['c3', 'c4', 'c5'], ['c26', 'c7', 'c1', 'c0']])
+def test_selected_columns_match_a_fresh_engine(columns):
+    data = make_data(n_columns=40)
+    data = data.mask(np.random.default_rng(2).random(data.shape) < 0.05)
+    selected = CorrelationEngine(data, list(data.columns), block_size=16).select(columns, block_size=2)
+    fresh = CorrelationEngine(data, columns, block_size=2)
+    assert selected.columns == columns and selected.block_size == 2
+    for expected, actual in zip(fresh.edges(0.1), selected.edges(0.1)):
+        np.testing.assert_allclose(actual, expected, atol=1e-12)
+    np.testing.assert_allclose(selected.correlations_with(columns[1]), fresh.correlations_with(columns[1]),
+                               atol=1e-12, equal_nan=True)
+
+
+def test_provider_serves_engines_from_one_that_covers_the_columns():
+    data = make_data()
+    stats = StatisticsProvider()
+    SyntheticDataFormulaDetector(data, list(data.columns), stats=stats).analyze()
+    group = ['c0', 'c1', 'c2', 'c26', 'c50']
+    report = DownstreamVariableShadowingDetector(data, 'c3', group, stats=stats).analyze()
+    assert (stats.misses, stats.hits) == (1, 1)
+    expected = DownstreamVariableShadowingDetector(data, 'c3', group).analyze()
+    assert report.column('variable').tolist() == expected.column('variable').tolist() == ['c0', 'c1']
+    np.testing.assert_allclose(report.column('corr_with_target'), expected.column('corr_with_target'), atol=1e-12)
+
+    # Outro dtype não aproveita o engine em float64
+    stats.correlation_engine(data, group, dtype=np.float32)
+    assert stats.misses == 2
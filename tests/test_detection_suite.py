@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.detection_suite import DetectionSuite, DetectorSpec
+from bias_detection_toolkit.masked_feedback_bias_detector import MaskedFeedbackBiasDetector
+from bias_detection_toolkit.range_drift_without_breach_detector import RangeDriftWithoutBreachDetector
+from bias_detection_toolkit.selection_bias_or_malintent_detector import SelectionBiasOrMalintentDetector
+from bias_detection_toolkit.synthetic_data_formula_detector import SyntheticDataFormulaDetector
+
+
+class FailingDetector:
+    def __init__(self, data, column):
+        self.data = data
+        self.column = column
+
+    def analyze(self):
+        raise KeyError(self.column)
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    n = 2000
+    x = rng.normal(size=n)
+    return pd.DataFrame({
+        'group': rng.integers(0, 5, n),
+        'metric': rng.gamma(2, 1, n) + (rng.integers(0, 5, n) == 0) * 10,
+        'feedback': np.where(rng.random(n) < 0.9, 5, 3),
+        'x': x,
+        'y': 2 * x + 1,
+        'label': np.array(['a', 'b'])[rng.integers(0, 2, n)],
+    })
+
+
+def make_specs():
+    return [
+        DetectorSpec(SelectionBiasOrMalintentDetector, {'group_col': 'group', 'metric_col': 'metric'}),
+        DetectorSpec(MaskedFeedbackBiasDetector, {'feedback_col': 'feedback'}),
+        DetectorSpec(SyntheticDataFormulaDetector, {'columns': ['x', 'y']}),
+        DetectorSpec(FailingDetector, {'column': 'missing'}, name='failing'),
+    ]
+
+
+def test_run_matches_direct_analysis_and_reports_failures(data):
+    suite = DetectionSuite(make_specs(), n_workers=2)
+    report = suite.run(data)
+
+    assert set(report['results']) == {'SelectionBiasOrMalintentDetector', 'MaskedFeedbackBiasDetector',
+                                      'SyntheticDataFormulaDetector'}
+    for spec in suite.specs[:3]:
+        expected = spec.detector_cls(data, **spec.params).analyze()
+        assert report['results'][spec.name].to_dicts() == expected.to_dicts()
+    assert set(report['failures']) == {'failing'} and 'KeyError' in report['failures']['failing']
+    assert set(report['timings']) == {spec.name for spec in suite.specs}
+    assert all(elapsed >= 0 for elapsed in report['timings'].values())
+    assert report['wall_time'] > 0
+    assert suite.observed_times == report['timings']
+
+
+def test_heavyweight_detectors_start_first_from_class_hints():
+    suite = DetectionSuite([RangeDriftWithoutBreachDetector, SelectionBiasOrMalintentDetector,
+                            SyntheticDataFormulaDetector, DetectorSpec(MaskedFeedbackBiasDetector, cost=50.0)])
+    assert [spec.detector_cls for spec in suite._schedule()] == [
+        MaskedFeedbackBiasDetector, SyntheticDataFormulaDetector, SelectionBiasOrMalintentDetector,
+        RangeDriftWithoutBreachDetector,
+    ]
+    # Depois de uma execução, valem os tempos medidos
+    suite.observed_times = {'RangeDriftWithoutBreachDetector': 3.0, 'SelectionBiasOrMalintentDetector': 2.0,
+                            'SyntheticDataFormulaDetector': 1.0, 'MaskedFeedbackBiasDetector': 0.5}
+    assert [spec.name for spec in suite._schedule()][0] == 'RangeDriftWithoutBreachDetector'
+
+
+def test_non_numeric_columns_reach_the_workers(data):
+    report = DetectionSuite([DetectorSpec(MaskedFeedbackBiasDetector, {'feedback_col': 'label'})],
+                            n_workers=1).run(data)
+    assert report['failures'] == {}
+    expected = MaskedFeedbackBiasDetector(data, 'label').analyze()
+    assert report['results']['MaskedFeedbackBiasDetector'].to_dicts() == expected.to_dicts()
+
+
+def test_duplicate_names_are_rejected():
+    with pytest.raises(ValueError):
+        DetectionSuite([SelectionBiasOrMalintentDetector, SelectionBiasOrMalintentDetector])
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.chunked_statistics import ChunkedAggregates
+from bias_detection_toolkit.result_dependent_noise_detector import ResultDependentNoiseDetector
+from bias_detection_toolkit.sampled_statistics import SampledAggregates, StratifiedSample, interval_contains
+from bias_detection_toolkit.selection_bias_or_malintent_detector import SelectionBiasOrMalintentDetector
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    n, n_groups = 400_000, 100
+    groups = rng.integers(0, n_groups, n)
+    frame = pd.DataFrame({'g': groups, 'x': rng.normal(rng.uniform(5, 15, n_groups)[groups],
+                                                     rng.uniform(0.5, 3, n_groups)[groups])})
+    frame.loc[::101, 'x'] = np.nan
+    return frame
+
+
+def chunk_list(frame, size=50_000):
+    return [frame.iloc[start:start + size] for start in range(0, len(frame), size)]
+
+
+def test_interval_contains():
+    low, high = np.array([0.0, 2.0, np.nan]), np.array([1.0, 3.0, 4.0])
+    assert interval_contains(low, high, [0.5]).tolist() == [True, False, True]
+    assert interval_contains(low, high, [2.5, 10.0]).tolist() == [False, True, True]
+
+
+def test_stratified_sample_keeps_about_capacity_rows_per_group():
+    sample = StratifiedSample(50, seed=0)
+    # Grupo 0 com metade das linhas, grupos 1 a 19 com o resto e o grupo 20 com 30 linhas
+    keys = np.where(np.arange(200_000) % 2 == 0, 0, np.arange(200_000) % 19 + 1)
+    keys[np.arange(30) * 6000 + 1] = 20
+    for start in range(0, len(keys), 30_000):
+        sample.update(keys[start:start + 30_000], np.arange(start, min(start + 30_000, len(keys)), dtype=float))
+    rows = sample.rows
+    sizes = rows['key'].value_counts()
+    np.testing.assert_array_equal(sample.counts, pd.Series(keys).value_counts().reindex(sample.groups))
+    assert sizes[20] == 30
+    assert abs(sizes.drop(20).mean() - 50) < 5 and sizes.drop(20).min() > 20
+    # Linhas do início e do fim do fluxo entram com a mesma probabilidade
+    early = (rows.loc[rows['key'] == 0, 'value'] < len(keys) / 2).mean()
+    assert early == pytest.approx(0.5, abs=0.1)
+
+
+def test_stratified_sample_skips_missing_rows():
+    sample = StratifiedSample(5, seed=0).update([1, 1, 2, None], [1.0, np.nan, 3.0, 4.0])
+    assert sample.rows.to_dict('list') == {'key': [1, 2], 'value': [1.0, 3.0]}
+    assert sample.counts.tolist() == [1, 1]
+    with pytest.raises(ValueError):
+        StratifiedSample(1)
+
+
+def test_integer_keys_outside_the_table_range_fall_back_to_hashing():
+    sample = StratifiedSample(5, seed=0)
+    sample.update(np.array([3, 4, 3]), np.ones(3))
+    sample.update(np.array([4, 10 ** 12, -7]), np.ones(3))
+    assert list(sample.groups) == [3, 4, 10 ** 12, -7]
+    assert sample.counts.tolist() == [2, 2, 1, 1]
+
+
+def test_small_sources_are_exact(data):
+    small = data.iloc[:3000]
+    estimates = SampledAggregates(small, 'g', 'x', sample_size=200, seed=0).group_estimates()
+    exact = small.groupby('g')['x'].agg(['count', 'mean', 'std'])
+    assert estimates['exact'].all()
+    np.testing.assert_allclose(estimates['mean'], exact['mean'])
+    np.testing.assert_array_equal(estimates['count'], exact['count'])
+    np.testing.assert_array_equal(estimates['mean_low'], estimates['mean'])
+
+
+def test_intervals_cover_the_exact_statistics(data):
+    sampled = SampledAggregates(chunk_list(data), 'g', 'x', sample_size=100, seed=1)
+    exact = ChunkedAggregates(chunk_list(data), group_stats=[('g', 'x')]).group_stats('g', 'x')
+    estimates = sampled.group_estimates().reindex(exact.index)
+    assert not estimates['exact'].any()
+    assert estimates['sample_count'].mean() == pytest.approx(100, rel=0.2)
+    mean_coverage = ((estimates['mean_low'] <= exact['mean']) & (exact['mean'] <= estimates['mean_high'])).mean()
+    std_coverage = ((estimates['std_low'] <= exact['std']) & (exact['std'] <= estimates['std_high'])).mean()
+    assert mean_coverage >= 0.85 and std_coverage >= 0.85
+    np.testing.assert_allclose(estimates['count'], exact['count'], rtol=0.35)
+
+    moments = sampled.column_moments()
+    assert moments['mean'] == pytest.approx(data['x'].mean()) and moments['std'] == pytest.approx(data['x'].std())
+
+
+def test_escalate_is_exact_and_leaves_the_estimates_untouched(data):
+    sampled = SampledAggregates(data, 'g', 'x', sample_size=100, seed=2)
+    before = sampled.group_estimates()
+    escalated = sampled.escalate(before.index[:10])
+    exact = data.groupby('g')['x'].agg(['mean', 'std']).loc[before.index[:10]]
+    assert escalated['exact'].sum() == 10
+    np.testing.assert_allclose(escalated.loc[exact.index, 'mean'], exact['mean'])
+    np.testing.assert_allclose(escalated.loc[exact.index, 'std_high'], exact['std'])
+    pd.testing.assert_frame_equal(sampled.group_estimates(), before)
+
+
+def test_one_shot_sources_cannot_be_escalated(data):
+    sampled = SampledAggregates(iter(chunk_list(data)), 'g', 'x', sample_size=100, seed=0)
+    assert not sampled.reusable
+    assert not sampled.escalate(sampled.group_estimates().index)['exact'].any()
+
+
+def test_approximate_detectors_match_exact_after_escalation():
+    rng = np.random.default_rng(3)
+    n, n_groups = 300_000, 60
+    groups = rng.integers(0, n_groups, n)
+    means, stds = rng.uniform(2, 22, n_groups), rng.uniform(1, 12, n_groups)
+    data = pd.DataFrame({'g': groups, 'x': rng.normal(means[groups], stds[groups])})
+
+    for detector in (SelectionBiasOrMalintentDetector(data, 'g', 'x'), ResultDependentNoiseDetector(data, 'g', 'x')):
+        exact = detector.analyze().to_frame().iloc[:, 0]
+        approximate = detector.analyze(approximate=True, sample_size=100, seed=0).to_frame().iloc[:, 0]
+        assert len(exact) > 0
+        assert set(approximate) == set(exact)
+        # A escalação anterior não vaza para uma análise sem escalação
+        assert not detector.analyze(approximate=True, sample_size=100, seed=0, escalate=False).to_frame()['exact'].any()
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_small_extreme_groups_are_kept_whole(seed):
+    rng = np.random.default_rng(seed)
+    groups = np.repeat(np.arange(100), 5000)
+    frame = pd.DataFrame({'g': np.r_[groups, [999] * 5], 'm': np.r_[rng.normal(10, 1, len(groups)), [100.0] * 5]})
+    frame = frame.sample(frac=1.0, random_state=seed)
+    expected = SelectionBiasOrMalintentDetector(frame, 'g', 'm').analyze()
+    assert list(expected.column('group')) == [999]
+
+    for source in (frame, (frame.iloc[start:start + 40_000] for start in range(0, len(frame), 40_000))):
+        report = SelectionBiasOrMalintentDetector(source, 'g', 'm').analyze(approximate=True, seed=seed)
+        assert list(report.column('group')) == [999] and list(report.column('exact')) == [True]
+        assert report[0]['mean'] == 100.0
+
+
+@pytest.mark.parametrize('make_detector', [
+    lambda source: SelectionBiasOrMalintentDetector(source, 'g', 'x'),
+    lambda source: ResultDependentNoiseDetector(source, 'g', 'x'),
+])
+def test_one_shot_sources_do_not_switch_between_exact_and_approximate(data, make_detector):
+    exact = make_detector(data).analyze().to_frame()
+    detector = make_detector(iter(chunk_list(data)))
+    pd.testing.assert_frame_equal(detector.analyze().to_frame(), exact)
+    with pytest.raises(ValueError, match='already consumed'):
+        detector.analyze(approximate=True, seed=0)
+
+    detector = make_detector(iter(chunk_list(data)))
+    first = detector.analyze(approximate=True, seed=0)
+    assert detector.analyze(approximate=True, seed=0) == first
+    with pytest.raises(ValueError, match='already consumed'):
+        detector.analyze()
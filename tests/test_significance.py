@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.significance import (
+    _distinct_indices,
+    _subset_sums,
+    benjamini_hochberg,
+    group_pvalues,
+    group_significance,
+)
+
+
+def loop_pvalues(values, codes, n_groups, statistic, n_resamples, seed=0):
+    """Reference: shuffle the labels and recompute every group with groupby, once per resample."""
+    rng = np.random.default_rng(seed)
+    series = pd.Series(values)
+    compute = (lambda grouped: grouped.mean()) if statistic == 'mean' else (lambda grouped: grouped.std())
+    center = values.mean() if statistic == 'mean' else values.std(ddof=1)
+    observed = (compute(series.groupby(codes)).reindex(range(n_groups)) - center).abs().to_numpy()
+    exceedances = np.zeros(n_groups)
+    for _ in range(n_resamples):
+        resampled = (compute(series.groupby(rng.permutation(codes))).reindex(range(n_groups)) - center).abs()
+        exceedances += resampled.to_numpy() >= observed * (1 - 1e-9)
+    return np.where(np.isnan(observed), np.nan, (1 + exceedances) / (1 + n_resamples))
+
+
+def make_data(layout, n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    if layout == 'balanced':
+        codes = rng.integers(0, 12, n)
+    elif layout == 'dominant':
+        # Um grupo com 90% das linhas: usa o complemento
+        codes = np.where(rng.random(n) < 0.9, 0, rng.integers(1, 10, n))
+    elif layout == 'mixed':
+        # Um grupo grande (40%) junto de grupos pequenos: só o grande sai das amostras por byte
+        codes = np.where(rng.random(n) < 0.4, 0, rng.integers(1, 30, n))
+    else:
+        # Poucos grupos grandes: nenhum pode usar a retirada de linhas distintas
+        codes = rng.integers(0, 3, n)
+    values = rng.normal(size=n) + 0.25 * (codes == 1)
+    values *= np.where(codes == 2, 1.5, 1.0)
+    return values, codes, int(codes.max()) + 1
+
+
+@pytest.mark.parametrize('layout', ['balanced', 'dominant', 'mixed', 'few'])
+@pytest.mark.parametrize('statistic', ['mean', 'std'])
+def test_permutation_pvalues_match_label_shuffling(layout, statistic):
+    values, codes, n_groups = make_data(layout)
+    reference = loop_pvalues(values, codes, n_groups, statistic, 1500)
+    vectorized = group_pvalues(values, codes, n_groups, statistic=statistic, n_resamples=1500, seed=1)
+    assert np.array_equal(np.isnan(reference), np.isnan(vectorized))
+    assert np.nanmax(np.abs(reference - vectorized)) < 0.06
+
+
+def test_distinct_indices_are_uniform_draws_without_replacement():
+    indices = _distinct_indices(np.random.default_rng(0), 6, 60_000, 4)
+    ranked = np.sort(indices, axis=1)
+    assert (ranked[:, 1:] != ranked[:, :-1]).all()
+    np.testing.assert_allclose(np.bincount(indices[:, -1], minlength=6) / len(indices), 1 / 6, atol=0.01)
+
+
+def test_subset_sums_are_uniform_samples_without_replacement():
+    rng = np.random.default_rng(0)
+    # Com a identidade como pesos, cada soma é o indicador das linhas sorteadas
+    draws = np.array([_subset_sums(rng, np.eye(7), np.array([2, 3])) for _ in range(42_000)])
+    assert (draws.sum(axis=2) == [2, 3]).all() and set(np.unique(draws)) == {0.0, 1.0}
+    for k, depth in enumerate((2, 3)):
+        subsets = draws[:, k] @ (1 << np.arange(7))
+        frequencies = np.unique(subsets, return_counts=True)[1] / len(draws)
+        # C(7, 2) = 21 e C(7, 3) = 35 amostras, todas igualmente prováveis
+        assert len(frequencies) == (21 if depth == 2 else 35)
+        np.testing.assert_allclose(frequencies, 1 / len(frequencies), rtol=0.15)
+
+
+@pytest.mark.parametrize('method', ['permutation', 'bootstrap'])
+def test_pvalues_do_not_depend_on_batches_across_jobs(method):
+    values, codes, n_groups = make_data('balanced')
+    serial = group_pvalues(values, codes, n_groups, method=method, n_resamples=400, batch_size=50, seed=3)
+    parallel = group_pvalues(values, codes, n_groups, method=method, n_resamples=400, batch_size=50, seed=3,
+                             n_jobs=2)
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_bootstrap_flags_the_shifted_group():
+    values, codes, n_groups = make_data('balanced')
+    values = values + 0.5 * (codes == 1)
+    p_values = group_pvalues(values, codes, n_groups, method='bootstrap', n_resamples=2000, seed=0)
+    assert p_values[1] < 0.01
+    assert np.median(p_values) > 0.1
+
+
+def test_single_row_groups_have_no_std_pvalue():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 10.0])
+    codes = np.array([0, 0, 1, 1, 2])
+    p_values = group_pvalues(values, codes, 3, statistic='std', n_resamples=200, seed=0)
+    assert np.isnan(p_values[2]) and not np.isnan(p_values[:2]).any()
+
+
+def test_invalid_arguments_are_rejected():
+    with pytest.raises(ValueError):
+        group_pvalues([1.0, 2.0], [0, 1], 2, method='jackknife')
+    with pytest.raises(ValueError):
+        group_pvalues([1.0, 2.0], [0, 1], 2, statistic='median')
+
+
+def test_benjamini_hochberg():
+    p_values = np.array([0.01, 0.04, np.nan, 0.03, 0.2])
+    expected = np.array([0.04, 0.04 * 4 / 3, np.nan, 0.04 * 4 / 3, 0.2])
+    np.testing.assert_allclose(benjamini_hochberg(p_values), expected)
+
+
+def test_group_significance_aligns_to_groups():
+    rng = np.random.default_rng(0)
+    keys = rng.choice(['a', 'b', 'c', 'z'], 600)
+    values = pd.Series(rng.normal(size=600) + (keys == 'b') * 2.0)
+    values[:10] = np.nan
+    groups = pd.Index(['a', 'b', 'c', 'missing'])
+    result = group_significance(values, keys, groups, n_resamples=500, seed=0)
+    assert list(result.index) == list(groups)
+    assert result.loc['b', 'p_value'] < 0.01
+    assert np.isnan(result.loc['missing', 'p_value'])
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.manual_data_forgery_detector import ManualDataForgeryDetector
+from bias_detection_toolkit.masked_feedback_bias_detector import MaskedFeedbackBiasDetector
+from bias_detection_toolkit.sketches import CountSketch, KLLSketch, MisraGriesSketch, ReservoirSample
+
+
+def test_misra_gries_is_exact_within_capacity():
+    values = pd.Series([3, 1, 3, 2, 3, 1, np.nan])
+    sketch = MisraGriesSketch(5).update(values)
+    assert sketch.n == 6
+    assert sketch.counts.sort_index().to_dict() == {1: 2, 2: 1, 3: 3}
+    assert sketch.upper_bounds().equals(sketch.counts.astype(np.float64))
+
+
+def test_misra_gries_bounds_hold_and_memory_stays_bounded():
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.where(rng.random(200_000) < 0.3, 7, rng.integers(100, 10 ** 6, 200_000)))
+    sketch = MisraGriesSketch(10)
+    for start in range(0, len(values), 70_000):
+        sketch.update(values.iloc[start:start + 70_000])
+    exact = values.value_counts()
+    assert len(sketch.counts) <= 10
+    assert sketch.lower_bounds()[7] <= exact[7] <= sketch.upper_bounds()[7]
+    assert sketch.heavy_hitters(0.25).index.tolist() == [7]
+
+
+def test_merged_sketches_keep_the_heavy_hitters():
+    rng = np.random.default_rng(1)
+    values = np.where(rng.random(100_000) < 0.2, -1, rng.integers(0, 5000, 100_000))
+    left = MisraGriesSketch(20).update(values[:60_000])
+    right = MisraGriesSketch(20).update(values[60_000:])
+    merged = left.merge(right)
+    assert merged.n == len(values)
+    assert merged.verified_heavy_hitters(0.1, [values]).index.tolist() == [-1]
+
+
+def test_verified_heavy_hitters_reject_upper_bound_false_positives():
+    values = pd.Series([1] * 85 + list(range(100, 115)))
+    sketch = MisraGriesSketch(2).update(values)
+    assert 1 in sketch.heavy_hitters(0.86).index
+    assert sketch.verified_heavy_hitters(0.86, [values]).empty
+    verified = sketch.verified_heavy_hitters(0.84, [values.iloc[:50], values.iloc[50:]])
+    assert verified.to_dict() == {1: 0.85}
+    # Sem segunda passada decidem os limites inferiores: nada abaixo do limiar é reportado
+    assert (sketch.verified_heavy_hitters(0.5) <= 0.85).all()
+
+
+def frequency_data(seed=0, n=60_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'near': np.where(rng.random(n) < 0.895, 7.0, rng.integers(100, 10 ** 6, n)),
+        'heavy': np.where(rng.random(n) < 0.95, 3.0, rng.integers(100, 10 ** 6, n)),
+        'feedback': np.where(rng.random(n) < 0.81, 'good', rng.integers(0, 10 ** 5, n).astype(str)),
+    })
+
+
+@pytest.mark.parametrize('source', ['frame', 'chunks'])
+def test_sketch_mode_reports_match_exact_mode(source):
+    data = frequency_data()
+    source = data if source == 'frame' else [data.iloc[start:start + 7000] for start in range(0, len(data), 7000)]
+
+    manual = ManualDataForgeryDetector(source, ['near', 'heavy'])
+    exact = manual.analyze()
+    assert [row['column'] for row in exact] == ['heavy']
+    assert manual.analyze(frequency_method='sketch') == exact
+
+    masked = MaskedFeedbackBiasDetector(source, 'feedback')
+    assert masked.analyze(frequency_method='sketch') == masked.analyze()
+
+
+def test_one_shot_sources_keep_their_sketches_and_refuse_a_second_pass():
+    data = frequency_data()
+    chunks = lambda: (data.iloc[start:start + 7000] for start in range(0, len(data), 7000))
+    expected = ManualDataForgeryDetector(data, ['near', 'heavy']).analyze()
+
+    manual = ManualDataForgeryDetector(chunks(), ['near', 'heavy'])
+    assert manual.analyze(frequency_method='sketch') == expected
+    assert manual.analyze(frequency_method='sketch') == expected
+    with pytest.raises(ValueError, match='already consumed'):
+        manual.analyze()
+
+    masked = MaskedFeedbackBiasDetector(chunks(), 'feedback')
+    assert len(masked.analyze()) == 1
+    with pytest.raises(ValueError, match='already consumed'):
+        masked.analyze(frequency_method='sketch')
+
+
+def test_kll_quantiles_are_exact_before_compaction_and_close_after():
+    assert KLLSketch().update([1, 2, 3, 4]).quantile(0.25) == pd.Series([1, 2, 3, 4]).quantile(0.25)
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+    values = np.random.default_rng(0).normal(size=200_000)
+    sketch = KLLSketch(seed=1)
+    for start in range(0, len(values), 20_000):
+        sketch.update(values[start:start + 20_000])
+    ranks = np.searchsorted(np.sort(values), sketch.quantile([0.1, 0.5, 0.9])) / len(values)
+    np.testing.assert_allclose(ranks, [0.1, 0.5, 0.9], atol=0.02)
+
+    merged = KLLSketch(seed=2).update(values[:100_000]).merge(KLLSketch(seed=3).update(values[100_000:]))
+    assert len(merged) == len(values)
+    assert abs(np.searchsorted(np.sort(values), merged.quantile(0.5)) / len(values) - 0.5) < 0.02
+
+
+def test_count_sketch_keeps_linear_dependencies_and_merges():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(5000, 3))
+    x = np.column_stack([x, 2 * x[:, 0] - x[:, 1] + 5])
+    sketch = CountSketch(64, 4, seed=1).update(x[:3000]).merge(CountSketch(64, 4, seed=2).update(x[3000:]))
+    centered = sketch.centered(x.mean(axis=0))
+    np.testing.assert_allclose(centered[:, 3], 2 * centered[:, 0] - centered[:, 1], atol=1e-8)
+    with pytest.raises(ValueError):
+        sketch.merge(CountSketch(32, 4))
+
+
+def test_reservoir_sample_is_bounded_and_uniform():
+    counts = np.zeros(100)
+    for seed in range(200):
+        sample = ReservoirSample(10, seed=seed)
+        for start in range(0, 100, 30):
+            sample.update(np.arange(start, min(start + 30, 100)))
+        assert len(sample.sample) == 10 and len(set(sample.sample)) == 10 and len(sample) == 100
+        counts[sample.sample] += 1
+    # Cada linha entra com probabilidade 10 / 100
+    assert abs(counts[:50].sum() - counts[50:].sum()) < 0.15 * counts.sum()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.social_engineering_behavior_change_detector import (
+    SocialEngineeringBehaviorChangeDetector,
+)
+
+
+def make_data(n_subjects=60, n_rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24, n_rows), unit='h')
+    subjects = np.array([f"s{i:03d}" for i in range(n_subjects)], dtype=object)[rng.integers(0, n_subjects, n_rows)]
+    frame = pd.DataFrame({
+        'subject': subjects,
+        'score': rng.normal(0.5, 0.2, n_rows) + (times > pd.Timestamp('2023-02-01')) * rng.choice([0, 0.3], n_rows),
+    }, index=times)
+    frame.iloc[rng.integers(0, n_rows, 100), 1] = np.nan
+    frame.iloc[rng.integers(0, n_rows, 20), 0] = None
+    return frame
+
+
+def flatten(nested):
+    return [dict(record, subject=subject) for subject, records in nested.items() for record in records]
+
+
+@pytest.mark.parametrize('event_dates', [
+    [pd.Timestamp('2023-02-01')],
+    [pd.Timestamp('2022-12-01'), pd.Timestamp('2023-01-15'), pd.Timestamp('2023-02-01 05:00'),
+     pd.Timestamp('2023-03-20'), pd.Timestamp('2023-06-01')],
+    [],
+])
+def test_fast_engine_matches_subject_loop(event_dates):
+    data = make_data()
+    detector = SocialEngineeringBehaviorChangeDetector()
+    expected = flatten(detector.detect_behavior_shifts(data, 'subject', 'score', event_dates))
+    fast = detector.detect_behavior_shifts_fast(data, 'subject', 'score', event_dates).to_dicts()
+
+    assert len(fast) == len(expected)
+    for a, b in zip(expected, fast):
+        assert (a['subject'], a['event_date'], a['shift_detected']) == (b['subject'], b['event_date'],
+                                                                       b['shift_detected'])
+        assert b['pre_event_mean'] == pytest.approx(a['pre_event_mean'], rel=1e-9)
+        assert b['post_event_mean'] == pytest.approx(a['post_event_mean'], rel=1e-9)
+        assert b['difference'] == pytest.approx(a['difference'], rel=1e-9, abs=1e-12)
+
+
+def test_subjects_without_data_on_one_side_are_skipped():
+    index = pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03', '2023-01-04'])
+    data = pd.DataFrame({'subject': ['a', 'a', 'b', 'b'], 'score': [0.1, 0.9, np.nan, 0.5]}, index=index)
+    report = SocialEngineeringBehaviorChangeDetector().detect_behavior_shifts_fast(
+        data, 'subject', 'score', [pd.Timestamp('2023-01-02'), pd.Timestamp('2023-01-04')])
+    assert [(row['subject'], str(row['event_date'].date())) for row in report] == [
+        ('a', '2023-01-02'),
+    ]
+    assert report[0]['difference'] == pytest.approx(0.8) and report[0]['shift_detected']
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.spurious_correlation_detector import SpuriousCorrelationDetector
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(42)
+    n_rows, n_variables = 400, 14
+    latent = rng.normal(size=(n_rows, 3))
+    values = latent @ rng.normal(size=(3, n_variables)) + rng.normal(scale=0.5, size=(n_rows, n_variables))
+    return pd.DataFrame(values, columns=[f"v{i}" for i in range(n_variables)])
+
+
+def pair_keys(records):
+    return sorted((r['var1'], r['var2'], r['common_explainer']) for r in records)
+
+
+def test_matrix_engine_matches_regression(data):
+    detector = SpuriousCorrelationDetector()
+    regression = detector.detect_spurious_pairs(data, list(data.columns), engine='regression')
+    assert len(regression) > 0
+    assert detector.detect_spurious_pairs(data, list(data.columns), engine='matrix') == regression
+
+
+def test_small_pair_chunks_give_the_same_records(data):
+    detector = SpuriousCorrelationDetector()
+    expected = detector.detect_spurious_pairs(data, list(data.columns), engine='matrix')
+    assert detector._detect_spurious_pairs_matrix(data, list(data.columns), pair_chunk=3) == expected
+
+
+def test_parallel_tiles_match_matrix_engine(data):
+    detector = SpuriousCorrelationDetector()
+    expected = detector.detect_spurious_pairs(data, list(data.columns), engine='matrix')
+    parallel = list(detector.iter_spurious_pairs_parallel(data, list(data.columns), n_workers=2, tile_size=5,
+                                                          pair_chunk=4))
+    assert pair_keys(parallel) == pair_keys(expected)
+    by_pair = {(r['var1'], r['var2']): r for r in expected}
+    for record in parallel:
+        reference = by_pair[(record['var1'], record['var2'])]
+        assert record['original_corr'] == pytest.approx(reference['original_corr'], abs=2e-4)
+        assert record['explained_corr'] == pytest.approx(reference['explained_corr'], abs=2e-4)
+
+
+def test_unknown_engine_is_rejected(data):
+    with pytest.raises(ValueError):
+        SpuriousCorrelationDetector().detect_spurious_pairs(data, list(data.columns), engine='dense')
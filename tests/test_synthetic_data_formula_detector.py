@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.synthetic_data_formula_detector import SyntheticDataFormulaDetector
+
+COLUMNS = ['a', 'b', 'c', 'd', 'e', 'f', 'constant']
+
+
+def make_data(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(n, 4)) * [1.0, 5.0, 0.2, 3.0], columns=['a', 'b', 'c', 'e'])
+    # Fórmula de três colunas: nenhum par isolado passa do limiar de correlação
+    data['d'] = 10 + 2 * data['a'] - 0.3 * data['b'] + 4 * data['c']
+    data['f'] = rng.uniform(size=n)
+    data['constant'] = 7.0
+    data.iloc[rng.integers(0, n, 50), 0] = np.nan
+    return data[COLUMNS]
+
+
+def check_formula(data, row):
+    complete = data.dropna()
+    predicted = row['intercept'] + complete[list(row['formula_columns'])].to_numpy() @ np.array(row['coefficients'])
+    np.testing.assert_allclose(predicted, complete[row['column']], atol=1e-6)
+
+
+def test_planted_multi_column_formula_is_found_and_missed_by_pairs():
+    data = make_data()
+    detector = SyntheticDataFormulaDetector(data, COLUMNS)
+    assert len(detector.analyze()) == 0
+
+    report = detector.detect_linear_formulas(seed=0)
+    assert len(report) == 1
+    row = report[0]
+    assert set(row['formula_columns']) | {row['column']} == {'a', 'b', 'c', 'd'}
+    assert row['residual_std'] < 1e-6 and row['synthetic_pattern_suspected']
+    check_formula(data, row)
+
+
+@pytest.mark.parametrize('chunk_size', [997, 5000])
+def test_chunked_passes_find_the_same_formula(chunk_size):
+    data = make_data()
+    detector = SyntheticDataFormulaDetector(data, COLUMNS)
+    expected = detector.detect_linear_formulas(seed=1)[0]
+    by_size = detector.detect_linear_formulas(chunk_size=chunk_size, seed=1)[0]
+    chunks = (data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+    from_iterator = SyntheticDataFormulaDetector(pd.DataFrame(), COLUMNS).detect_linear_formulas(
+        chunks=chunks, seed=1)[0]
+    for row in (by_size, from_iterator):
+        assert (row['column'], row['formula_columns']) == (expected['column'], expected['formula_columns'])
+        assert row['coefficients'] == pytest.approx(expected['coefficients'], rel=1e-6)
+        check_formula(data, row)
+
+
+def test_noisy_relations_and_constant_columns_are_not_formulas():
+    data = make_data()
+    data['d'] += np.random.default_rng(1).normal(scale=0.5, size=len(data))
+    assert len(SyntheticDataFormulaDetector(data, COLUMNS).detect_linear_formulas(seed=0)) == 0
+    assert len(SyntheticDataFormulaDetector(data.iloc[:0], COLUMNS).detect_linear_formulas(seed=0)) == 0
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.chunked_statistics import StreamingMoments
+from bias_detection_toolkit.trauma_adaptive_source_detector import TraumaAdaptiveSourceDetector
+
+FEATURES = ['response_time', 'pressure_signal']
+
+
+def make_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    values = np.vstack([rng.normal(10, 2, (n - n // 5, 2)), rng.normal(15, 0.1, (n // 5, 2))])
+    return pd.DataFrame(values, columns=FEATURES, index=pd.RangeIndex(1000, 1000 + n))
+
+
+def test_streaming_moments_match_scipy():
+    from scipy import stats
+
+    values = np.random.default_rng(1).lognormal(size=(5000, 3))
+    moments = StreamingMoments(3)
+    for start in range(0, len(values), 700):
+        moments.update(values[start:start + 700])
+    np.testing.assert_allclose(moments.skewness(), stats.skew(values), rtol=1e-9)
+    np.testing.assert_allclose(moments.kurtosis(), stats.kurtosis(values), rtol=1e-9)
+
+def test_analyze_matches_fit_then_score():
+    reference = make_frame(200, 0)
+    fitted = TraumaAdaptiveSourceDetector().fit(reference, FEATURES).score(reference)
+    analyzed = TraumaAdaptiveSourceDetector().analyze_behavior_distortion(reference, FEATURES)
+    assert fitted['suspected_points'].equals(analyzed['suspected_points'])
+    assert fitted['skewness'] == analyzed['skewness']
+
+
+def test_save_load_round_trip_scores_the_same(tmp_path):
+    detector = TraumaAdaptiveSourceDetector().fit(make_frame(200, 0), FEATURES)
+    batch = make_frame(150, 1)
+    path = tmp_path / 'trauma.joblib'
+    detector.save(path)
+    loaded = TraumaAdaptiveSourceDetector.load(path)
+    expected, actual = detector.score(batch), loaded.score(batch)
+    assert loaded.features == FEATURES
+    assert actual['suspected_points'].equals(expected['suspected_points'])
+    assert actual['adaptive_data_percent'] == expected['adaptive_data_percent']
+    assert actual['kurtosis'] == expected['kurtosis']
+
+
+def test_chunked_batches_score_like_one_frame():
+    detector = TraumaAdaptiveSourceDetector().fit(make_frame(200, 0), FEATURES)
+    batch = make_frame(150, 1)
+    expected = detector.score(batch)
+    chunked = detector.score(batch.iloc[start:start + 40] for start in range(0, len(batch), 40))
+    assert chunked['suspected_points'].equals(expected['suspected_points'])
+    assert chunked['skewness'] == pytest.approx(expected['skewness'])
+
+
+def test_unfitted_detector_refuses_to_score_or_save(tmp_path):
+    with pytest.raises(ValueError):
+        TraumaAdaptiveSourceDetector().score(make_frame(10, 0))
+    with pytest.raises(ValueError):
+        TraumaAdaptiveSourceDetector().save(tmp_path / 'unfitted.joblib')
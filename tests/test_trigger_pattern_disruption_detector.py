@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bias_detection_toolkit.trigger_pattern_disruption_detector import TriggerPatternDisruptionDetector
+
+
+def make_data(n_entities=4, n_rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for k in range(n_entities):
+        behavior = rng.normal(5, 0.2, n_rows)
+        context = np.array(['none'] * n_rows, dtype=object)
+        spike = rng.integers(5, n_rows - 10)
+        behavior[spike:spike + 3] = rng.normal(10, 0.1, 3)
+        context[spike:spike + 3] = 'paddle'
+        frames.append(pd.DataFrame({
+            'entity': f"e{k}",
+            'timestamp': pd.date_range('2023-01-01', periods=n_rows) + pd.Timedelta(hours=k),
+            'aggression_level': behavior,
+            'kitchen_object': context,
+        }))
+    # Linhas embaralhadas: o modo agrupado precisa ordenar por (entidade, tempo)
+    data = pd.concat(frames, ignore_index=True)
+    return data.iloc[rng.permutation(len(data))].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_grouped_isolation_forest_matches_per_entity_loop(n_jobs):
+    data = make_data()
+    detector = TriggerPatternDisruptionDetector()
+    grouped = detector.detect_disruptions_grouped(data, 'entity', 'aggression_level', 'timestamp',
+                                                  ['kitchen_object'], n_jobs=n_jobs, return_full_df=True)
+
+    expected_rows, expected_triggers, expected_full = [], {}, []
+    for entity, subset in data.groupby('entity'):
+        single = detector.detect_disruptions(subset.drop(columns='entity'), 'aggression_level', 'timestamp',
+                                             ['kitchen_object'])
+        expected_rows.append(single['anomalies'].assign(entity=entity))
+        if single['potential_triggers']:
+            expected_triggers[entity] = single['potential_triggers']
+        expected_full.append(single['full_df'])
+    expected = pd.concat(expected_rows, ignore_index=True)[list(grouped['anomalies'].columns)]
+
+    pd.testing.assert_frame_equal(grouped['anomalies'], expected)
+    assert grouped['potential_triggers'] == expected_triggers
+    expected_full = pd.concat(expected_full, ignore_index=True)
+    np.testing.assert_allclose(grouped['full_df']['residual'], expected_full['residual'], equal_nan=True)
+    np.testing.assert_array_equal(grouped['full_df']['anomaly'], expected_full['anomaly'])
+
+
+def test_robust_z_flags_the_spikes_and_never_the_edges():
+    data = make_data()
+    result = TriggerPatternDisruptionDetector().detect_disruptions_grouped(
+        data, 'entity', 'aggression_level', 'timestamp', ['kitchen_object'], scorer='robust_z',
+        return_full_df=True)
+
+    full = result['full_df']
+    assert (full.loc[full['residual'].isna(), 'anomaly'] == 1).all()
+    assert set(result['potential_triggers']) == set(data['entity'])
+    assert all('kitchen_object:paddle' in triggers for triggers in result['potential_triggers'].values())
+    assert 'full_df' not in TriggerPatternDisruptionDetector().detect_disruptions_grouped(
+        data, 'entity', 'aggression_level', 'timestamp', ['kitchen_object'], scorer='robust_z')
+
+
+def test_rows_without_entity_are_left_out_and_unknown_scorer_is_rejected():
+    data = make_data(n_entities=2)
+    data.loc[:4, 'entity'] = None
+    detector = TriggerPatternDisruptionDetector()
+    result = detector.detect_disruptions_grouped(data, 'entity', 'aggression_level', 'timestamp',
+                                                 ['kitchen_object'], return_full_df=True)
+    assert len(result['full_df']) == len(data) - 5
+    assert result['anomalies']['entity'].notna().all()
+    with pytest.raises(ValueError):
+        detector.detect_disruptions_grouped(data, 'entity', 'aggression_level', 'timestamp', [], scorer='lof')